@@ -59,9 +59,10 @@ export interface Recipe {
 
 export interface RecipeListResponse {
   items: Recipe[];
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  next_cursor?: string | null;
 }
 
 export type PlaylistType = 'system' | 'custom';
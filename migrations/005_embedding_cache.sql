@@ -0,0 +1,18 @@
+-- migrations/005_embedding_cache.sql
+-- Shared embedding cache keyed by (model, task_type, sha256(text))
+-- Lets retries and re-imports reuse vectors instead of calling the Gemini API again
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    task_type TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (model, task_type, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created
+    ON embedding_cache (created_at);
+
+COMMENT ON TABLE embedding_cache IS 'Content-addressed embedding vectors shared by API replicas and workers';
+COMMENT ON COLUMN embedding_cache.content_hash IS 'Hex sha256 of the UTF-8 text that was embedded';
@@ -0,0 +1,20 @@
+-- migrations/006_ingest_cache.sql
+-- Shared ingest cache keyed by (platform, video_id, prompt_hash)
+-- Lets repeated imports of the same video skip download, Whisper and the Gemini extraction
+
+CREATE TABLE IF NOT EXISTS ingest_cache (
+    platform TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    raw_content JSONB NOT NULL,
+    ai_recipe JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (platform, video_id, prompt_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_cache_expires
+    ON ingest_cache (expires_at);
+
+COMMENT ON TABLE ingest_cache IS 'Fetched content and AI recipe extraction shared across users importing the same video';
+COMMENT ON COLUMN ingest_cache.prompt_hash IS 'Hex sha256 of cache version, model name and SYSTEM_PROMPT text';
@@ -0,0 +1,90 @@
+-- migrations/007_ingest_jobs.sql
+-- Ingest jobs table: POST /recipes/import enqueues here and the ingest worker
+-- runs fetch -> transcription -> AI extraction outside the API process
+
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'QUEUED'
+        CHECK (status IN ('QUEUED', 'RUNNING', 'DONE', 'FAILED')),
+    stage TEXT NOT NULL DEFAULT 'QUEUED',
+    progress REAL NOT NULL DEFAULT 0,
+    recipe_id UUID NULL,
+    attempt_count INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    next_attempt_at TIMESTAMPTZ NULL,
+    locked_at TIMESTAMPTZ NULL,
+    locked_by TEXT NULL,
+    last_heartbeat_at TIMESTAMPTZ NULL,
+    error_message TEXT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ NULL,
+    finished_at TIMESTAMPTZ NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_queue
+    ON ingest_jobs (status, next_attempt_at, created_at ASC)
+    WHERE status = 'QUEUED';
+
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_user
+    ON ingest_jobs (user_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_locked
+    ON ingest_jobs (locked_at)
+    WHERE status = 'RUNNING';
+
+CREATE OR REPLACE FUNCTION update_ingest_jobs_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_ingest_jobs_updated_at ON ingest_jobs;
+CREATE TRIGGER trigger_ingest_jobs_updated_at
+    BEFORE UPDATE ON ingest_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ingest_jobs_updated_at();
+
+CREATE OR REPLACE FUNCTION fetch_and_lock_ingest_job(
+    p_worker_id TEXT,
+    p_now TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS SETOF ingest_jobs AS $$
+DECLARE
+    v_job ingest_jobs;
+BEGIN
+    SELECT * INTO v_job
+    FROM ingest_jobs
+    WHERE status = 'QUEUED'
+      AND (next_attempt_at IS NULL OR next_attempt_at <= p_now)
+    ORDER BY created_at ASC
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF v_job.id IS NOT NULL THEN
+        UPDATE ingest_jobs
+        SET
+            status = 'RUNNING',
+            stage = 'FETCHING',
+            locked_at = p_now,
+            locked_by = p_worker_id,
+            last_heartbeat_at = p_now,
+            started_at = COALESCE(started_at, p_now),
+            attempt_count = attempt_count + 1
+        WHERE id = v_job.id
+        RETURNING * INTO v_job;
+
+        RETURN NEXT v_job;
+    END IF;
+
+    RETURN;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE ingest_jobs IS 'Async recipe import queue processed by workers.ingester';
+COMMENT ON COLUMN ingest_jobs.stage IS 'QUEUED, FETCHING, TRANSCRIBING, EXTRACTING, SAVING, DONE or FAILED';
+COMMENT ON COLUMN ingest_jobs.progress IS 'Approximate completion between 0 and 1';
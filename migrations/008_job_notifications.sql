@@ -0,0 +1,54 @@
+-- migrations/008_job_notifications.sql
+-- NOTIFY on the job queues so workers wake up on LISTEN instead of polling.
+-- Channel = table name, payload = job id. Fires when a job becomes QUEUED
+-- (new job, retry requeue or stale lock release).
+
+CREATE OR REPLACE FUNCTION notify_job_queued()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(TG_TABLE_NAME, NEW.id::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_transcription_jobs_notify_insert ON transcription_jobs;
+CREATE TRIGGER trigger_transcription_jobs_notify_insert
+    AFTER INSERT ON transcription_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
+
+DROP TRIGGER IF EXISTS trigger_transcription_jobs_notify_requeue ON transcription_jobs;
+CREATE TRIGGER trigger_transcription_jobs_notify_requeue
+    AFTER UPDATE OF status ON transcription_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED' AND OLD.status IS DISTINCT FROM 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
+
+DROP TRIGGER IF EXISTS trigger_embedding_jobs_notify_insert ON embedding_jobs;
+CREATE TRIGGER trigger_embedding_jobs_notify_insert
+    AFTER INSERT ON embedding_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
+
+DROP TRIGGER IF EXISTS trigger_embedding_jobs_notify_requeue ON embedding_jobs;
+CREATE TRIGGER trigger_embedding_jobs_notify_requeue
+    AFTER UPDATE OF status ON embedding_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED' AND OLD.status IS DISTINCT FROM 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
+
+DROP TRIGGER IF EXISTS trigger_ingest_jobs_notify_insert ON ingest_jobs;
+CREATE TRIGGER trigger_ingest_jobs_notify_insert
+    AFTER INSERT ON ingest_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
+
+DROP TRIGGER IF EXISTS trigger_ingest_jobs_notify_requeue ON ingest_jobs;
+CREATE TRIGGER trigger_ingest_jobs_notify_requeue
+    AFTER UPDATE OF status ON ingest_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'QUEUED' AND OLD.status IS DISTINCT FROM 'QUEUED')
+    EXECUTE FUNCTION notify_job_queued();
@@ -0,0 +1,30 @@
+-- migrations/009_batch_job_claiming.sql
+-- Batch variant of the embedding job claim: lock up to p_limit jobs in one
+-- statement (FOR UPDATE SKIP LOCKED) so the embedder pays one round-trip per batch.
+
+CREATE OR REPLACE FUNCTION fetch_and_lock_embedding_jobs(
+    p_worker_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_now TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS SETOF embedding_jobs AS $$
+    UPDATE embedding_jobs AS jobs
+    SET
+        status = 'RUNNING',
+        locked_at = p_now,
+        locked_by = p_worker_id,
+        started_at = COALESCE(jobs.started_at, p_now),
+        attempt_count = jobs.attempt_count + 1
+    WHERE jobs.id IN (
+        SELECT id
+        FROM embedding_jobs
+        WHERE status = 'QUEUED'
+          AND (next_attempt_at IS NULL OR next_attempt_at <= p_now)
+        ORDER BY created_at ASC
+        LIMIT GREATEST(p_limit, 1)
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING jobs.*;
+$$ LANGUAGE sql;
+
+-- GRANT EXECUTE ON FUNCTION fetch_and_lock_embedding_jobs TO service_role;
@@ -0,0 +1,11 @@
+-- Migration: Transcript dedup by media content hash
+-- Jobs record the hash of the uploaded bytes (R2 ETag of a single-part
+-- upload = MD5 of the content). A new job for the same bytes, model and
+-- language copies the finished transcript instead of running Whisper again.
+
+ALTER TABLE transcription_jobs
+    ADD COLUMN IF NOT EXISTS content_hash TEXT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_transcription_jobs_content_hash
+    ON transcription_jobs (content_hash, model_version, language, finished_at DESC)
+    WHERE status = 'DONE' AND content_hash IS NOT NULL;
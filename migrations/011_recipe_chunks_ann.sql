@@ -0,0 +1,96 @@
+-- migrations/011_recipe_chunks_ann.sql
+-- Owner-partitioned approximate nearest neighbour search over recipe_chunks.
+-- Chunks carry their owner so the search filters by owner *before* ranking
+-- (no cross-user top-k trimmed in Python), and an HNSW index keeps top-k
+-- lookups in the millisecond range at millions of chunks.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- text-embedding-004 gera vetores de 768 dimensoes; o HNSW exige dimensao fixa.
+ALTER TABLE recipe_chunks
+    ALTER COLUMN embedding TYPE vector(768);
+
+ALTER TABLE recipe_chunks
+    ADD COLUMN IF NOT EXISTS owner_id UUID NULL;
+
+UPDATE recipe_chunks AS c
+SET owner_id = r.owner_id
+FROM recipes AS r
+WHERE r.recipe_id = c.recipe_id
+  AND c.owner_id IS NULL;
+
+-- Chunks novos herdam o dono da receita sem mudar quem escreve em recipe_chunks.
+CREATE OR REPLACE FUNCTION set_recipe_chunk_owner()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.owner_id IS NULL THEN
+        SELECT r.owner_id INTO NEW.owner_id
+        FROM recipes AS r
+        WHERE r.recipe_id = NEW.recipe_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_recipe_chunks_owner ON recipe_chunks;
+CREATE TRIGGER trigger_recipe_chunks_owner
+    BEFORE INSERT ON recipe_chunks
+    FOR EACH ROW
+    EXECUTE FUNCTION set_recipe_chunk_owner();
+
+-- Donos com poucos chunks: o planner usa este indice e ordena exato.
+CREATE INDEX IF NOT EXISTS idx_recipe_chunks_owner
+    ON recipe_chunks (owner_id);
+
+-- Donos com muitos chunks: HNSW por cosseno (o mesmo operador do RPC).
+CREATE INDEX IF NOT EXISTS idx_recipe_chunks_embedding_hnsw
+    ON recipe_chunks USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Busca top-k dentro das receitas de um dono. ef_search troca recall por
+-- latencia (padrao do pgvector: 40; nunca menor que match_count).
+CREATE OR REPLACE FUNCTION match_owner_recipe_chunks(
+    owner_id_filter UUID,
+    query_embedding vector(768),
+    match_count INTEGER DEFAULT 3,
+    match_threshold FLOAT DEFAULT 0.75,
+    ef_search INTEGER DEFAULT 40
+)
+RETURNS TABLE (
+    recipe_id recipe_chunks.recipe_id%TYPE,
+    chunk_index INTEGER,
+    chunk_text TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, match_count)::TEXT, true);
+    BEGIN
+        -- pgvector >= 0.8: continua a varredura ate achar match_count linhas do dono.
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    EXCEPTION WHEN OTHERS THEN
+        NULL;
+    END;
+
+    RETURN QUERY
+    SELECT ranked.recipe_id, ranked.chunk_index, ranked.chunk_text, ranked.similarity
+    FROM (
+        SELECT
+            c.recipe_id,
+            c.chunk_index,
+            c.chunk_text,
+            (1 - (c.embedding <=> query_embedding))::FLOAT AS similarity
+        FROM recipe_chunks AS c
+        WHERE c.owner_id = owner_id_filter
+        ORDER BY c.embedding <=> query_embedding
+        LIMIT match_count
+    ) AS ranked
+    WHERE ranked.similarity >= match_threshold
+    ORDER BY ranked.similarity DESC;
+END;
+$$;
+
+COMMENT ON FUNCTION match_owner_recipe_chunks IS 'Top-k recipe chunks of one owner by cosine similarity (HNSW, filtered before ranking)';
@@ -0,0 +1,131 @@
+-- migrations/012_recipe_chunks_hybrid_search.sql
+-- Hybrid retrieval for chat context: Portuguese full-text search over
+-- chunk_text fused with vector similarity by reciprocal rank fusion (RRF),
+-- in a single RPC. Ingredient names ("tahini") that embed poorly still
+-- match lexically.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Mesma configuracao da busca de receitas (013): portuguese + unaccent, para
+-- "acafrao" e "açafrão" casarem igual nas duas buscas.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+        ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+            ALTER MAPPING FOR hword, hword_part, word
+            WITH unaccent, portuguese_stem;
+    END IF;
+END;
+$$;
+
+ALTER TABLE recipe_chunks
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('portuguese_unaccent', coalesce(chunk_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_recipe_chunks_search_vector
+    ON recipe_chunks USING gin (search_vector);
+
+-- Cada ramo pega candidate_count candidatos do dono; o score final e
+-- sum(1 / (rrf_k + rank)). Candidatos so vetoriais precisam de
+-- min_similarity para nao trazer contexto irrelevante. A mensagem do chat e
+-- conversacional ("como faço homus com tahini?"), entao o ramo lexical usa OR
+-- entre os lexemas sem stopwords e deixa o ts_rank_cd premiar quem casa mais.
+CREATE OR REPLACE FUNCTION match_owner_recipe_chunks_hybrid(
+    owner_id_filter UUID,
+    query_embedding vector(768),
+    query_text TEXT,
+    match_count INTEGER DEFAULT 3,
+    candidate_count INTEGER DEFAULT 20,
+    min_similarity FLOAT DEFAULT 0.5,
+    rrf_k INTEGER DEFAULT 60,
+    ef_search INTEGER DEFAULT 40
+)
+RETURNS TABLE (
+    recipe_id recipe_chunks.recipe_id%TYPE,
+    chunk_index INTEGER,
+    chunk_text TEXT,
+    similarity FLOAT,
+    lexical_rank FLOAT,
+    score FLOAT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+    lexical_query tsquery;
+BEGIN
+    -- Os lexemas ja vem normalizados; o cast para tsquery nao os reprocessa.
+    SELECT string_agg(
+               '''' || replace(replace(lexeme, '\', '\\'), '''', '''''') || '''',
+               ' | '
+           )::tsquery
+    INTO lexical_query
+    FROM unnest(tsvector_to_array(to_tsvector('portuguese_unaccent', coalesce(query_text, '')))) AS lexeme;
+
+    PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, candidate_count)::TEXT, true);
+    BEGIN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    EXCEPTION WHEN OTHERS THEN
+        NULL;
+    END;
+
+    RETURN QUERY
+    WITH vector_hits AS (
+        SELECT
+            ranked.recipe_id,
+            ranked.chunk_index,
+            ranked.chunk_text,
+            ranked.similarity,
+            ROW_NUMBER() OVER (ORDER BY ranked.similarity DESC) AS rank
+        FROM (
+            SELECT
+                c.recipe_id,
+                c.chunk_index,
+                c.chunk_text,
+                (1 - (c.embedding <=> query_embedding))::FLOAT AS similarity
+            FROM recipe_chunks AS c
+            WHERE c.owner_id = owner_id_filter
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) AS ranked
+        WHERE ranked.similarity >= min_similarity
+    ),
+    lexical_hits AS (
+        SELECT
+            matched.recipe_id,
+            matched.chunk_index,
+            matched.chunk_text,
+            matched.lexical_rank,
+            ROW_NUMBER() OVER (ORDER BY matched.lexical_rank DESC) AS rank
+        FROM (
+            SELECT
+                c.recipe_id,
+                c.chunk_index,
+                c.chunk_text,
+                ts_rank_cd(c.search_vector, lexical_query)::FLOAT AS lexical_rank
+            FROM recipe_chunks AS c
+            WHERE lexical_query IS NOT NULL
+              AND c.owner_id = owner_id_filter
+              AND c.search_vector @@ lexical_query
+            ORDER BY lexical_rank DESC
+            LIMIT candidate_count
+        ) AS matched
+    )
+    SELECT
+        COALESCE(v.recipe_id, l.recipe_id),
+        COALESCE(v.chunk_index, l.chunk_index),
+        COALESCE(v.chunk_text, l.chunk_text),
+        v.similarity,
+        l.lexical_rank,
+        (COALESCE(1.0 / (rrf_k + v.rank), 0) + COALESCE(1.0 / (rrf_k + l.rank), 0))::FLOAT AS score
+    FROM vector_hits AS v
+    FULL OUTER JOIN lexical_hits AS l
+        ON v.recipe_id = l.recipe_id AND v.chunk_index = l.chunk_index
+    ORDER BY score DESC
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON FUNCTION match_owner_recipe_chunks_hybrid IS 'Top-k recipe chunks of one owner by RRF of full-text (portuguese_unaccent, OR of query terms) and cosine similarity';
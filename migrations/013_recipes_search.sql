@@ -0,0 +1,90 @@
+-- migrations/013_recipes_search.sql
+-- Full-text search for GET /recipes/?q=: a generated, accent-insensitive
+-- Portuguese tsvector over title/description/tags/notes with a GIN index,
+-- and a ranked RPC that replaces the five-way ILIKE scan.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Configuracao portuguese + unaccent: "acucar" encontra "açúcar" e o stemming
+-- continua valendo. to_tsvector(regconfig, text) e IMMUTABLE, entao serve
+-- para coluna gerada.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+        ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+            ALTER MAPPING FOR hword, hword_part, word
+            WITH unaccent, portuguese_stem;
+    END IF;
+END;
+$$;
+
+ALTER TABLE recipes
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese_unaccent', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('portuguese_unaccent', coalesce(metadata->'ai_recipe'->>'title', '')), 'A')
+        || setweight(to_tsvector('portuguese_unaccent', coalesce(metadata->'ai_recipe'->>'tags', '')), 'B')
+        || setweight(to_tsvector('portuguese_unaccent', coalesce(metadata->'ai_recipe'->>'description', '')), 'B')
+        || setweight(to_tsvector('portuguese_unaccent', coalesce(metadata->'ai_recipe'->>'notes', '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_recipes_search_vector
+    ON recipes USING gin (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_recipes_owner_created
+    ON recipes (owner_id, created_at DESC);
+
+-- Cada palavra vira prefixo ("choc" acha "chocolate"), todas obrigatorias.
+-- As palavras sao separadas em tudo que nao e letra/digito, entao operadores
+-- de tsquery (& | ! ( ) : * \ ') nunca chegam ao to_tsquery.
+-- total_count conta so as receitas do dono que casaram (via GIN), nao a tabela.
+CREATE OR REPLACE FUNCTION search_recipes(
+    owner_id_filter UUID,
+    query_text TEXT,
+    result_limit INTEGER DEFAULT 20,
+    result_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    recipe_id recipes.recipe_id%TYPE,
+    title recipes.title%TYPE,
+    metadata recipes.metadata%TYPE,
+    created_at recipes.created_at%TYPE,
+    updated_at recipes.updated_at%TYPE,
+    is_favorite recipes.is_favorite%TYPE,
+    embedding_status recipes.embedding_status%TYPE,
+    embedding_error recipes.embedding_error%TYPE,
+    rank FLOAT,
+    total_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH query AS (
+        SELECT to_tsquery(
+            'portuguese_unaccent',
+            string_agg(word || ':*', ' & ')
+        ) AS tsq
+        FROM regexp_split_to_table(coalesce(query_text, ''), '[^[:alnum:]]+') AS word
+        WHERE word <> ''
+    )
+    SELECT
+        r.recipe_id,
+        r.title,
+        r.metadata,
+        r.created_at,
+        r.updated_at,
+        r.is_favorite,
+        r.embedding_status,
+        r.embedding_error,
+        ts_rank_cd(r.search_vector, query.tsq)::FLOAT AS rank,
+        COUNT(*) OVER () AS total_count
+    FROM recipes AS r, query
+    WHERE r.owner_id = owner_id_filter
+      AND r.search_vector @@ query.tsq
+    ORDER BY rank DESC, r.created_at DESC
+    LIMIT result_limit
+    OFFSET result_offset;
+$$;
+
+COMMENT ON FUNCTION search_recipes IS 'Ranked full-text search over one owner''s recipes (portuguese + unaccent, prefix terms)';
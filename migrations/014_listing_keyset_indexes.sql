@@ -0,0 +1,21 @@
+-- migrations/014_listing_keyset_indexes.sql
+-- Keyset pagination for GET /recipes/ and GET /v2/transcriptions/jobs:
+-- the listings order by (created_at DESC, id DESC) and continue from an
+-- opaque cursor, so each page is an index range scan that does not depend
+-- on how deep the client already went.
+
+-- O id desempata linhas com o mesmo created_at (importacoes em lote).
+CREATE INDEX IF NOT EXISTS idx_recipes_owner_created_id
+    ON recipes (owner_id, created_at DESC, recipe_id DESC);
+
+DROP INDEX IF EXISTS idx_recipes_owner_created;
+
+CREATE INDEX IF NOT EXISTS idx_transcription_jobs_user_created_id
+    ON transcription_jobs (user_id, created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_transcription_jobs_user;
+
+-- count=estimated/planned do PostgREST usa as estatisticas do planner;
+-- mantenha-as atualizadas para o total ficar proximo do real.
+ANALYZE recipes;
+ANALYZE transcription_jobs;
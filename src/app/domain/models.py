@@ -56,6 +56,7 @@ class TranscriptionJob:
     transcript_text: str | None = None
     segments_json: list[dict[str, float | str]] | None = None
     model_version: str | None = None
+    content_hash: str | None = None
 
     @property
     def is_complete(self) -> bool:
@@ -48,9 +48,19 @@ class JobQueueRepository(ABC):
         language: str,
         duration_sec: int,
         model_version: str,
+        content_hash: str | None = None,
     ) -> bool:
         pass
 
+    @abstractmethod
+    def find_completed_by_content_hash(
+        self,
+        content_hash: str,
+        model_version: str,
+        language: str,
+    ) -> TranscriptionJob | None:
+        pass
+
     @abstractmethod
     def mark_failed(
         self,
@@ -92,9 +102,18 @@ class JobQueueRepository(ABC):
         user_id: UUID,
         limit: int = 20,
         offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
     ) -> list[TranscriptionJob]:
         pass
 
+    @abstractmethod
+    def count_jobs_by_user(
+        self,
+        user_id: UUID,
+        mode: str = "estimated",
+    ) -> int | None:
+        pass
+
     @abstractmethod
     def cancel_job(
         self,
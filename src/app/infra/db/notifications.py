@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL_ENV = "DATABASE_URL"
+WAIT_SLICE_SECONDS = 5.0
+
+# Canais = nomes das tabelas (ver migrations/008_job_notifications.sql).
+TRANSCRIPTION_JOBS_CHANNEL = "transcription_jobs"
+EMBEDDING_JOBS_CHANNEL = "embedding_jobs"
+INGEST_JOBS_CHANNEL = "ingest_jobs"
+
+try:  # psycopg e opcional: sem ele os workers continuam so com polling.
+    import psycopg
+    from psycopg import sql
+except ImportError:  # pragma: no cover - depende do ambiente
+    psycopg = None  # type: ignore[assignment]
+    sql = None  # type: ignore[assignment]
+
+
+class JobNotificationListener:
+    """
+    Conexao dedicada com LISTEN nos canais de fila (um por tabela de jobs).
+    Os triggers da migration 008 fazem NOTIFY quando um job fica QUEUED, e
+    `wait` devolve assim que a notificacao chega em vez de dormir o intervalo todo.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channels: Sequence[str],
+        connect: Callable[[str], Any] | None = None,
+    ) -> None:
+        self.dsn = dsn
+        self.channels = list(channels)
+        self._connect_fn = connect or self._default_connect
+        self._conn: Any | None = None
+
+    @staticmethod
+    def _default_connect(dsn: str) -> Any:
+        if psycopg is None:
+            raise RuntimeError("psycopg nao instalado")
+        return psycopg.connect(dsn, autocommit=True)
+
+    def _ensure_connection(self) -> Any:
+        if self._conn is not None and not getattr(self._conn, "closed", False):
+            return self._conn
+        conn = self._connect_fn(self.dsn)
+        for channel in self.channels:
+            statement = sql.SQL("LISTEN {}").format(sql.Identifier(channel)) if sql else f"LISTEN {channel}"
+            conn.execute(statement)
+        self._conn = conn
+        logger.info("Listening for job notifications: channels=%s", ",".join(self.channels))
+        return conn
+
+    def _wait_once(self, timeout: float) -> bool:
+        try:
+            conn = self._ensure_connection()
+            for _ in conn.notifies(timeout=timeout, stop_after=1):
+                return True
+            return False
+        except Exception as exc:
+            # Conexao caiu: dorme o intervalo (fallback de polling) e reconecta na proxima.
+            logger.warning("Job notification listener error, falling back to polling: %s", exc)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def wait(
+        self,
+        timeout: float,
+        should_continue: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Espera ate `timeout` segundos por um NOTIFY; fatia a espera para respeitar shutdown."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if should_continue is not None and not should_continue():
+                return False
+            if self._wait_once(min(remaining, WAIT_SLICE_SECONDS)):
+                return True
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            logger.debug("Error closing notification connection", exc_info=True)
+
+
+def create_job_listener(channels: Sequence[str], dsn: str | None = None) -> JobNotificationListener | None:
+    database_url = dsn if dsn is not None else os.getenv(DATABASE_URL_ENV, "")
+    if not database_url:
+        return None
+    if psycopg is None:
+        logger.warning("DATABASE_URL set but psycopg is not installed; using polling only")
+        return None
+    return JobNotificationListener(database_url, channels)
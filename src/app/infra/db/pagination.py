@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+CountMode = Literal["exact", "estimated", "planned", "none"]
+
+# Como calcular o "total" das listagens (so na primeira pagina):
+# "exact" = COUNT(*) completo; "estimated" = exato ate o max-rows do PostgREST
+# e estimativa do planner acima disso; "planned" = sempre a estimativa do
+# planner; "none" = sem contagem.
+LIST_COUNT_MODE: CountMode = os.getenv("LIST_COUNT_MODE", "estimated").lower()  # type: ignore[assignment]
+if LIST_COUNT_MODE not in ("exact", "estimated", "planned", "none"):
+    LIST_COUNT_MODE = "estimated"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime | str, key: UUID | str) -> str:
+    """Cursor opaco (base64url de JSON) com a ultima chave (created_at, id) da pagina."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps({"t": created_at, "k": str(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), UUID(payload["k"])
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as error:
+        raise InvalidCursorError("Invalid pagination cursor") from error
+
+
+def keyset_filter(created_at: datetime, key: UUID, key_column: str) -> str:
+    """
+    Filtro PostgREST (para .or_) das linhas depois do cursor na ordem
+    created_at DESC, key_column DESC. Com o indice (dono, created_at DESC,
+    chave DESC) o custo nao depende da profundidade da pagina.
+    """
+    timestamp = created_at.isoformat()
+    return (
+        f'created_at.lt."{timestamp}",'
+        f'and(created_at.eq."{timestamp}",{key_column}.lt.{key})'
+    )
+
+
+def count_method(mode: CountMode | None = None) -> str | None:
+    """Valor de count= para o select do PostgREST (None = nao contar)."""
+    mode = mode or LIST_COUNT_MODE
+    return None if mode == "none" else mode
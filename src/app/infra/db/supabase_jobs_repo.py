@@ -11,6 +11,7 @@ from supabase import Client, create_client
 from src.app.domain.errors import JobNotFoundError, JobLockError, JobRepositoryError
 from src.app.domain.models import JobStatus, TranscriptionJob, UsageDaily, QuotaCheck
 from src.app.infra.db.base import JobQueueRepository, QuotaRepository
+from src.app.infra.db.pagination import keyset_filter
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ def _row_to_job(row: dict[str, str | int | float | None]) -> TranscriptionJob:
         transcript_text=_safe_str(row.get("transcript_text")),
         segments_json=row.get("segments_json"),
         model_version=_safe_str(row.get("model_version")),
+        content_hash=_safe_str(row.get("content_hash")),
     )
 
 
@@ -245,6 +247,7 @@ class SupabaseJobQueueRepository(JobQueueRepository):
         language: str,
         duration_sec: int,
         model_version: str,
+        content_hash: str | None = None,
     ) -> bool:
         now = _now_utc()
         update_data = {
@@ -262,6 +265,8 @@ class SupabaseJobQueueRepository(JobQueueRepository):
             "locked_by": None,
             "error_message": None,
         }
+        if content_hash:
+            update_data["content_hash"] = content_hash
 
         try:
             result = self._client.table(self.TABLE_NAME).update(update_data).eq("id", str(job_id)).execute()
@@ -442,16 +447,51 @@ class SupabaseJobQueueRepository(JobQueueRepository):
             logger.error("Network error getting job: %s", error)
             return None
 
-    def get_jobs_by_user(self, user_id: UUID, limit: int = 20, offset: int = 0) -> list[TranscriptionJob]:
+    def find_completed_by_content_hash(
+        self,
+        content_hash: str,
+        model_version: str,
+        language: str,
+    ) -> TranscriptionJob | None:
         try:
             result = (
                 self._client.table(self.TABLE_NAME)
                 .select("*")
-                .eq("user_id", str(user_id))
-                .order("created_at", desc=True)
-                .range(offset, offset + limit - 1)
+                .eq("content_hash", content_hash)
+                .eq("model_version", model_version)
+                .eq("language", language)
+                .eq("status", JobStatus.DONE.value)
+                .order("finished_at", desc=True)
+                .limit(1)
                 .execute()
             )
+            return _row_to_job(result.data[0]) if result.data else None
+
+        except (ConnectionError, TimeoutError) as error:
+            logger.error("Network error looking up transcript by content hash: %s", error)
+            return None
+
+    def get_jobs_by_user(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[TranscriptionJob]:
+        try:
+            query = (
+                self._client.table(self.TABLE_NAME)
+                .select("*")
+                .eq("user_id", str(user_id))
+            )
+            if after:
+                query = query.or_(keyset_filter(after[0], after[1], "id"))
+            query = query.order("created_at", desc=True).order("id", desc=True)
+            if after:
+                query = query.limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+            result = query.execute()
 
             return [_row_to_job(row) for row in (result.data or [])]
 
@@ -459,6 +499,22 @@ class SupabaseJobQueueRepository(JobQueueRepository):
             logger.error("Network error getting jobs for user: %s", error)
             return []
 
+    def count_jobs_by_user(self, user_id: UUID, mode: str = "estimated") -> int | None:
+        if mode == "none":
+            return None
+        try:
+            result = (
+                self._client.table(self.TABLE_NAME)
+                .select("id", count=mode, head=True)
+                .eq("user_id", str(user_id))
+                .execute()
+            )
+            return result.count
+
+        except (ConnectionError, TimeoutError) as error:
+            logger.error("Network error counting jobs for user: %s", error)
+            return None
+
     def cancel_job(self, job_id: UUID, user_id: UUID) -> bool:
         try:
             result = (
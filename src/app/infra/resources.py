@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import threading
+from typing import Any
+
+import httpx
+import yt_dlp
+
+from src.app.infra.storage.r2_provider import R2StorageProvider
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("Pacote h2 ausente; clientes HTTP usarao HTTP/1.1")
+        return False
+    return True
+
+
+class AppResources:
+    """
+    Recursos de rede com escopo de aplicacao: clientes httpx com pool de
+    conexoes, o cliente boto3 do R2 e instancias yt-dlp reaproveitadas por
+    thread. Criados no startup e fechados no shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._http_client: httpx.Client | None = None
+        self._async_http_client: httpx.AsyncClient | None = None
+        self._storage: R2StorageProvider | None = None
+        self._ydl_local = threading.local()
+        self._ydl_instances: list[yt_dlp.YoutubeDL] = []
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        return {
+            "timeout": HTTP_TIMEOUT_SECONDS,
+            "follow_redirects": True,
+            "http2": _http2_available(),
+            "limits": httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        }
+
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(**self._client_kwargs())
+        return self._http_client
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        if self._async_http_client is None:
+            with self._lock:
+                if self._async_http_client is None:
+                    self._async_http_client = httpx.AsyncClient(**self._client_kwargs())
+        return self._async_http_client
+
+    def storage(self) -> R2StorageProvider:
+        """Provider R2 unico (o cliente boto3 e thread-safe). Levanta StorageError sem config."""
+        if self._storage is None:
+            with self._lock:
+                if self._storage is None:
+                    self._storage = R2StorageProvider()
+        return self._storage
+
+    def youtube_dl(self, opts: dict) -> yt_dlp.YoutubeDL:
+        """YoutubeDL reaproveitado na thread atual para as mesmas opcoes (nao e thread-safe)."""
+        key = repr(sorted(opts.items()))
+        instances: dict[str, yt_dlp.YoutubeDL] | None = getattr(self._ydl_local, "instances", None)
+        if instances is None:
+            instances = {}
+            self._ydl_local.instances = instances
+        ydl = instances.get(key)
+        if ydl is None:
+            # YoutubeDL altera o dict recebido; a chave usa as opcoes originais.
+            ydl = yt_dlp.YoutubeDL(copy.deepcopy(opts))
+            instances[key] = ydl
+            with self._lock:
+                self._ydl_instances.append(ydl)
+        return ydl
+
+    def warm_up(self) -> None:
+        _ = self.http_client
+        _ = self.async_http_client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            async_http_client, self._async_http_client = self._async_http_client, None
+            ydl_instances, self._ydl_instances = self._ydl_instances, []
+            self._storage = None
+            self._ydl_local = threading.local()
+
+        if http_client is not None:
+            http_client.close()
+        if async_http_client is not None:
+            await async_http_client.aclose()
+        for ydl in ydl_instances:
+            try:
+                ydl.close()
+            except Exception:
+                logger.debug("Falha ao fechar instancia yt-dlp", exc_info=True)
+
+
+_resources = AppResources()
+
+
+def get_resources() -> AppResources:
+    return _resources
+
+
+async def startup_resources() -> None:
+    _resources.warm_up()
+
+
+async def shutdown_resources() -> None:
+    await _resources.aclose()
+
+
+def get_http_client() -> httpx.Client:
+    return _resources.http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    return _resources.async_http_client
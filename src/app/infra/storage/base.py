@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
 
+STREAM_CHUNK_BYTES = 1024 * 1024
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -31,6 +34,22 @@ class StorageProvider(ABC):
     ) -> Path:
         pass
 
+    def iter_object_chunks(
+        self,
+        object_key: str,
+        chunk_size: int = STREAM_CHUNK_BYTES,
+    ) -> Iterator[bytes]:
+        """Le o objeto em blocos conforme chega da rede, sem tocar o disco."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming reads")
+
+    def upload_bytes(
+        self,
+        object_key: str,
+        data: bytes,
+        content_type: str,
+    ) -> None:
+        raise NotImplementedError(f"{type(self).__name__} does not support uploads")
+
     @abstractmethod
     def delete_object(self, object_key: str) -> bool:
         pass
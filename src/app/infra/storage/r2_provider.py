@@ -2,15 +2,16 @@ from __future__ import annotations
 
 import logging
 import os
+from collections.abc import Iterator
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 import boto3
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
 from src.app.domain.errors import StorageError, StorageDownloadError
-from src.app.infra.storage.base import StorageProvider
+from src.app.infra.storage.base import STREAM_CHUNK_BYTES, StorageProvider
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +145,59 @@ class R2StorageProvider(StorageProvider):
             logger.error("Failed to download from R2: %s", client_error)
             raise StorageDownloadError(object_key, str(client_error)) from client_error
 
+    def iter_object_chunks(
+        self,
+        object_key: str,
+        chunk_size: int = STREAM_CHUNK_BYTES,
+    ) -> Iterator[bytes]:
+        try:
+            response = self._client.get_object(
+                Bucket=self.bucket_name,
+                Key=object_key,
+            )
+        except ClientError as client_error:
+            error_code = client_error.response.get("Error", {}).get("Code", "Unknown")
+
+            if error_code in ("404", "NoSuchKey"):
+                raise StorageDownloadError(object_key, "Object not found") from client_error
+
+            logger.error("Failed to open R2 stream: %s", client_error)
+            raise StorageDownloadError(object_key, str(client_error)) from client_error
+
+        logger.info(
+            "Streaming from R2: key=%s, size=%s bytes",
+            object_key,
+            response.get("ContentLength"),
+        )
+
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        except (BotoCoreError, ClientError) as stream_error:
+            logger.error("R2 stream interrupted: %s", stream_error)
+            raise StorageDownloadError(object_key, str(stream_error)) from stream_error
+        finally:
+            body.close()
+
+    def upload_bytes(
+        self,
+        object_key: str,
+        data: bytes,
+        content_type: str,
+    ) -> None:
+        try:
+            self._client.put_object(
+                Bucket=self.bucket_name,
+                Key=object_key,
+                Body=data,
+                ContentType=content_type,
+            )
+            logger.info("Uploaded to R2: key=%s, size=%d bytes", object_key, len(data))
+
+        except ClientError as client_error:
+            logger.error("Failed to upload to R2: %s", client_error)
+            raise StorageError(f"Failed to upload object: {client_error}") from client_error
+
     def delete_object(self, object_key: str) -> bool:
         try:
             self._client.delete_object(
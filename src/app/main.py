@@ -13,6 +13,7 @@ from src.app.routers.playlists import router as playlists_router
 # V2 routes for async transcription workflow
 from src.app.routers.v2.media import router as media_v2_router
 from src.app.routers.v2.transcriptions import router as transcriptions_v2_router
+from src.app.infra.resources import shutdown_resources, startup_resources
 from src.services import embedding_queue
 
 # Logging simples no stdout (bom para dev e containers)
@@ -45,6 +46,7 @@ app.include_router(transcriptions_v2_router)
 
 @app.on_event("startup")
 async def startup() -> None:
+    await startup_resources()
     if embedding_queue.get_queue_mode() == embedding_queue.MODE_IN_MEMORY:
         await embedding_queue.start_worker()
 
@@ -53,6 +55,7 @@ async def startup() -> None:
 async def shutdown() -> None:
     if embedding_queue.get_queue_mode() == embedding_queue.MODE_IN_MEMORY:
         await embedding_queue.stop_worker()
+    await shutdown_resources()
 
 
 @app.get("/health")
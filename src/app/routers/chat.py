@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
 from src.app.deps import CurrentUser, get_current_user, get_supabase
@@ -21,10 +27,8 @@ async def get_history(
     user: CurrentUser = Depends(get_current_user),
     supa: Client = Depends(get_supabase),
 ) -> list[ChatMessage]:
-    return [
-        ChatMessage(**msg)
-        for msg in chat_store.list_messages(str(user.id), supa, chat_id=chat_id)
-    ]
+    messages = await run_in_threadpool(chat_store.list_messages, str(user.id), supa, chat_id=chat_id)
+    return [ChatMessage(**msg) for msg in messages]
 
 
 
@@ -33,10 +37,8 @@ async def list_sessions(
     user: CurrentUser = Depends(get_current_user),
     supa: Client = Depends(get_supabase),
 ) -> list[ChatSession]:
-    return [
-        ChatSession(**session)
-        for session in chat_store.list_sessions(str(user.id), supa)
-    ]
+    sessions = await run_in_threadpool(chat_store.list_sessions, str(user.id), supa)
+    return [ChatSession(**session) for session in sessions]
 
 
 @router.post("/", response_model=ChatResponse)
@@ -46,7 +48,7 @@ async def post_message(
     supa: Client = Depends(get_supabase),
 ) -> ChatResponse:
     try:
-        chat_result = chat_store.send_message(
+        chat_result = await chat_store.send_message_async(
             user=user,
             supa=supa,
             message=payload.message,
@@ -64,6 +66,59 @@ async def post_message(
             status_code=500,
             detail=f"Erro ao processar mensagem do chat: {str(exc)}"
         )
-        
-        
 
+
+def _format_sse(event: str, data: dict[str, Any]) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@router.post(
+    "/stream",
+    response_model=ChatResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_message(
+    payload: ChatRequest,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user),
+    supa: Client = Depends(get_supabase),
+):
+    """
+    Envia a resposta como server-sent events: `user`, vários `delta` e um
+    `done` final com o mesmo corpo de `ChatResponse`. Clientes que não pedem
+    `text/event-stream` no Accept recebem o `ChatResponse` normal.
+    """
+    if "text/event-stream" not in request.headers.get("accept", ""):
+        return await post_message(payload, user=user, supa=supa)
+
+    async def event_stream() -> AsyncIterator[str]:
+        user_message: dict[str, Any] | None = None
+        try:
+            async for event, data in chat_store.stream_message(
+                user=user,
+                supa=supa,
+                message=payload.message,
+                recipe_id=payload.recipeId,
+                client_message_id=payload.threadId,
+                chat_id=payload.chatId,
+            ):
+                if event == "user":
+                    user_message = data
+                    yield _format_sse("user", ChatMessage(**data).model_dump())
+                elif event == "delta":
+                    yield _format_sse("delta", data)
+                else:
+                    response = ChatResponse(
+                        message=ChatMessage(**data),
+                        userMessage=ChatMessage(**(user_message or {})),
+                    )
+                    yield _format_sse("done", response.model_dump())
+        except Exception as exc:
+            yield _format_sse("error", {"detail": f"Erro ao processar mensagem do chat: {str(exc)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
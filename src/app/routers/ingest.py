@@ -3,15 +3,26 @@ from __future__ import annotations
 
 import logging
 import time
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
 from src.app.deps import CurrentUser, get_current_user, get_supabase
+from src.app.infra.db.pagination import (
+    InvalidCursorError,
+    count_method,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
 from src.app.schemas.ingest import (
     EmbeddingStatusResponse,
+    IngestJobResponse,
     IngestRequest,
     IngestResponse,
     RecipeListResponse,
@@ -20,6 +31,8 @@ from src.app.schemas.ingest import (
     RecipeSource,
 )
 from src.services.ingest import ingest as run_ingest
+from src.services.ingest_cache import get_ingest_cache
+from src.services import ingest_jobs
 from src.services.persist_supabase import (
     get_recipe_embedding_status,
     update_recipe_embedding_status,
@@ -358,6 +371,103 @@ def _build_recipe_response(
     recipe_response = RecipeResponse(**recipe_payload)
     return recipe_response, warnings
 
+_RECIPE_LIST_COLUMNS = "recipe_id,title,metadata,created_at,updated_at,is_favorite,embedding_status,embedding_error"
+_SEARCH_RECIPES_RPC = "search_recipes"
+
+
+def _list_recipe_records(
+    supa: Client,
+    owner_id: str,
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[datetime, UUID]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Pagina por keyset (created_at, recipe_id) quando ha cursor; o offset fica
+    para clientes antigos. Busca limit + 1 linhas para saber se ha proxima
+    pagina e so conta o total quando nao ha cursor.
+    """
+    query = (
+        supa.table("recipes")
+        .select(_RECIPE_LIST_COLUMNS, count=None if after else count_method())
+        .eq("owner_id", owner_id)
+    )
+    if after:
+        query = query.or_(keyset_filter(after[0], after[1], "recipe_id"))
+    query = query.order("created_at", desc=True).order("recipe_id", desc=True)
+    if after:
+        query = query.limit(limit + 1)
+    else:
+        query = query.range(offset, offset + limit)
+    response = query.execute()
+    return response.data or [], getattr(response, "count", None)
+
+
+def _search_recipe_records(
+    supa: Client,
+    owner_id: str,
+    term: str,
+    limit: int,
+    offset: int,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Busca ranqueada via indice full-text (GIN); ILIKE se o RPC faltar ou falhar."""
+    try:
+        response = supa.rpc(
+            _SEARCH_RECIPES_RPC,
+            {
+                "owner_id_filter": owner_id,
+                "query_text": term,
+                "result_limit": limit,
+                "result_offset": offset,
+            },
+        ).execute()
+    except Exception as exc:
+        if "PGRST202" in str(exc):
+            log.warning("search_recipes RPC not found; falling back to ILIKE search")
+        else:
+            log.warning("search_recipes RPC failed; falling back to ILIKE search: %s", exc)
+        return _search_recipe_records_ilike(supa, owner_id, term, limit, offset)
+
+    records = response.data or []
+    total = int(records[0].get("total_count") or len(records)) if records else None
+    return records, total
+
+
+def _search_recipe_records_ilike(
+    supa: Client,
+    owner_id: str,
+    term: str,
+    limit: int,
+    offset: int,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    safe_term = (
+        term.replace("%", "")
+        .replace(",", " ")
+        .replace(";", " ")
+        .replace("'", " ")
+    ).strip()
+    if not safe_term:
+        safe_term = term
+    pattern = f"%{safe_term}%"
+    or_filters = [
+        f"title.ilike.{pattern}",
+        f"metadata->ai_recipe->>title.ilike.{pattern}",
+        f"metadata->ai_recipe->>description.ilike.{pattern}",
+        f"metadata->ai_recipe->>notes.ilike.{pattern}",
+        f"metadata->ai_recipe->>tags.ilike.{pattern}",
+    ]
+    response = (
+        supa.table("recipes")
+        .select(_RECIPE_LIST_COLUMNS, count="exact")
+        .eq("owner_id", owner_id)
+        .or_(",".join(or_filters))
+        .order("created_at", desc=True)
+        .range(offset, offset + limit - 1)
+        .execute()
+    )
+    return response.data or [], getattr(response, "count", None)
+
+
 @router.get("/", response_model=RecipeListResponse)
 async def list_recipes(
     user: CurrentUser = Depends(get_current_user),
@@ -371,48 +481,47 @@ async def list_recipes(
     ),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        default=None,
+        max_length=256,
+        description="next_cursor da pagina anterior (listagem sem q); substitui o offset.",
+    ),
 ) -> RecipeListResponse:
-    query = (
-        supa.table("recipes")
-        .select(
-            "recipe_id,title,metadata,created_at,updated_at,is_favorite,embedding_status,embedding_error",
-            count="exact",
-        )
-        .eq("owner_id", str(user.id))
-        .order("created_at", desc=True)
-    )
-
-    if search:
-        term = search.strip()
+    owner_id = str(user.id)
+    term = search.strip() if search else ""
+    after = None
+    if cursor:
         if term:
-            safe_term = (
-                term.replace("%", "")
-                .replace(",", " ")
-                .replace(";", " ")
-                .replace("'", " ")
-            ).strip()
-            if not safe_term:
-                safe_term = term
-            pattern = f"%{safe_term}%"
-            or_filters = [
-                f"title.ilike.{pattern}",
-                f"metadata->ai_recipe->>title.ilike.{pattern}",
-                f"metadata->ai_recipe->>description.ilike.{pattern}",
-                f"metadata->ai_recipe->>notes.ilike.{pattern}",
-                f"metadata->ai_recipe->>tags.ilike.{pattern}",
-            ]
-            query = query.or_(",".join(or_filters))
-
-    end = offset + limit - 1
-    response = query.range(offset, end).execute()
-    records = response.data or []
-    items = [_recipe_from_record(row) for row in records]
-
-    total = getattr(response, "count", None)
-    if total is None:
-        total = len(items)
+            raise HTTPException(status_code=400, detail="cursor nao se aplica a busca; use offset")
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Cursor invalido")
+
+    if term:
+        records, total = await run_in_threadpool(_search_recipe_records, supa, owner_id, term, limit, offset)
+        next_cursor = None
+    else:
+        records, total = await run_in_threadpool(_list_recipe_records, supa, owner_id, limit, offset, after)
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = records[-1]
+            next_cursor = encode_cursor(last["created_at"], last["recipe_id"])
 
-    return RecipeListResponse(items=items, total=total, limit=limit, offset=offset)
+    items = [_recipe_from_record(row) for row in records]
+    # Sem count, a ultima pagina ainda permite deduzir o total; uma pagina
+    # vazia alem do fim nao diz nada, entao o total fica desconhecido.
+    if total is None and after is None and next_cursor is None and items:
+        total = offset + len(items)
+
+    return RecipeListResponse(
+        items=items,
+        total=total,
+        limit=limit,
+        offset=0 if after else offset,
+        next_cursor=next_cursor,
+    )
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
 async def get_recipe(
@@ -422,7 +531,7 @@ async def get_recipe(
 ) -> RecipeResponse:
     response = (
         supa.table("recipes")
-        .select("recipe_id,title,metadata,created_at,updated_at,is_favorite,embedding_status,embedding_error")
+        .select(_RECIPE_LIST_COLUMNS)
         .eq("owner_id", str(user.id))
         .eq("recipe_id", recipe_id)
         .limit(1)
@@ -434,16 +543,63 @@ async def get_recipe(
     return _recipe_from_record(records[0])
 
 
-@router.post("/import", response_model=IngestResponse)
+def _job_to_response(job: Dict[str, Any], recipe: Optional[RecipeResponse] = None) -> IngestJobResponse:
+    progress = job.get("progress")
+    return IngestJobResponse(
+        jobId=str(job.get("id")),
+        status=str(job.get("status") or ingest_jobs.STATUS_QUEUED),
+        stage=_clean_str(job.get("stage")),
+        progress=float(progress) if isinstance(progress, (int, float)) else 0.0,
+        recipeId=_clean_str(job.get("recipe_id")),
+        error=_clean_str(job.get("error_message")),
+        createdAt=_clean_str(job.get("created_at")),
+        updatedAt=_clean_str(job.get("updated_at")),
+        recipe=recipe,
+    )
+
+
+async def _enqueue_import(body: IngestRequest, user: CurrentUser, supa: Client) -> JSONResponse:
+    try:
+        job = await run_in_threadpool(
+            ingest_jobs.enqueue_ingest_job,
+            supa,
+            str(user.id),
+            str(body.url),
+        )
+    except Exception:
+        log.exception("ingest.enqueue_fail url=%s owner=%s", body.url, user.id)
+        raise HTTPException(status_code=500, detail="Falha ao agendar ingestao")
+
+    log.info("ingest.queued url=%s owner=%s job=%s", body.url, user.id, job.get("id"))
+    response = _job_to_response(job)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=response.model_dump(),
+        headers={"Location": f"{router.prefix}/import/jobs/{response.jobId}"},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=IngestResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": IngestJobResponse}},
+)
 async def import_recipe(
     body: IngestRequest,
     user: CurrentUser = Depends(get_current_user),
     supa: Client = Depends(get_supabase),
-) -> IngestResponse:
+) -> IngestResponse | JSONResponse:
+    if ingest_jobs.get_ingest_queue_mode() == ingest_jobs.MODE_POSTGRES:
+        return await _enqueue_import(body, user, supa)
+
     t0 = time.time()
     log.info("ingest.start url=%s owner=%s", body.url, user.id)
     try:
-        ingest_result = await run_in_threadpool(run_ingest, str(body.url))
+        ingest_result = await run_in_threadpool(
+            run_ingest,
+            str(body.url),
+            cache=get_ingest_cache(supa),
+        )
         raw_content = ingest_result.get('raw_content')
         if not isinstance(raw_content, RawContent):
             raise RuntimeError('Ingest pipeline did not return valid raw_content')
@@ -495,6 +651,33 @@ async def import_recipe(
         log.exception("ingest.fail url=%s dt=%.2fs", body.url, dt)
         raise HTTPException(status_code=500, detail="Falha na ingestao")
 
+@router.get("/import/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_import_job(
+    job_id: str,
+    user: CurrentUser = Depends(get_current_user),
+    supa: Client = Depends(get_supabase),
+) -> IngestJobResponse:
+    job = await run_in_threadpool(ingest_jobs.get_ingest_job, supa, job_id, str(user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de ingestao nao encontrado")
+
+    recipe: Optional[RecipeResponse] = None
+    if job.get("status") == ingest_jobs.STATUS_DONE and job.get("recipe_id"):
+        response = await run_in_threadpool(
+            lambda: supa.table("recipes")
+            .select("recipe_id,title,metadata,created_at,updated_at,is_favorite,embedding_status,embedding_error")
+            .eq("owner_id", str(user.id))
+            .eq("recipe_id", str(job["recipe_id"]))
+            .limit(1)
+            .execute()
+        )
+        records = response.data or []
+        if records:
+            recipe = _recipe_from_record(records[0])
+
+    return _job_to_response(job, recipe)
+
+
 async def _update_favorite_status(
     supa: Client,
     user: CurrentUser,
@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
 from src.app.deps import get_current_user, CurrentUser
+from src.app.infra.resources import get_resources
 from src.app.infra.storage.r2_provider import R2StorageProvider
 from src.app.domain.errors import StorageError, StorageDownloadError
 
@@ -58,7 +59,7 @@ def _sanitize_filename(filename: str) -> str:
 
 def _get_storage() -> R2StorageProvider:
     try:
-        return R2StorageProvider()
+        return get_resources().storage()
     except StorageError as storage_error:
         logger.error("Failed to initialize storage: %s", storage_error)
         raise HTTPException(
@@ -71,6 +72,7 @@ def _get_storage() -> R2StorageProvider:
 async def create_signed_upload(
     request: SignedUploadRequest,
     current_user: CurrentUser = Depends(get_current_user),
+    storage: R2StorageProvider = Depends(_get_storage),
 ) -> SignedUploadResponse:
     user_id = current_user.id
 
@@ -86,8 +88,6 @@ async def create_signed_upload(
             detail=f"File too large. Maximum size: {MAX_FILE_SIZE_BYTES // (1024*1024)}MB",
         )
 
-    storage = _get_storage()
-
     safe_filename = _sanitize_filename(request.filename)
     object_key = storage.generate_object_key(
         user_id=user_id,
@@ -138,6 +138,7 @@ class VerifyUploadResponse(BaseModel):
 async def verify_upload(
     request: VerifyUploadRequest,
     current_user: CurrentUser = Depends(get_current_user),
+    storage: R2StorageProvider = Depends(_get_storage),
 ) -> VerifyUploadResponse:
     user_id = current_user.id
 
@@ -147,8 +148,6 @@ async def verify_upload(
             detail="Object key does not belong to this user",
         )
 
-    storage = _get_storage()
-
     try:
         if not storage.object_exists(request.object_key):
             return VerifyUploadResponse(exists=False)
@@ -15,10 +15,17 @@ from src.app.domain.errors import (
     JobRepositoryError,
 )
 from src.app.domain.models import JobStatus
+from src.app.infra.db.pagination import (
+    LIST_COUNT_MODE,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
 from src.app.infra.db.supabase_jobs_repo import (
     SupabaseJobQueueRepository,
     SupabaseQuotaRepository,
 )
+from src.app.infra.resources import get_resources
 from src.app.infra.storage.r2_provider import R2StorageProvider
 from src.app.services.quota_service import QuotaService
 
@@ -62,9 +69,10 @@ class JobResponse(BaseModel):
 
 class JobListResponse(BaseModel):
     jobs: list[JobResponse]
-    total: int
+    total: int | None = Field(None)
     limit: int
     offset: int
+    next_cursor: str | None = Field(None)
 
 
 class QuotaResponse(BaseModel):
@@ -84,7 +92,7 @@ def _get_quota_service() -> QuotaService:
 
 def _get_storage() -> R2StorageProvider | None:
     try:
-        return R2StorageProvider()
+        return get_resources().storage()
     except StorageError:
         return None
 
@@ -126,6 +134,7 @@ def _job_to_response(job) -> JobResponse:
 async def create_transcription_job(
     request: CreateJobRequest,
     current_user: CurrentUser = Depends(get_current_user),
+    storage: R2StorageProvider | None = Depends(_get_storage),
 ) -> JobResponse:
     user_id = current_user.id
 
@@ -135,7 +144,6 @@ async def create_transcription_job(
             detail="Object key does not belong to this user",
         )
 
-    storage = _get_storage()
     if storage:
         try:
             if not storage.object_exists(request.object_key):
@@ -220,22 +228,51 @@ async def get_transcription_job(
 async def list_transcription_jobs(
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, max_length=256),
     current_user: CurrentUser = Depends(get_current_user),
 ) -> JobListResponse:
     user_id = current_user.id
     job_repo = _get_job_repo()
 
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            )
+
     jobs = job_repo.get_jobs_by_user(
         user_id=UUID(user_id),
-        limit=limit,
+        limit=limit + 1,
         offset=offset,
+        after=after,
     )
 
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        last = jobs[-1]
+        if last.created_at:
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+    # Total so na primeira requisicao da listagem; as paginas por cursor nao recontam.
+    # Uma pagina vazia alem do fim nao revela o total; nesse caso conta.
+    total = None
+    if after is None:
+        if next_cursor is None and (jobs or offset == 0):
+            total = offset + len(jobs)
+        else:
+            total = job_repo.count_jobs_by_user(UUID(user_id), mode=LIST_COUNT_MODE)
+
     return JobListResponse(
         jobs=[_job_to_response(job) for job in jobs],
-        total=len(jobs),
+        total=total,
         limit=limit,
-        offset=offset,
+        offset=0 if after else offset,
+        next_cursor=next_cursor,
     )
 
 
@@ -54,9 +54,10 @@ class RecipeResponse(BaseModel):
 
 class RecipeListResponse(BaseModel):
     items: list[RecipeResponse]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 class IngestResponse(BaseModel):
@@ -71,3 +72,15 @@ class IngestRequest(BaseModel):
 class EmbeddingStatusResponse(BaseModel):
     status: Optional[str] = None
     error: Optional[str] = None
+
+
+class IngestJobResponse(BaseModel):
+    jobId: str
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0
+    recipeId: Optional[str] = None
+    error: Optional[str] = None
+    createdAt: Optional[str] = None
+    updatedAt: Optional[str] = None
+    recipe: Optional[RecipeResponse] = None
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+import threading
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from src.app.domain.errors import InvalidMediaError
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = "ffmpeg"
+PCM_SAMPLE_RATE = 16000
+PCM_BYTES_PER_SAMPLE = 2
+STREAM_READ_SECONDS = 1.0
+STDERR_TAIL_CHARS = 500
+FEEDER_JOIN_TIMEOUT_SECONDS = 5
+NORMALIZED_AUDIO_BITRATE = "24k"
+
+
+def ffmpeg_available(binary: str = FFMPEG_BINARY) -> bool:
+    return shutil.which(binary) is not None
+
+
+class FfmpegPipe:
+    """
+    Roda o ffmpeg com a midia chegando pelo stdin (alimentado numa thread) e
+    entrega o stdout em blocos, sem arquivo temporario. Erros da origem
+    (download) tem prioridade sobre os do ffmpeg, ja que um download cortado
+    tambem derruba a decodificacao.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[bytes],
+        output_args: list[str],
+        read_bytes: int = 64 * 1024,
+        ffmpeg_binary: str = FFMPEG_BINARY,
+    ) -> None:
+        self.source = source
+        self.output_args = output_args
+        self.read_bytes = read_bytes
+        self.ffmpeg_binary = ffmpeg_binary
+        self.bytes_produced = 0
+        self._source_error: BaseException | None = None
+        self._stderr = b""
+
+    def _command(self) -> list[str]:
+        return [
+            self.ffmpeg_binary,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            "pipe:0",
+            *self.output_args,
+            "pipe:1",
+        ]
+
+    def _feed(self, stdin: Any) -> None:
+        try:
+            for chunk in self.source:
+                stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            # ffmpeg ja saiu (erro de decodificacao ou consumidor parou).
+            pass
+        except Exception as error:
+            self._source_error = error
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    def _drain_stderr(self, stderr: Any) -> None:
+        self._stderr = stderr.read()
+
+    def __iter__(self) -> Iterator[bytes]:
+        process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        feeder = threading.Thread(target=self._feed, args=(process.stdin,), daemon=True)
+        stderr_reader = threading.Thread(target=self._drain_stderr, args=(process.stderr,), daemon=True)
+        feeder.start()
+        stderr_reader.start()
+
+        reached_eof = False
+        try:
+            while True:
+                data = process.stdout.read(self.read_bytes)
+                if not data:
+                    reached_eof = True
+                    break
+                self.bytes_produced += len(data)
+                yield data
+        finally:
+            # No EOF o ffmpeg ainda pode estar saindo: espera o exit code real
+            # em vez de matar (o que viraria falso erro de decodificacao).
+            if not reached_eof and process.poll() is None:
+                process.kill()
+            try:
+                process.wait(timeout=FEEDER_JOIN_TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            feeder.join(timeout=FEEDER_JOIN_TIMEOUT_SECONDS)
+            stderr_reader.join(timeout=FEEDER_JOIN_TIMEOUT_SECONDS)
+
+        if self._source_error is not None:
+            raise self._source_error
+
+        if process.returncode != 0:
+            # Saida parcial tambem e erro: aceitar geraria transcricao (ou audio
+            # normalizado) truncado marcado como sucesso.
+            message = self._stderr.decode("utf-8", errors="replace")[-STDERR_TAIL_CHARS:].strip()
+            if not self.bytes_produced:
+                raise InvalidMediaError(f"Could not decode media stream: {message or process.returncode}")
+            raise InvalidMediaError(
+                f"Media stream decode stopped after {self.bytes_produced} bytes "
+                f"(ffmpeg exit {process.returncode}): {message}"
+            )
+
+        if not self.bytes_produced:
+            raise InvalidMediaError("Media stream has no audio")
+
+
+class FfmpegPcmStream:
+    """Decodifica a midia enquanto ela chega em blocos float32 mono 16 kHz."""
+
+    def __init__(
+        self,
+        source: Iterable[bytes],
+        sample_rate: int = PCM_SAMPLE_RATE,
+        read_seconds: float = STREAM_READ_SECONDS,
+        ffmpeg_binary: str = FFMPEG_BINARY,
+    ) -> None:
+        self.pipe = FfmpegPipe(
+            source,
+            ["-vn", "-f", "s16le", "-ac", "1", "-ar", str(sample_rate)],
+            read_bytes=int(sample_rate * read_seconds) * PCM_BYTES_PER_SAMPLE,
+            ffmpeg_binary=ffmpeg_binary,
+        )
+        self.samples_decoded = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        import numpy as np
+
+        remainder = b""
+        for data in self.pipe:
+            data = remainder + data
+            usable = len(data) - len(data) % PCM_BYTES_PER_SAMPLE
+            remainder = data[usable:]
+            if not usable:
+                continue
+            samples = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+            self.samples_decoded += len(samples)
+            yield samples
+
+
+def encode_speech_audio(
+    source: Iterable[bytes],
+    bitrate: str = NORMALIZED_AUDIO_BITRATE,
+    ffmpeg_binary: str = FFMPEG_BINARY,
+) -> bytes:
+    """Extrai so a fala: Opus mono 16 kHz em Ogg (~11 MB por hora a 24 kbps)."""
+    pipe = FfmpegPipe(
+        source,
+        [
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(PCM_SAMPLE_RATE),
+            "-c:a",
+            "libopus",
+            "-b:a",
+            bitrate,
+            "-application",
+            "voip",
+            "-f",
+            "ogg",
+        ],
+        ffmpeg_binary=ffmpeg_binary,
+    )
+    return b"".join(pipe)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import logging
+
+from src.app.domain.errors import InvalidMediaError, StorageError
+from src.app.infra.storage.base import StorageProvider
+from src.app.services.audio_stream import encode_speech_audio
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED_AUDIO_SUFFIX = ".speech.ogg"
+NORMALIZED_AUDIO_CONTENT_TYPE = "audio/ogg"
+
+
+def normalized_audio_key(object_key: str) -> str:
+    """Chave derivada, ao lado do original: `.../abc_video.mp4.speech.ogg`."""
+    if object_key.endswith(NORMALIZED_AUDIO_SUFFIX):
+        return object_key
+    return f"{object_key}{NORMALIZED_AUDIO_SUFFIX}"
+
+
+class MediaNormalizer:
+    """
+    Extrai uma vez o audio de fala (Opus mono 16 kHz) do upload original e
+    guarda no R2; as tentativas seguintes baixam e decodificam so esse audio,
+    que tem uma fracao do tamanho do video.
+    """
+
+    def __init__(self, storage: StorageProvider) -> None:
+        self.storage = storage
+
+    def ensure_normalized(self, object_key: str) -> str:
+        """Devolve a chave a transcrever: a normalizada ou, se nao der, a original."""
+        derived_key = normalized_audio_key(object_key)
+        if derived_key == object_key:
+            return object_key
+
+        try:
+            if self.storage.object_exists(derived_key):
+                logger.info("Reusing normalized audio: %s", derived_key)
+                return derived_key
+        except StorageError as error:
+            logger.warning("Could not check normalized audio %s: %s", derived_key, error)
+            return object_key
+
+        try:
+            audio = encode_speech_audio(self.storage.iter_object_chunks(object_key))
+        except (NotImplementedError, InvalidMediaError) as error:
+            logger.warning("Audio normalization skipped for %s: %s", object_key, error)
+            return object_key
+
+        try:
+            self.storage.upload_bytes(derived_key, audio, NORMALIZED_AUDIO_CONTENT_TYPE)
+        except (NotImplementedError, StorageError) as error:
+            logger.warning("Could not store normalized audio %s: %s", derived_key, error)
+            return object_key
+
+        logger.info("Normalized audio stored: %s (%d bytes)", derived_key, len(audio))
+        return derived_key
+
+    def discard(self, object_key: str) -> None:
+        """Apaga o audio derivado quando o job termina; ele so serve para retentativas."""
+        derived_key = normalized_audio_key(object_key)
+        if derived_key == object_key:
+            return
+        try:
+            if self.storage.delete_object(derived_key):
+                logger.info("Normalized audio removed: %s", derived_key)
+        except StorageError as error:
+            logger.warning("Could not remove normalized audio %s: %s", derived_key, error)
@@ -3,9 +3,12 @@ from __future__ import annotations
 import logging
 import os
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from collections.abc import Callable
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
 
 from src.app.domain.errors import TranscriptionProcessingError, InvalidMediaError
 from src.app.domain.models import TranscriptionResult, TranscriptionSegment
@@ -15,6 +18,19 @@ logger = logging.getLogger(__name__)
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "medium")
 WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
 WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
+# 0 = CTranslate2 decide (todos os cores); o pool de replicas divide os cores entre elas.
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "2"))
+# Audios longos sao cortados nos silencios e os trechos transcritos em paralelo
+# (ate WHISPER_NUM_WORKERS chamadas simultaneas no mesmo modelo CTranslate2).
+WHISPER_LONG_MEDIA_THRESHOLD_SECONDS = float(os.getenv("WHISPER_LONG_MEDIA_THRESHOLD_SECONDS", "900"))
+WHISPER_CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "300"))
+WHISPER_LONG_MEDIA_PARALLELISM = int(os.getenv("WHISPER_LONG_MEDIA_PARALLELISM", str(WHISPER_NUM_WORKERS)))
+# No modo streaming, de quanto em quanto audio novo o VAD procura um ponto de corte.
+STREAM_VAD_STEP_SECONDS = float(os.getenv("WHISPER_STREAM_VAD_STEP_SECONDS", "30"))
+SAMPLE_RATE = 16000
+VAD_MIN_SILENCE_MS = 500
+VAD_SPEECH_PAD_MS = 200
 
 if sys.platform == "win32":
     _cuda_paths = [
@@ -85,7 +101,7 @@ def _detect_device() -> tuple[str, str]:
     return _device_info
 
 
-def _get_model() -> WhisperModel | None:
+def _get_model(cpu_threads: int | None = None) -> WhisperModel | None:
     global _model, _model_error
 
     if _model is not None:
@@ -118,7 +134,8 @@ def _get_model() -> WhisperModel | None:
             WHISPER_MODEL,
             device=device,
             compute_type=compute_type,
-            num_workers=2,
+            cpu_threads=WHISPER_CPU_THREADS if cpu_threads is None else cpu_threads,
+            num_workers=WHISPER_NUM_WORKERS,
         )
 
         logger.info("faster-whisper model initialized successfully")
@@ -131,6 +148,62 @@ def _get_model() -> WhisperModel | None:
     return _model
 
 
+def preload_model(cpu_threads: int | None = None) -> bool:
+    """Carrega o modelo agora (startup do worker) em vez de no primeiro job."""
+    return _get_model(cpu_threads) is not None
+
+
+def plan_chunks(
+    speech: list[tuple[int, int]],
+    total_samples: int,
+    target_samples: int,
+    max_samples: int | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Corta o audio em trechos de ~target_samples, sempre no meio de um silencio
+    do VAD. Com max_samples, um trecho sem silencio (musica, sem fala) que
+    passaria desse limite leva um corte fixo em target_samples.
+    """
+    chunks: list[tuple[int, int]] = []
+    chunk_start = 0
+
+    def force_cuts(until: int) -> None:
+        nonlocal chunk_start
+        while max_samples and until - chunk_start > max_samples:
+            chunks.append((chunk_start, chunk_start + target_samples))
+            chunk_start += target_samples
+
+    for (_, previous_end), (next_start, _) in zip(speech, speech[1:]):
+        cut = (previous_end + next_start) // 2
+        force_cuts(cut)
+        if cut - chunk_start >= target_samples:
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    force_cuts(total_samples)
+    chunks.append((chunk_start, total_samples))
+    return chunks
+
+
+class _ChunkProgress:
+    """Soma o audio processado de todos os trechos em paralelo num unico callback."""
+
+    def __init__(self, callback: Callable[[float], None] | None) -> None:
+        self._processed: dict[int, float] = {}
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def callback_for(self, index: int) -> Callable[[float], None] | None:
+        if self._callback is None:
+            return None
+
+        def report(segment_end: float) -> None:
+            with self._lock:
+                self._processed[index] = max(self._processed.get(index, 0.0), segment_end)
+                self._callback(sum(self._processed.values()))
+
+        return report
+
+
 class TranscriptionPipeline:
     def __init__(self, language: str = "pt"):
         self.language = language
@@ -154,63 +227,244 @@ class TranscriptionPipeline:
         try:
             logger.info("Starting transcription: path=%s, language=%s", media_path, self.language)
 
-            segments_iter, info = model.transcribe(
-                str(media_path),
-                language=self.language,
-                vad_filter=True,
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,
-                    speech_pad_ms=200,
-                ),
-                beam_size=WHISPER_BEAM_SIZE,
-                condition_on_previous_text=False,
-                word_timestamps=False,
-            )
+            audio = self._decode_for_chunking(media_path)
+            if audio is not None and len(audio) / SAMPLE_RATE >= WHISPER_LONG_MEDIA_THRESHOLD_SECONDS:
+                segments, detected_language, duration_sec = self._transcribe_chunked(
+                    model,
+                    audio,
+                    progress_callback,
+                )
+            else:
+                source = audio if audio is not None else str(media_path)
+                segments, detected_language, duration_sec = self._transcribe_source(
+                    model,
+                    source,
+                    progress_callback,
+                )
+
+            return self._build_result(segments, detected_language, duration_sec)
+
+        except (RuntimeError, ValueError) as transcription_error:
+            logger.error("Transcription failed: %s", transcription_error)
+            raise TranscriptionProcessingError(
+                f"Transcription failed: {transcription_error}",
+                retryable=True,
+            ) from transcription_error
 
-            segments: list[TranscriptionSegment] = []
-            text_parts: list[str] = []
+    def _transcribe_source(
+        self,
+        model: WhisperModel,
+        source: str | Any,
+        progress_callback: Callable[[float], None] | None,
+        offset_sec: float = 0.0,
+    ) -> tuple[list[TranscriptionSegment], str, float]:
+        segments_iter, info = model.transcribe(
+            source,
+            language=self.language,
+            vad_filter=True,
+            vad_parameters=dict(
+                min_silence_duration_ms=VAD_MIN_SILENCE_MS,
+                speech_pad_ms=VAD_SPEECH_PAD_MS,
+            ),
+            beam_size=WHISPER_BEAM_SIZE,
+            condition_on_previous_text=False,
+            word_timestamps=False,
+        )
 
-            for seg in segments_iter:
-                text = seg.text.strip()
-                if text:
-                    segments.append(TranscriptionSegment(
-                        start=seg.start,
-                        end=seg.end,
-                        text=text,
-                    ))
-                    text_parts.append(text)
-                if progress_callback:
-                    progress_callback(float(seg.end))
-
-            full_text = " ".join(text_parts).strip()
-            duration_sec = info.duration if hasattr(info, 'duration') else 0
-            detected_language = info.language if hasattr(info, 'language') else self.language
-
-            result = TranscriptionResult(
-                text=full_text,
-                segments=segments,
-                language=detected_language,
-                duration_sec=duration_sec,
-                model_version=self.model_version,
-            )
+        segments: list[TranscriptionSegment] = []
+        for seg in segments_iter:
+            text = seg.text.strip()
+            if text:
+                segments.append(TranscriptionSegment(
+                    start=seg.start + offset_sec,
+                    end=seg.end + offset_sec,
+                    text=text,
+                ))
+            if progress_callback:
+                progress_callback(float(seg.end))
+
+        duration_sec = info.duration if hasattr(info, 'duration') else 0
+        detected_language = info.language if hasattr(info, 'language') else self.language
+        return segments, detected_language, duration_sec
+
+    def _decode_for_chunking(self, media_path: Path) -> Any | None:
+        if WHISPER_LONG_MEDIA_PARALLELISM <= 1:
+            return None
+        try:
+            from faster_whisper.audio import decode_audio
+        except ImportError:
+            return None
+        return decode_audio(str(media_path), sampling_rate=SAMPLE_RATE)
 
-            logger.info(
-                "Transcription complete: duration=%.1fs, segments=%d, chars=%d, language=%s",
-                duration_sec,
-                len(segments),
-                len(full_text),
-                detected_language,
+    def _transcribe_chunked(
+        self,
+        model: WhisperModel,
+        audio: Any,
+        progress_callback: Callable[[float], None] | None,
+    ) -> tuple[list[TranscriptionSegment], str, float]:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        speech = get_speech_timestamps(
+            audio,
+            VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, speech_pad_ms=VAD_SPEECH_PAD_MS),
+        )
+        target_samples = int(WHISPER_CHUNK_SECONDS * SAMPLE_RATE)
+        chunks = plan_chunks(
+            [(item["start"], item["end"]) for item in speech],
+            len(audio),
+            target_samples,
+            max_samples=2 * target_samples,
+        )
+        logger.info(
+            "Long media: splitting %.1fs of audio into %d chunks (parallelism=%d)",
+            len(audio) / SAMPLE_RATE,
+            len(chunks),
+            WHISPER_LONG_MEDIA_PARALLELISM,
+        )
+
+        progress = _ChunkProgress(progress_callback)
+        with ThreadPoolExecutor(
+            max_workers=min(WHISPER_LONG_MEDIA_PARALLELISM, len(chunks)),
+            thread_name_prefix="whisper-chunk",
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._transcribe_source,
+                    model,
+                    audio[start:end],
+                    progress.callback_for(index),
+                    start / SAMPLE_RATE,
+                )
+                for index, (start, end) in enumerate(chunks)
+            ]
+            results = [future.result() for future in futures]
+
+        segments, detected_language = self._stitch(results)
+        return segments, detected_language, len(audio) / SAMPLE_RATE
+
+    def _stitch(
+        self,
+        results: list[tuple[list[TranscriptionSegment], str, float]],
+    ) -> tuple[list[TranscriptionSegment], str]:
+        segments = [segment for chunk_segments, _, _ in results for segment in chunk_segments]
+        languages = Counter(language for _, language, _ in results if language)
+        detected_language = languages.most_common(1)[0][0] if languages else self.language
+        return segments, detected_language
+
+    def transcribe_stream(
+        self,
+        pcm_blocks: Iterable[Any],
+        progress_callback: Callable[[float], None] | None = None,
+    ) -> TranscriptionResult:
+        """
+        Transcreve PCM mono 16 kHz conforme ele chega (ex.: FfmpegPcmStream):
+        cada trecho fechado num silencio do VAD vai para a transcricao enquanto
+        o resto do audio ainda esta sendo baixado/decodificado.
+        """
+        import numpy as np
+
+        model = _get_model()
+        if model is None:
+            raise TranscriptionProcessingError(
+                "Whisper model not available",
+                retryable=False,
             )
 
-            return result
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        vad_options = VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, speech_pad_ms=VAD_SPEECH_PAD_MS)
+        target_samples = int(WHISPER_CHUNK_SECONDS * SAMPLE_RATE)
+        check_step = int(STREAM_VAD_STEP_SECONDS * SAMPLE_RATE)
+        progress = _ChunkProgress(progress_callback)
+        futures: list[Future] = []
+
+        try:
+            logger.info("Starting streaming transcription: language=%s", self.language)
+            with ThreadPoolExecutor(
+                max_workers=max(1, WHISPER_LONG_MEDIA_PARALLELISM),
+                thread_name_prefix="whisper-stream",
+            ) as executor:
+
+                def submit(audio: Any, offset_samples: int) -> None:
+                    futures.append(executor.submit(
+                        self._transcribe_source,
+                        model,
+                        audio,
+                        progress.callback_for(len(futures)),
+                        offset_samples / SAMPLE_RATE,
+                    ))
+
+                buffer = np.zeros(0, dtype=np.float32)
+                pending: list[Any] = []
+                pending_samples = 0
+                buffer_offset = 0
+                total_samples = 0
+
+                for block in pcm_blocks:
+                    pending.append(block)
+                    pending_samples += len(block)
+                    total_samples += len(block)
+                    if pending_samples < check_step or len(buffer) + pending_samples <= target_samples:
+                        continue
+
+                    buffer = np.concatenate([buffer, *pending])
+                    pending, pending_samples = [], 0
+                    speech = get_speech_timestamps(buffer, vad_options)
+                    # O corte forcado limita o buffer (e o VAD refeito sobre ele)
+                    # a ~2 trechos mesmo quando nao ha silencio nenhum.
+                    chunks = plan_chunks(
+                        [(item["start"], item["end"]) for item in speech],
+                        len(buffer),
+                        target_samples,
+                        max_samples=2 * target_samples,
+                    )
+                    for start, end in chunks[:-1]:
+                        submit(buffer[start:end], buffer_offset + start)
+                    cut = chunks[-1][0]
+                    buffer = buffer[cut:]
+                    buffer_offset += cut
+
+                if pending:
+                    buffer = np.concatenate([buffer, *pending])
+                if len(buffer):
+                    submit(buffer, buffer_offset)
+
+                results = [future.result() for future in futures]
+
+            segments, detected_language = self._stitch(results)
+            return self._build_result(segments, detected_language, total_samples / SAMPLE_RATE)
 
         except (RuntimeError, ValueError) as transcription_error:
-            logger.error("Transcription failed: %s", transcription_error)
+            logger.error("Streaming transcription failed: %s", transcription_error)
             raise TranscriptionProcessingError(
                 f"Transcription failed: {transcription_error}",
                 retryable=True,
             ) from transcription_error
 
+    def _build_result(
+        self,
+        segments: list[TranscriptionSegment],
+        detected_language: str,
+        duration_sec: float,
+    ) -> TranscriptionResult:
+        full_text = " ".join(segment.text for segment in segments).strip()
+
+        logger.info(
+            "Transcription complete: duration=%.1fs, segments=%d, chars=%d, language=%s",
+            duration_sec,
+            len(segments),
+            len(full_text),
+            detected_language,
+        )
+
+        return TranscriptionResult(
+            text=full_text,
+            segments=segments,
+            language=detected_language,
+            duration_sec=duration_sec,
+            model_version=self.model_version,
+        )
+
     def get_model_info(self) -> dict[str, str | bool]:
         model = _get_model()
         if model is None:
@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any
+
+from src.app.domain.errors import InvalidMediaError, TranscriptionProcessingError
+from src.app.domain.models import TranscriptionResult, TranscriptionSegment
+from src.app.services.transcription_pipeline import (
+    WHISPER_MODEL,
+    TranscriptionPipeline,
+    _detect_device,
+    preload_model,
+)
+
+logger = logging.getLogger(__name__)
+
+# "auto" dimensiona pelo numero de cores e memoria livre; um inteiro fixa o tamanho.
+WHISPER_REPLICAS = os.getenv("WHISPER_REPLICAS", "1")
+WHISPER_REPLICA_MAX_RSS_MB = int(os.getenv("WHISPER_REPLICA_MAX_RSS_MB", "0"))
+WHISPER_REPLICA_STARTUP_TIMEOUT_SECONDS = float(os.getenv("WHISPER_REPLICA_STARTUP_TIMEOUT_SECONDS", "600"))
+WHISPER_REPLICA_IDLE_TIMEOUT_SECONDS = float(os.getenv("WHISPER_REPLICA_IDLE_TIMEOUT_SECONDS", "600"))
+WHISPER_REPLICA_PING_TIMEOUT_SECONDS = float(os.getenv("WHISPER_REPLICA_PING_TIMEOUT_SECONDS", "10"))
+MIN_THREADS_PER_REPLICA = 2
+MEMORY_HEADROOM_RATIO = 0.8
+STOP_TIMEOUT_SECONDS = 5.0
+
+# Memoria aproximada (MB) de uma replica em CPU/int8, usada para dimensionar o pool.
+_MODEL_MEMORY_MB = {"tiny": 400, "base": 500, "small": 1000, "medium": 2000, "large": 4000}
+_DEFAULT_MODEL_MEMORY_MB = 2000
+
+
+def _current_rss_mb() -> float:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+
+        # ru_maxrss e o pico (KB no Linux): serve como aproximacao conservadora.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _available_memory_mb() -> float | None:
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo", encoding="ascii") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def resolve_replica_count(
+    setting: str = WHISPER_REPLICAS,
+    model_name: str = WHISPER_MODEL,
+    device: str | None = None,
+) -> int:
+    if setting.strip().lower() != "auto":
+        return max(1, int(setting))
+    if device is None:
+        device, _ = _detect_device()
+    if device == "cuda":
+        # Uma GPU: replicas extras so disputariam a mesma memoria de video.
+        return 1
+    cores = os.cpu_count() or 1
+    by_cpu = max(1, cores // MIN_THREADS_PER_REPLICA)
+    per_replica_mb = _MODEL_MEMORY_MB.get(model_name.split("-")[0], _DEFAULT_MODEL_MEMORY_MB)
+    available_mb = _available_memory_mb()
+    by_memory = max(1, int(available_mb * MEMORY_HEADROOM_RATIO // per_replica_mb)) if available_mb else 1
+    return min(by_cpu, by_memory)
+
+
+def threads_per_replica(replicas: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, replicas))
+
+
+def _default_pipeline_factory(language: str) -> TranscriptionPipeline:
+    return TranscriptionPipeline(language=language)
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    cpu_threads: int = 0
+    max_rss_mb: int = WHISPER_REPLICA_MAX_RSS_MB
+    pipeline_factory: Callable[[str], Any] = _default_pipeline_factory
+    preload: Callable[[int], bool] = preload_model
+
+
+def _replica_main(conn: Connection, settings: ReplicaSettings) -> None:
+    """Loop do processo filho: carrega o modelo uma vez e atende pedidos pelo pipe."""
+    try:
+        loaded = bool(settings.preload(settings.cpu_threads))
+    except Exception as exc:
+        logger.error("Whisper replica failed to preload model: %s", exc)
+        loaded = False
+    conn.send(("ready", os.getpid(), loaded))
+
+    pipelines: dict[str, Any] = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        command = message[0]
+        if command == "stop":
+            break
+        if command == "ping":
+            conn.send(("pong", _current_rss_mb()))
+            continue
+        if command != "transcribe":
+            continue
+
+        _, media_path, language = message
+        pipeline = pipelines.get(language)
+        if pipeline is None:
+            pipeline = settings.pipeline_factory(language)
+            pipelines[language] = pipeline
+        try:
+            result = pipeline.transcribe(
+                Path(media_path),
+                progress_callback=lambda end: conn.send(("progress", end)),
+            )
+        except InvalidMediaError as exc:
+            conn.send(("invalid_media", str(exc)))
+        except TranscriptionProcessingError as exc:
+            conn.send(("error", str(exc), exc.retryable))
+        except Exception as exc:
+            conn.send(("error", f"Transcription failed: {exc}", True))
+        else:
+            conn.send(("result", asdict(result), _current_rss_mb()))
+
+
+def _result_from_dict(data: dict[str, Any]) -> TranscriptionResult:
+    return TranscriptionResult(
+        text=data["text"],
+        segments=[TranscriptionSegment(**segment) for segment in data["segments"]],
+        language=data["language"],
+        duration_sec=data["duration_sec"],
+        model_version=data["model_version"],
+    )
+
+
+class WhisperReplica:
+    """Um processo filho com o modelo carregado, falando com o pai por um Pipe."""
+
+    def __init__(
+        self,
+        index: int,
+        settings: ReplicaSettings,
+        context: Any,
+        idle_timeout_seconds: float = WHISPER_REPLICA_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.index = index
+        self.settings = settings
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._context = context
+        self.process: Any | None = None
+        self._conn: Connection | None = None
+        self.healthy = False
+        self.model_loaded = False
+        self.jobs_done = 0
+
+    @property
+    def pid(self) -> int | None:
+        return self.process.pid if self.process is not None else None
+
+    def launch(self) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_replica_main,
+            args=(child_conn, self.settings),
+            name=f"whisper-replica-{self.index}",
+            daemon=True,
+        )
+        process.start()
+        # O pai fecha a ponta do filho para receber EOF se o processo morrer.
+        child_conn.close()
+        self.process = process
+        self._conn = parent_conn
+        self.healthy = False
+
+    def wait_ready(self, timeout: float) -> None:
+        if self._conn is None or not self._conn.poll(timeout):
+            self.stop()
+            raise TranscriptionProcessingError(f"Whisper replica {self.index} did not start", retryable=True)
+        try:
+            _, pid, loaded = self._conn.recv()
+        except (EOFError, OSError) as exc:
+            self.stop()
+            raise TranscriptionProcessingError(f"Whisper replica {self.index} crashed on startup", retryable=True) from exc
+        self.healthy = True
+        self.model_loaded = bool(loaded)
+        logger.info("Whisper replica ready: index=%d, pid=%s, model_loaded=%s", self.index, pid, loaded)
+
+    def start(self, timeout: float = WHISPER_REPLICA_STARTUP_TIMEOUT_SECONDS) -> None:
+        self.launch()
+        self.wait_ready(timeout)
+
+    def restart(self, timeout: float = WHISPER_REPLICA_STARTUP_TIMEOUT_SECONDS) -> None:
+        logger.warning("Restarting whisper replica %d (pid=%s)", self.index, self.pid)
+        self.stop()
+        self.start(timeout)
+
+    def ping(self, timeout: float = WHISPER_REPLICA_PING_TIMEOUT_SECONDS) -> float | None:
+        """RSS do processo em MB, ou None se a replica nao respondeu."""
+        if self._conn is None or self.process is None or not self.process.is_alive():
+            self.healthy = False
+            return None
+        try:
+            self._conn.send(("ping",))
+            if not self._conn.poll(timeout):
+                self.healthy = False
+                return None
+            _, rss_mb = self._conn.recv()
+        except (EOFError, OSError):
+            self.healthy = False
+            return None
+        return float(rss_mb)
+
+    def transcribe(
+        self,
+        media_path: Path,
+        language: str,
+        progress_callback: Callable[[float], None] | None = None,
+    ) -> tuple[TranscriptionResult, float]:
+        if self._conn is None:
+            raise TranscriptionProcessingError(f"Whisper replica {self.index} not started", retryable=True)
+        try:
+            self._conn.send(("transcribe", str(media_path), language))
+            while True:
+                if not self._conn.poll(self.idle_timeout_seconds):
+                    self.healthy = False
+                    raise TranscriptionProcessingError(
+                        f"Whisper replica {self.index} stopped responding",
+                        retryable=True,
+                    )
+                message = self._conn.recv()
+                kind = message[0]
+                if kind == "progress":
+                    if progress_callback:
+                        progress_callback(float(message[1]))
+                    continue
+                if kind == "result":
+                    self.jobs_done += 1
+                    return _result_from_dict(message[1]), float(message[2])
+                if kind == "invalid_media":
+                    raise InvalidMediaError(message[1])
+                if kind == "error":
+                    raise TranscriptionProcessingError(message[1], retryable=bool(message[2]))
+        except (EOFError, OSError) as exc:
+            self.healthy = False
+            raise TranscriptionProcessingError(
+                f"Whisper replica {self.index} died during transcription",
+                retryable=True,
+            ) from exc
+
+    def stop(self) -> None:
+        conn, self._conn = self._conn, None
+        process, self.process = self.process, None
+        self.healthy = False
+        if conn is not None:
+            try:
+                conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+        if process is not None:
+            process.join(STOP_TIMEOUT_SECONDS)
+            if process.is_alive():
+                process.terminate()
+                process.join(STOP_TIMEOUT_SECONDS)
+        if conn is not None:
+            conn.close()
+
+
+class WhisperReplicaPool:
+    """
+    N replicas do faster-whisper em processos separados, carregadas no startup.
+    Cada transcricao pega uma replica livre; replicas que morrem, travam ou
+    passam do limite de memoria sao reiniciadas sem afetar as demais.
+    """
+
+    def __init__(
+        self,
+        replicas: int,
+        settings: ReplicaSettings | None = None,
+        start_method: str = "spawn",
+        startup_timeout_seconds: float = WHISPER_REPLICA_STARTUP_TIMEOUT_SECONDS,
+        idle_timeout_seconds: float = WHISPER_REPLICA_IDLE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.settings = settings or ReplicaSettings(cpu_threads=threads_per_replica(replicas))
+        self.startup_timeout_seconds = startup_timeout_seconds
+        context = multiprocessing.get_context(start_method)
+        self.replicas = [
+            WhisperReplica(index, self.settings, context, idle_timeout_seconds)
+            for index in range(max(1, replicas))
+        ]
+        self._idle: "queue.Queue[WhisperReplica]" = queue.Queue()
+        self._restart_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self.replicas)
+
+    def start(self) -> None:
+        # Dispara todos os processos antes de esperar: os modelos carregam em paralelo.
+        for replica in self.replicas:
+            replica.launch()
+        for replica in self.replicas:
+            replica.wait_ready(self.startup_timeout_seconds)
+            self._idle.put(replica)
+        logger.info(
+            "Whisper pool started: replicas=%d, cpu_threads=%d, max_rss_mb=%d",
+            self.size,
+            self.settings.cpu_threads,
+            self.settings.max_rss_mb,
+        )
+
+    def _restart(self, replica: WhisperReplica) -> None:
+        try:
+            replica.restart(self.startup_timeout_seconds)
+        except TranscriptionProcessingError:
+            logger.exception("Failed to restart whisper replica %d", replica.index)
+
+    def transcribe(
+        self,
+        media_path: Path,
+        language: str,
+        progress_callback: Callable[[float], None] | None = None,
+    ) -> TranscriptionResult:
+        replica = self._idle.get()
+        try:
+            if not replica.healthy:
+                self._restart(replica)
+            result, rss_mb = replica.transcribe(media_path, language, progress_callback)
+            if self.settings.max_rss_mb and rss_mb > self.settings.max_rss_mb:
+                logger.warning(
+                    "Whisper replica %d over memory limit (%.0fMB > %dMB), recycling",
+                    replica.index,
+                    rss_mb,
+                    self.settings.max_rss_mb,
+                )
+                self._restart(replica)
+            return result
+        except TranscriptionProcessingError:
+            if not replica.healthy:
+                self._restart(replica)
+            raise
+        finally:
+            self._idle.put(replica)
+
+    def health_check(self) -> int:
+        """Pinga as replicas ociosas e reinicia as que nao respondem; devolve quantas reiniciou."""
+        idle: list[WhisperReplica] = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        restarted = 0
+        try:
+            for replica in idle:
+                rss_mb = replica.ping()
+                over_limit = bool(self.settings.max_rss_mb) and rss_mb is not None and rss_mb > self.settings.max_rss_mb
+                if rss_mb is None or over_limit:
+                    self._restart(replica)
+                    restarted += 1
+        finally:
+            for replica in idle:
+                self._idle.put(replica)
+        return restarted
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.stop()
+
+
+class PooledTranscriptionPipeline:
+    """Mesma interface do TranscriptionPipeline, executando nas replicas do pool."""
+
+    def __init__(self, pool: WhisperReplicaPool, language: str = "pt", model_version: str = WHISPER_MODEL) -> None:
+        self.pool = pool
+        self.language = language
+        self.model_version = model_version
+
+    @property
+    def concurrency(self) -> int:
+        return self.pool.size
+
+    def transcribe(
+        self,
+        media_path: Path,
+        progress_callback: Callable[[float], None] | None = None,
+    ) -> TranscriptionResult:
+        if not media_path.exists():
+            raise InvalidMediaError(f"Media file not found: {media_path}")
+        return self.pool.transcribe(media_path, self.language, progress_callback)
+
+    def health_check(self) -> int:
+        return self.pool.health_check()
+
+    def close(self) -> None:
+        self.pool.close()
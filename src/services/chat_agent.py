@@ -1,22 +1,25 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable, Mapping
+from typing import AsyncIterator, Iterable, Mapping
 
 from src.app.config import settings
-from src.services.gemini_client import GeminiClient
+from src.services.gemini_client import GeminiClient, get_gemini_client
+from src.services.gemini_quota import PRIORITY_CHAT
 
 CHAT_SYSTEM_PROMPT = Path("data/Prompt/CHAT_SYSTEM_PROMPT.txt")
 _MODEL_NAME = "gemini-2.5-flash"
 
 
-def run_chat_agent(
+def _build_client() -> GeminiClient:
+    return get_gemini_client(settings.GEMINI_API_KEY.get_secret_value(), _MODEL_NAME)
+
+
+def build_chat_prompt(
     history: Iterable[Mapping[str, str]],
     user_message: str,
     context: str | None = None,
 ) -> str:
-    client = GeminiClient(api_key=settings.GEMINI_API_KEY.get_secret_value(), model_name=_MODEL_NAME)
-
     prompt_sections: list[str] = []
 
     cleaned_context = context.strip() if context else ""
@@ -51,6 +54,38 @@ def run_chat_agent(
         f"{user_message.strip()}"
     )
 
-    payload = "\n\n".join(section for section in prompt_sections if section)
-    response = client.generate_content(payload, CHAT_SYSTEM_PROMPT)
+    return "\n\n".join(section for section in prompt_sections if section)
+
+
+def run_chat_agent(
+    history: Iterable[Mapping[str, str]],
+    user_message: str,
+    context: str | None = None,
+) -> str:
+    payload = build_chat_prompt(history, user_message, context)
+    response = _build_client().generate_content(payload, CHAT_SYSTEM_PROMPT, priority=PRIORITY_CHAT)
+    return response.strip()
+
+
+async def run_chat_agent_async(
+    history: Iterable[Mapping[str, str]],
+    user_message: str,
+    context: str | None = None,
+) -> str:
+    payload = build_chat_prompt(history, user_message, context)
+    response = await _build_client().generate_content_async(
+        payload, CHAT_SYSTEM_PROMPT, priority=PRIORITY_CHAT
+    )
     return response.strip()
+
+
+async def stream_chat_agent(
+    history: Iterable[Mapping[str, str]],
+    user_message: str,
+    context: str | None = None,
+) -> AsyncIterator[str]:
+    payload = build_chat_prompt(history, user_message, context)
+    async for delta in _build_client().stream_content_async(
+        payload, CHAT_SYSTEM_PROMPT, priority=PRIORITY_CHAT
+    ):
+        yield delta
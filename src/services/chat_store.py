@@ -1,18 +1,24 @@
 from __future__ import annotations
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from src.services.chat_agent import run_chat_agent
+from src.services.chat_agent import run_chat_agent, run_chat_agent_async, stream_chat_agent
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 from src.app.deps import CurrentUser
-from src.services.embedding import embedding_query
+from src.services.embedding import EMBEDDING_MODEL, embedding_query
+from src.services.embedding_cache import embed_query_cached
 from src.services import persist_supabase
 
 
 MAX_CONTEXT_CHARS = 4000
 MAX_HISTORY_MESSAGES = 50
+CHAT_ERROR_FALLBACK = "Não foi possível gerar uma resposta agora. Tente novamente em instantes."
+CHAT_TRUNCATED_MARKER = "\n\n[Resposta interrompida]"
 logger = logging.getLogger(__name__)
 
 
@@ -45,16 +51,7 @@ def send_message(
         chat_id=chat_id,
     )
 
-    normalized_chat_id: Optional[str] = None
-    if isinstance(user_record, dict):
-        chat_id_value = user_record.get("chat_id")
-        if chat_id_value:
-            normalized_chat_id = str(chat_id_value)
-
-    if not normalized_chat_id:
-        normalized_chat_id = str(chat_id or uuid4())
-        if isinstance(user_record, dict):
-            user_record["chat_id"] = normalized_chat_id
+    normalized_chat_id = _resolve_chat_id(user_record, chat_id)
 
     # 2. Busca o contexto relevante (da receita específica ou por similaridade)
     context_text, context_recipe_ids = get_context(
@@ -71,21 +68,14 @@ def send_message(
         limit=MAX_HISTORY_MESSAGES,
         chat_id=normalized_chat_id,
     )
-    history_payload = _build_history_payload(full_history)
-
-    if history_payload:
-        last_entry = history_payload[-1]
-        if last_entry.get("role") == "user" and last_entry.get("content") == message:
-            history_payload = history_payload[:-1]
+    history_payload = _history_without_current(full_history, message)
 
     # 4. Chama o agente com o histórico correto e o contexto
     try:
         assistant_text = run_chat_agent(history_payload, message, context_text)
     except Exception as exc:
         logger.exception("Erro ao executar agente de chat")
-        assistant_text = (
-            "Não foi possível gerar uma resposta agora. Tente novamente em instantes."
-        )
+        assistant_text = CHAT_ERROR_FALLBACK
 
     # 5. Salva a resposta do assistente no banco de dados
     assistant_record = persist_supabase.save_chat_message(
@@ -106,6 +96,173 @@ def send_message(
     return {"user": formatted_user, "assistant": formatted_assistant}
 
 
+@dataclass
+class _ChatTurn:
+    user_id: str
+    chat_id: str
+    user_record: Dict[str, Any]
+    history: List[Dict[str, str]]
+    context_text: Optional[str]
+    context_recipe_ids: List[str]
+
+
+async def send_message_async(
+    user: CurrentUser,
+    supa: Client,
+    message: str,
+    recipe_id: Optional[str] = None,
+    client_message_id: Optional[str] = None,
+    chat_id: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Versão assíncrona de `send_message`. Salvar a mensagem do usuário, buscar
+    o histórico e recuperar o contexto são independentes e rodam em paralelo;
+    as chamadas ao Supabase vão para o threadpool e o Gemini usa a API async.
+    """
+    turn = await _prepare_turn(user, supa, message, recipe_id, client_message_id, chat_id)
+
+    try:
+        assistant_text = await run_chat_agent_async(turn.history, message, turn.context_text)
+    except Exception:
+        logger.exception("Erro ao executar agente de chat")
+        assistant_text = CHAT_ERROR_FALLBACK
+
+    assistant_record = await _save_assistant_message(turn, supa, assistant_text)
+    return {
+        "user": _format_chat_message(turn.user_record),
+        "assistant": _format_chat_message(assistant_record),
+    }
+
+
+async def stream_message(
+    user: CurrentUser,
+    supa: Client,
+    message: str,
+    recipe_id: Optional[str] = None,
+    client_message_id: Optional[str] = None,
+    chat_id: Optional[str] = None,
+) -> AsyncIterator[tuple[str, Dict[str, Any]]]:
+    """
+    Igual a `send_message_async`, mas devolve a resposta aos poucos.
+    Emite ("user", mensagem), vários ("delta", {"content": trecho}) e por fim
+    ("assistant", mensagem) depois que a resposta completa foi salva.
+    """
+    turn = await _prepare_turn(user, supa, message, recipe_id, client_message_id, chat_id)
+    parts: List[str] = []
+    save_started = False
+    try:
+        yield "user", _format_chat_message(turn.user_record)
+
+        try:
+            async for delta in stream_chat_agent(turn.history, message, turn.context_text):
+                parts.append(delta)
+                yield "delta", {"content": delta}
+        except Exception:
+            logger.exception("Erro ao executar agente de chat em streaming")
+            # Resposta parcial nao pode ser salva como se estivesse completa.
+            suffix = CHAT_TRUNCATED_MARKER if parts else CHAT_ERROR_FALLBACK
+            parts.append(suffix)
+            yield "delta", {"content": suffix}
+
+        save_started = True
+        assistant_record = await _save_assistant_message(turn, supa, _assistant_text(parts))
+        yield "assistant", _format_chat_message(assistant_record)
+    finally:
+        if not save_started:
+            # Cliente desconectou no meio do streaming: o gerador esta sendo
+            # cancelado, entao salva em outra task para nao deixar o turno do
+            # usuario sem resposta no historico.
+            parts.append(CHAT_TRUNCATED_MARKER)
+            _save_in_background(turn, supa, _assistant_text(parts))
+
+
+_background_saves: set[asyncio.Task] = set()
+
+
+def _assistant_text(parts: List[str]) -> str:
+    text = "".join(parts).strip()
+    if not text or text == CHAT_TRUNCATED_MARKER.strip():
+        return CHAT_ERROR_FALLBACK
+    return text
+
+
+def _save_in_background(turn: _ChatTurn, supa: Client, assistant_text: str) -> None:
+    task = asyncio.get_running_loop().create_task(_save_assistant_message(turn, supa, assistant_text))
+    _background_saves.add(task)
+    task.add_done_callback(_background_saves.discard)
+
+
+async def _prepare_turn(
+    user: CurrentUser,
+    supa: Client,
+    message: str,
+    recipe_id: Optional[str],
+    client_message_id: Optional[str],
+    chat_id: Optional[str],
+) -> _ChatTurn:
+    user_id = str(user.id)
+    requested_chat_id = str(chat_id) if chat_id else None
+    pending_chat_id = requested_chat_id or str(uuid4())
+
+    save_task = run_in_threadpool(
+        persist_supabase.save_chat_message,
+        user_id,
+        "user",
+        message,
+        supa,
+        recipe_id=recipe_id,
+        client_message_id=client_message_id,
+        chat_id=pending_chat_id,
+    )
+    context_task = get_context_async(message=message, recipe_id=recipe_id, user=user, supa=supa)
+    # Conversa nova não tem histórico anterior para buscar.
+    history_task = (
+        run_in_threadpool(
+            persist_supabase.get_chat_history,
+            user_id,
+            supa,
+            limit=MAX_HISTORY_MESSAGES,
+            chat_id=requested_chat_id,
+        )
+        if requested_chat_id
+        else _empty_history()
+    )
+
+    user_record, (context_text, context_recipe_ids), full_history = await asyncio.gather(
+        save_task,
+        context_task,
+        history_task,
+    )
+
+    return _ChatTurn(
+        user_id=user_id,
+        chat_id=_resolve_chat_id(user_record, pending_chat_id),
+        user_record=user_record,
+        history=_history_without_current(full_history, message),
+        context_text=context_text,
+        context_recipe_ids=context_recipe_ids,
+    )
+
+
+async def _save_assistant_message(turn: _ChatTurn, supa: Client, assistant_text: str) -> Dict[str, Any]:
+    assistant_record = await run_in_threadpool(
+        persist_supabase.save_chat_message,
+        turn.user_id,
+        "assistant",
+        assistant_text,
+        supa,
+        related_recipe_ids=turn.context_recipe_ids or None,
+        chat_id=turn.chat_id,
+    )
+    if isinstance(assistant_record, dict) and "chat_id" not in assistant_record:
+        assistant_record["chat_id"] = turn.chat_id
+    return assistant_record
+
+
+async def _empty_history() -> List[Dict[str, Any]]:
+    return []
+
+
 def list_messages(
     user_id: str,
     supa: Client,
@@ -191,24 +348,14 @@ def get_context(
             return None, [str(recipe_id)]
 
         chunks = persist_supabase.get_recipe_chunks(supa, recipe_id)
-        if not chunks:
-            return None, [str(recipe_id)]
-
-        context_parts: List[str] = []
-        for chunk in chunks:
-            compressed = compress_chunk_text(chunk.get("chunk_text", ""))
-            if compressed:
-                context_parts.append(compressed)
-
-        context_text = _truncate_context("\n\n".join(context_parts).strip())
-        return (context_text or None, [str(recipe_id)])
+        return _build_recipe_context(recipe_id, chunks)
 
     # Cenário 2: O usuário faz uma pergunta genérica
     if not persist_supabase.has_completed_embeddings(supa, user_id):
         return None, []
 
     try:
-        message_embeded = embedding_query(message)
+        message_embeded = embed_query_cached(message, embedding_query, EMBEDDING_MODEL, supa)
     except Exception as exc:
         logger.exception("Erro ao gerar embedding da mensagem")
         return None, []
@@ -216,8 +363,69 @@ def get_context(
         supa,
         user_id,
         message_embeded,
+        query_text=message,
     )
+    return _build_similarity_context(similar_chunks)
+
+
+async def get_context_async(
+    message: str,
+    recipe_id: Optional[str],
+    user: CurrentUser,
+    supa: Client,
+) -> tuple[Optional[str], List[str]]:
+    """Versão assíncrona de `get_context`; as leituras independentes rodam em paralelo."""
+    user_id = str(user.id)
+
+    if recipe_id:
+        status_info, chunks = await asyncio.gather(
+            run_in_threadpool(persist_supabase.get_recipe_embedding_status, supa, recipe_id, user_id),
+            run_in_threadpool(persist_supabase.get_recipe_chunks, supa, recipe_id),
+        )
+        if status_info.get("status") != "completed":
+            return None, [str(recipe_id)]
+        return _build_recipe_context(recipe_id, chunks)
 
+    if not await run_in_threadpool(persist_supabase.has_completed_embeddings, supa, user_id):
+        return None, []
+
+    try:
+        message_embeded = await run_in_threadpool(
+            embed_query_cached, message, embedding_query, EMBEDDING_MODEL, supa
+        )
+    except Exception:
+        logger.exception("Erro ao gerar embedding da mensagem")
+        return None, []
+    similar_chunks = await run_in_threadpool(
+        persist_supabase.find_similar_chunks,
+        supa,
+        user_id,
+        message_embeded,
+        query_text=message,
+    )
+    return _build_similarity_context(similar_chunks)
+
+
+def _build_recipe_context(
+    recipe_id: str,
+    chunks: Sequence[Dict[str, Any]],
+) -> tuple[Optional[str], List[str]]:
+    if not chunks:
+        return None, [str(recipe_id)]
+
+    context_parts: List[str] = []
+    for chunk in chunks:
+        compressed = compress_chunk_text(chunk.get("chunk_text", ""))
+        if compressed:
+            context_parts.append(compressed)
+
+    context_text = _truncate_context("\n\n".join(context_parts).strip())
+    return (context_text or None, [str(recipe_id)])
+
+
+def _build_similarity_context(
+    similar_chunks: Sequence[Dict[str, Any]],
+) -> tuple[Optional[str], List[str]]:
     if not similar_chunks:
         return None, []
 
@@ -244,6 +452,31 @@ def get_context(
     return None, related_recipe_ids
 
 
+def _resolve_chat_id(user_record: Any, chat_id: Optional[str]) -> str:
+    if isinstance(user_record, dict):
+        chat_id_value = user_record.get("chat_id")
+        if chat_id_value:
+            return str(chat_id_value)
+
+    normalized_chat_id = str(chat_id or uuid4())
+    if isinstance(user_record, dict):
+        user_record["chat_id"] = normalized_chat_id
+    return normalized_chat_id
+
+
+def _history_without_current(
+    records: Sequence[Dict[str, Any]],
+    message: str,
+) -> List[Dict[str, str]]:
+    """Monta o histórico para o agente sem repetir a pergunta atual."""
+    history_payload = _build_history_payload(records)
+    if history_payload:
+        last_entry = history_payload[-1]
+        if last_entry.get("role") == "user" and last_entry.get("content") == message:
+            history_payload = history_payload[:-1]
+    return history_payload
+
+
 def _truncate_context(context: str) -> str:
     if not context:
         return ""
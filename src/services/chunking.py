@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+
+SECTION_PREFIX = "## "
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_MAX_TOKENS = int(os.getenv("EMBEDDING_CHUNK_MAX_TOKENS", "512"))
+DEFAULT_CHUNK_OVERLAP_TOKENS = int(os.getenv("EMBEDDING_CHUNK_OVERLAP_TOKENS", "64"))
+DEFAULT_MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS_PER_RECIPE", "64"))
+
+
+@dataclass
+class TextSection:
+    header: str | None
+    lines: list[str] = field(default_factory=list)
+
+
+def estimate_tokens(text: str) -> int:
+    """Aproximacao barata de tokens (~4 caracteres por token para pt/en)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sections(text: str) -> list[TextSection]:
+    sections: list[TextSection] = []
+    current = TextSection(header=None)
+    for line in text.splitlines():
+        if line.startswith(SECTION_PREFIX):
+            if current.header or any(item.strip() for item in current.lines):
+                sections.append(current)
+            current = TextSection(header=line.strip())
+            continue
+        current.lines.append(line)
+    if current.header or any(item.strip() for item in current.lines):
+        sections.append(current)
+    return sections
+
+
+def _split_long_line(line: str, max_tokens: int) -> list[str]:
+    pieces: list[str] = []
+    words: list[str] = []
+    tokens = 0
+    for word in line.split():
+        word_tokens = estimate_tokens(word) + 1
+        if words and tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(words))
+            words = []
+            tokens = 0
+        words.append(word)
+        tokens += word_tokens
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def _split_units(lines: list[str], max_tokens: int) -> list[str]:
+    units: list[str] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        if estimate_tokens(line) > max_tokens:
+            units.extend(_split_long_line(line, max_tokens))
+        else:
+            units.append(line)
+    return units
+
+
+def _overlap_tail(units: list[str], overlap_tokens: int) -> tuple[list[str], int]:
+    tail: list[str] = []
+    tokens = 0
+    for unit in reversed(units):
+        unit_tokens = estimate_tokens(unit) + 1
+        if tokens + unit_tokens > overlap_tokens:
+            break
+        tail.insert(0, unit)
+        tokens += unit_tokens
+    return tail, tokens
+
+
+def _window_units(units: list[str], max_tokens: int, overlap_tokens: int) -> list[list[str]]:
+    windows: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            windows.append(current)
+            current, current_tokens = _overlap_tail(current, overlap_tokens)
+            if current_tokens + unit_tokens > max_tokens:
+                current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        windows.append(current)
+    return windows
+
+
+def _section_pieces(section: TextSection, max_tokens: int, overlap_tokens: int) -> list[str]:
+    header_tokens = estimate_tokens(section.header or "") + 1 if section.header else 0
+    body_budget = max(max_tokens - header_tokens, 1)
+    units = _split_units(section.lines, body_budget)
+    if not units:
+        return []
+    pieces: list[str] = []
+    for window in _window_units(units, body_budget, min(overlap_tokens, body_budget // 2)):
+        body = "\n".join(window)
+        pieces.append(f"{section.header}\n{body}" if section.header else body)
+    return pieces
+
+
+def split_into_chunks(
+    text: str,
+    max_tokens: int = DEFAULT_CHUNK_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    max_chunks: int = DEFAULT_MAX_CHUNKS,
+) -> list[str]:
+    """
+    Divide o texto de embedding em chunks respeitando as secoes '## ' e um
+    limite aproximado de tokens. Secoes longas viram janelas com sobreposicao
+    (repetindo o cabecalho) e secoes curtas vizinhas sao agrupadas.
+    """
+    if not text or not text.strip():
+        return []
+
+    pieces: list[str] = []
+    for section in split_sections(text):
+        pieces.extend(_section_pieces(section, max_tokens, overlap_tokens))
+
+    chunks: list[str] = []
+    for piece in pieces:
+        if chunks and estimate_tokens(chunks[-1]) + estimate_tokens(piece) + 1 <= max_tokens:
+            chunks[-1] = f"{chunks[-1]}\n{piece}"
+        else:
+            chunks.append(piece)
+
+    unique_chunks = list(dict.fromkeys(chunk.strip() for chunk in chunks if chunk.strip()))
+    return unique_chunks[:max_chunks] if max_chunks > 0 else unique_chunks
@@ -1,57 +1,101 @@
 import json
+import os
+import threading
 
 import google.generativeai as genai
-from src.services.errors import RateLimitedError
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.services.gemini_client import configure_api_key
+from src.services.gemini_quota import (
+    PRIORITY_CHAT,
+    PRIORITY_EMBEDDING,
+    estimate_tokens,
+    get_quota_governor,
+)
 from src.services.Prompt import get_api_key
 
+EMBEDDING_MODEL = "models/text-embedding-004"
+TASK_RETRIEVAL_DOCUMENT = "RETRIEVAL_DOCUMENT"
+TASK_RETRIEVAL_QUERY = "RETRIEVAL_QUERY"
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "100"))
+EMBEDDING_BATCH_MAX_WAIT_MS = int(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "25"))
+EMBEDDING_QUERY_BATCH_MAX_WAIT_MS = int(os.getenv("EMBEDDING_QUERY_BATCH_MAX_WAIT_MS", "5"))
 
-def _is_rate_limited_error(exc: Exception) -> bool:
-    status_code = getattr(exc, "status_code", None)
-    message = str(exc)
-    if status_code == 429:
-        return True
-    if "RESOURCE_EXHAUSTED" in message:
-        return True
-    return False
+_configured = False
+_configure_lock = threading.Lock()
+_batchers: dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def _ensure_configured() -> None:
+    global _configured
+    if _configured:
+        return
+    with _configure_lock:
+        if not _configured:
+            configure_api_key(get_api_key("GEMINI_API_KEY"))
+            _configured = True
 
-def embedding_document(metadata: str) -> list[float]:
 
-    try:
-        genai.configure(api_key=get_api_key("GEMINI_API_KEY"))
+def embed_batch(texts: list[str], task_type: str) -> list[list[float]]:
+    """Embed several texts in a single `batchEmbedContents` round-trip."""
+    if not texts:
+        return []
+
+    _ensure_configured()
+    # Consultas vem do chat (interativo); documentos sao trabalho de background.
+    priority = PRIORITY_CHAT if task_type == TASK_RETRIEVAL_QUERY else PRIORITY_EMBEDDING
+    tokens = sum(estimate_tokens(text) for text in texts)
+    # Cada texto do batchEmbedContents conta como uma requisicao na quota.
+    with get_quota_governor().request(EMBEDDING_MODEL, priority, tokens, requests=len(texts)):
         result = genai.embed_content(
-            model="models/text-embedding-004",
-            content=metadata,
-            task_type="RETRIEVAL_DOCUMENT"
+            model=EMBEDDING_MODEL,
+            content=texts,
+            task_type=task_type,
         )
-        
-        return result['embedding']
-    
-    except Exception as err:
-        if _is_rate_limited_error(err):
-            raise RateLimitedError(
-                "Limite da API do Gemini atingido. Tente novamente em alguns instantes."
-            ) from err
-        raise
-    
+    return result['embedding']
+
+
+def get_batcher(task_type: str) -> EmbeddingBatcher:
+    batcher = _batchers.get(task_type)
+    if batcher is not None:
+        return batcher
+    with _batchers_lock:
+        batcher = _batchers.get(task_type)
+        if batcher is None:
+            max_wait_ms = (
+                EMBEDDING_QUERY_BATCH_MAX_WAIT_MS
+                if task_type == TASK_RETRIEVAL_QUERY
+                else EMBEDDING_BATCH_MAX_WAIT_MS
+            )
+            batcher = EmbeddingBatcher(
+                lambda texts: embed_batch(texts, task_type),
+                max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=max_wait_ms,
+                name=f"embedding-batcher-{task_type.lower()}",
+            )
+            _batchers[task_type] = batcher
+    return batcher
+
+
+def shutdown_batchers() -> None:
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+        _batchers.clear()
+    for batcher in batchers:
+        batcher.close()
+
+
+def embedding_document(metadata: str) -> list[float]:
+    return get_batcher(TASK_RETRIEVAL_DOCUMENT).embed(metadata)
+
+
+def embedding_documents(texts: list[str]) -> list[list[float]]:
+    return get_batcher(TASK_RETRIEVAL_DOCUMENT).embed_many(texts)
+
+
 def embedding_query(metadata: str) -> list[float]:
+    return get_batcher(TASK_RETRIEVAL_QUERY).embed(metadata)
 
-    try:
-        genai.configure(api_key=get_api_key("GEMINI_API_KEY"))
-        result = genai.embed_content(
-            model="models/text-embedding-004",
-            content=metadata,
-            task_type="RETRIEVAL_QUERY"
-        )
-        
-        return result['embedding']
-    
-    except Exception as err:
-        if _is_rate_limited_error(err):
-            raise RateLimitedError(
-                "Limite da API do Gemini atingido. Tente novamente em alguns instantes."
-            ) from err
-        raise
-    
 def stringify_payload(payload: dict) -> str:
     if not isinstance(payload, dict):
         return str(payload)
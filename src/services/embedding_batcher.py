@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+EmbedBatchFn = Callable[[list[str]], list[list[float]]]
+
+
+@dataclass
+class _PendingEmbedding:
+    text: str
+    future: Future = field(default_factory=Future)
+
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into a single batch call.
+
+    Callers block on `embed`/`embed_many` while a background thread gathers
+    pending texts for up to `max_wait_ms` (or until `max_batch_size` items are
+    queued), sends them in one request and fans the vectors back out.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedBatchFn,
+        max_batch_size: int = 100,
+        max_wait_ms: int = 25,
+        name: str = "embedding-batcher",
+    ) -> None:
+        self._embed_fn = embed_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0, max_wait_ms) / 1000
+        self.name = name
+        self._queue: "queue.Queue[_PendingEmbedding | object]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.batches_sent = 0
+        self.items_embedded = 0
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        self._ensure_started()
+        pending = [_PendingEmbedding(text=text) for text in texts]
+        for item in pending:
+            self._queue.put(item)
+        return [item.future.result() for item in pending]
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread = None
+        thread.join(timeout=timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop_requested = self._collect_batch(first)
+            self._flush(batch)
+            if stop_requested:
+                return
+
+    def _collect_batch(self, first: _PendingEmbedding) -> tuple[list[_PendingEmbedding], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, batch: list[_PendingEmbedding]) -> None:
+        unique_texts = list(dict.fromkeys(item.text for item in batch))
+        try:
+            vectors = self._embed_fn(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise RuntimeError(
+                    f"Embedding batch returned {len(vectors)} vectors for {len(unique_texts)} texts"
+                )
+        except Exception as exc:
+            for item in batch:
+                item.future.set_exception(exc)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for item in batch:
+            item.future.set_result(by_text[item.text])
+
+        self.batches_sent += 1
+        self.items_embedded += len(unique_texts)
+        logger.debug(
+            "embedding.batch_sent name=%s size=%d unique=%d",
+            self.name,
+            len(batch),
+            len(unique_texts),
+        )
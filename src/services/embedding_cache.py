@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_SHARED_ENABLED = os.getenv("EMBEDDING_CACHE_SHARED_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+QUERY_CACHE_SHARED_ENABLED = os.getenv("QUERY_EMBEDDING_CACHE_SHARED", "false").lower() == "true"
+SHARED_CACHE_TABLE = "embedding_cache"
+_SHARED_LOOKUP_CHUNK = 100
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?!.,;:"
+
+EmbedFn = Callable[[list[str]], list[list[float]]]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheKey:
+    model: str
+    task_type: str
+    content_hash: str
+
+    @classmethod
+    def for_text(cls, model: str, task_type: str, text: str) -> "EmbeddingCacheKey":
+        return cls(model=model, task_type=task_type, content_hash=content_hash(text))
+
+
+class LocalEmbeddingStore:
+    """Tier local em disco (SQLite), compartilhado entre threads do processo."""
+
+    def __init__(self, directory: Path = EMBEDDING_CACHE_DIR) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / "embeddings.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, task_type, content_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Sequence[EmbeddingCacheKey]) -> dict[EmbeddingCacheKey, list[float]]:
+        found: dict[EmbeddingCacheKey, list[float]] = {}
+        try:
+            with self._lock:
+                for key in set(keys):
+                    row = self._conn.execute(
+                        "SELECT vector FROM embeddings WHERE model = ? AND task_type = ? AND content_hash = ?",
+                        (key.model, key.task_type, key.content_hash),
+                    ).fetchone()
+                    if row:
+                        found[key] = array("f", row[0]).tolist()
+        except sqlite3.Error:
+            logger.exception("Erro ao consultar cache local de embeddings")
+        return found
+
+    def put_many(self, items: dict[EmbeddingCacheKey, list[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (key.model, key.task_type, key.content_hash, array("f", vector).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, task_type, content_hash, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            logger.exception("Erro ao gravar cache local de embeddings")
+
+
+class SupabaseEmbeddingStore:
+    """Tier compartilhado (tabela Postgres `embedding_cache`) entre workers e replicas."""
+
+    def __init__(self, client: Client) -> None:
+        self._client = client
+
+    def get_many(self, keys: Sequence[EmbeddingCacheKey]) -> dict[EmbeddingCacheKey, list[float]]:
+        found: dict[EmbeddingCacheKey, list[float]] = {}
+        groups: dict[tuple[str, str], list[str]] = {}
+        for key in set(keys):
+            groups.setdefault((key.model, key.task_type), []).append(key.content_hash)
+
+        for (model, task_type), hashes in groups.items():
+            for batch in _chunked(hashes, _SHARED_LOOKUP_CHUNK):
+                try:
+                    response = (
+                        self._client.table(SHARED_CACHE_TABLE)
+                        .select("content_hash, embedding")
+                        .eq("model", model)
+                        .eq("task_type", task_type)
+                        .in_("content_hash", batch)
+                        .execute()
+                    )
+                except Exception:
+                    logger.exception("Erro ao consultar cache compartilhado de embeddings")
+                    return found
+                for row in response.data or []:
+                    vector = row.get("embedding")
+                    if isinstance(vector, list) and vector:
+                        key = EmbeddingCacheKey(model, task_type, str(row.get("content_hash")))
+                        found[key] = [float(value) for value in vector]
+        return found
+
+    def put_many(self, items: dict[EmbeddingCacheKey, list[float]]) -> None:
+        if not items:
+            return
+        rows = [
+            {
+                "model": key.model,
+                "task_type": key.task_type,
+                "content_hash": key.content_hash,
+                "embedding": vector,
+            }
+            for key, vector in items.items()
+        ]
+        try:
+            (
+                self._client.table(SHARED_CACHE_TABLE)
+                .upsert(rows, on_conflict="model,task_type,content_hash")
+                .execute()
+            )
+        except Exception:
+            logger.exception("Erro ao gravar cache compartilhado de embeddings")
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings por (model, task_type, sha256(texto)).
+    Consulta o tier local, depois o compartilhado, e so chama a API para os
+    textos que nenhum dos dois conhece.
+    """
+
+    def __init__(
+        self,
+        local: LocalEmbeddingStore | None = None,
+        shared: SupabaseEmbeddingStore | None = None,
+    ) -> None:
+        self.local = local
+        self.shared = shared
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        model: str,
+        task_type: str,
+        embed_fn: EmbedFn,
+    ) -> list[list[float]]:
+        keys = [EmbeddingCacheKey.for_text(model, task_type, text) for text in texts]
+        vectors: dict[EmbeddingCacheKey, list[float]] = {}
+
+        if self.local is not None:
+            vectors.update(self.local.get_many(keys))
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self.shared is not None:
+            shared_hits = self.shared.get_many(missing)
+            if shared_hits and self.local is not None:
+                self.local.put_many(shared_hits)
+            vectors.update(shared_hits)
+
+        missing_texts: dict[EmbeddingCacheKey, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing_texts.setdefault(key, text)
+
+        logger.debug(
+            "embedding.cache task=%s total=%d misses=%d",
+            task_type,
+            len(keys),
+            len(missing_texts),
+        )
+
+        if missing_texts:
+            fresh = embed_fn(list(missing_texts.values()))
+            new_items = dict(zip(missing_texts.keys(), fresh))
+            vectors.update(new_items)
+            if self.local is not None:
+                self.local.put_many(new_items)
+            if self.shared is not None:
+                self.shared.put_many(new_items)
+
+        return [vectors[key] for key in keys]
+
+
+def normalize_query_text(text: str) -> str:
+    """Normaliza a pergunta para que variacoes triviais caiam na mesma chave."""
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    return normalized.strip(_TRAILING_PUNCTUATION)
+
+
+class QueryEmbeddingCache:
+    """LRU com TTL, em processo, para embeddings de perguntas do chat."""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, list[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, vector = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_embed(
+        self,
+        text: str,
+        embed_fn: Callable[[str], list[float]],
+        *,
+        shared: SupabaseEmbeddingStore | None = None,
+        model: str = "",
+        task_type: str = "RETRIEVAL_QUERY",
+    ) -> list[float]:
+        normalized = normalize_query_text(text) or text
+        cached = self.get(normalized)
+        if cached is not None:
+            return cached
+
+        shared_key = EmbeddingCacheKey.for_text(model, task_type, normalized)
+        if shared is not None:
+            vector = shared.get_many([shared_key]).get(shared_key)
+            if vector is not None:
+                self.put(normalized, vector)
+                return vector
+
+        # A chave normalizada so serve para o cache; o embedding e da mensagem original.
+        vector = embed_fn(text)
+        self.put(normalized, vector)
+        if shared is not None:
+            shared.put_many({shared_key: vector})
+        return vector
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+_query_cache = QueryEmbeddingCache()
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    return _query_cache
+
+
+def embed_query_cached(
+    text: str,
+    embed_fn: Callable[[str], list[float]],
+    model: str,
+    supa: Client | None = None,
+) -> list[float]:
+    shared = SupabaseEmbeddingStore(supa) if supa is not None and QUERY_CACHE_SHARED_ENABLED else None
+    return _query_cache.get_or_embed(text, embed_fn, shared=shared, model=model)
+
+
+_local_store: LocalEmbeddingStore | None = None
+_local_store_lock = threading.Lock()
+
+
+def _get_local_store() -> LocalEmbeddingStore | None:
+    global _local_store
+    if _local_store is not None:
+        return _local_store
+    with _local_store_lock:
+        if _local_store is None:
+            try:
+                _local_store = LocalEmbeddingStore()
+            except (OSError, sqlite3.Error):
+                logger.exception("Cache local de embeddings indisponivel")
+                return None
+    return _local_store
+
+
+def get_embedding_cache(supa: Client | None = None) -> EmbeddingCache | None:
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    shared = SupabaseEmbeddingStore(supa) if supa is not None and EMBEDDING_CACHE_SHARED_ENABLED else None
+    return EmbeddingCache(local=_get_local_store(), shared=shared)
+
+
+def _chunked(values: Iterable[str], size: int) -> Iterable[list[str]]:
+    batch: list[str] = []
+    for value in values:
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
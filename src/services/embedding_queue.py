@@ -5,15 +5,15 @@ import logging
 import os
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
-from uuid import uuid4
 
 from starlette.concurrency import run_in_threadpool
 
 from src.app.deps import get_supabase
-from src.services.embedding import stringify_payload
+from src.services.embedding import EMBEDDING_BATCH_MAX_SIZE, shutdown_batchers, stringify_payload
 from src.services.errors import RateLimitedError
 from src.services.persist_supabase import (
     get_recipe_embedding_payload,
+    insert_embedding_job,
     save_embedding_payload,
     save_chunks,
     update_recipe_embedding_status,
@@ -71,6 +71,9 @@ class InMemoryEmbeddingQueue(EmbeddingQueueAdapter):
         self._worker: Optional[asyncio.Task[None]] = None
         self._lock = asyncio.Lock()
         self._max_attempts = 5
+        self._max_concurrent_jobs = max(
+            1, min(int(os.getenv("EMBEDDING_QUEUE_CONCURRENCY", "8")), EMBEDDING_BATCH_MAX_SIZE)
+        )
         self._payload_cache: Dict[tuple[str, str], str] = {}
 
     async def start(self) -> None:
@@ -88,6 +91,7 @@ class InMemoryEmbeddingQueue(EmbeddingQueueAdapter):
                 await self._worker
             finally:
                 self._worker = None
+                await run_in_threadpool(shutdown_batchers)
 
     async def enqueue(self, recipe_id: str, owner_id: str, payload: Dict[str, Any]) -> None:
         serialized = stringify_payload(payload)
@@ -138,14 +142,41 @@ class InMemoryEmbeddingQueue(EmbeddingQueueAdapter):
             if job is None:
                 self._queue.task_done()
                 break
+            jobs, stop_requested = self._drain_ready_jobs(job)
+            # Jobs processed together share one embedding batch request.
+            results = await asyncio.gather(
+                *(self._process_job(supa, item) for item in jobs),
+                return_exceptions=True,
+            )
+            for item, result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    log.error(
+                        "embedding.worker_unexpected_error recipe=%s owner=%s",
+                        item.recipe_id,
+                        item.owner_id,
+                        exc_info=result,
+                    )
+                self._queue.task_done()
+            if stop_requested:
+                self._queue.task_done()
+                break
+
+    def _drain_ready_jobs(self, first: EmbeddingJob) -> tuple[list[EmbeddingJob], bool]:
+        jobs = [first]
+        while len(jobs) < self._max_concurrent_jobs:
             try:
-                await self._process_job(supa, job)
-            except Exception:
-                log.exception(
-                    "embedding.worker_unexpected_error recipe=%s owner=%s", job.recipe_id, job.owner_id
-                )
-            finally:
+                job = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if job is None:
+                return jobs, True
+            if any(item.recipe_id == job.recipe_id for item in jobs):
+                # Same recipe twice in one round would race on recipe_chunks; defer it.
+                self._queue.put_nowait(job)
                 self._queue.task_done()
+                break
+            jobs.append(job)
+        return jobs, False
 
     async def _process_job(self, supa, job: EmbeddingJob) -> None:
         await run_in_threadpool(
@@ -157,7 +188,7 @@ class InMemoryEmbeddingQueue(EmbeddingQueueAdapter):
             None,
         )
         try:
-            await run_in_threadpool(save_chunks, supa, job.recipe_id, job.payload)
+            await run_in_threadpool(save_chunks, supa, job.recipe_id, job.payload, job.owner_id)
         except RateLimitedError as exc:
             await self._handle_rate_limit(supa, job, exc)
             return
@@ -279,16 +310,7 @@ class PostgresEmbeddingQueue(EmbeddingQueueAdapter):
         return True
 
     def _insert_job(self, supa, recipe_id: str, owner_id: str, payload: str) -> None:
-        job_data = {
-            "id": str(uuid4()),
-            "user_id": owner_id,
-            "recipe_id": recipe_id,
-            "status": "QUEUED",
-            "payload": payload,
-            "attempt_count": 0,
-            "max_attempts": self._max_attempts,
-        }
-        supa.table("embedding_jobs").insert(job_data).execute()
+        insert_embedding_job(supa, recipe_id, owner_id, payload, self._max_attempts)
 
 
 def _build_queue() -> EmbeddingQueueAdapter:
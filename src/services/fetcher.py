@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
+import os
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -13,6 +15,8 @@ from youtube_transcript_api import (
     YouTubeTranscriptApi,
 )
 
+from src.app.infra.resources import get_http_client, get_resources
+
 from .errors import (
     AudioUnavailableError,
     FetchFailedError,
@@ -29,6 +33,10 @@ VTT_TAG_PATTERN = re.compile(r"<[^>]+>")
 WHITESPACE_PATTERN = re.compile(r"\s+")
 PRIORITY_LANGUAGES = ("pt-BR", "pt", "en")
 VTT_SKIP_PREFIXES = ("NOTE", "STYLE", "REGION", "WEBVTT")
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+
+# Compartilhado pelas etapas de coleta que rodam em paralelo (metadados, transcript, VTT).
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="fetch")
 
 
 @dataclass(frozen=True)
@@ -132,16 +140,53 @@ def _try_download_audio(url: str) -> str | None:
         return None
 
 
+def ensure_audio(content: RawContent) -> str | None:
+    """Baixa o audio sob demanda, apenas quando o texto coletado nao basta."""
+    if not content.audio_path:
+        content.audio_path = _try_download_audio(content.url)
+    return content.audio_path
+
+
+def _extract_metadata(url: str, opts: dict | None = None) -> dict:
+    ydl = get_resources().youtube_dl(opts or _create_ydl_options())
+    return ydl.extract_info(url, download=False)
+
+
+def _resolve_youtube_subtitles(transcript_future: Future, info: dict) -> str | None:
+    # Enquanto a API de transcript nao responde, o VTT ja e baixado em paralelo.
+    caption_future: Future | None = None
+    if not transcript_future.done():
+        caption_future = _fetch_executor.submit(_extract_caption_text, info)
+
+    transcript = _future_text(transcript_future)
+    if transcript:
+        if caption_future is not None:
+            caption_future.cancel()
+        return transcript
+
+    if caption_future is None:
+        return _extract_caption_text(info)
+    return _future_text(caption_future)
+
+
+def _future_text(future: Future) -> str | None:
+    try:
+        return future.result()
+    except Exception as error:
+        logger.warning("Falha ao coletar legenda: %s", error)
+        return None
+
+
 def fetch_youtube(url: str) -> RawContent:
     _validate_youtube_url(url)
 
+    transcript_future = _fetch_executor.submit(_get_yt_transcript, url)
     try:
-        with yt_dlp.YoutubeDL(_create_ydl_options()) as ydl:
-            info = ydl.extract_info(url, download=False)
+        info = _extract_metadata(url)
 
         _check_video_availability(info)
 
-        subtitles_text = _get_yt_transcript(url) or _extract_caption_text(info)
+        subtitles_text = _resolve_youtube_subtitles(transcript_future, info)
 
         return RawContent(
             platform="youtube",
@@ -151,16 +196,19 @@ def fetch_youtube(url: str) -> RawContent:
             transcript=None,
             subtitles=subtitles_text,
             transcript_source=None,
-            audio_path=_try_download_audio(url),
+            audio_path=None,
             thumbnail_url=_extract_thumbnail(info),
             author=info.get("uploader"),
         )
 
     except (PrivateOrUnavailableError, InvalidURLError):
+        transcript_future.cancel()
         raise
     except yt_dlp.utils.DownloadError as error:
+        transcript_future.cancel()
         raise FetchFailedError(f"Erro ao baixar video: {error}") from error
     except (ConnectionError, TimeoutError) as error:
+        transcript_future.cancel()
         raise FetchFailedError(f"Erro de rede ao coletar video: {error}") from error
 
 
@@ -171,8 +219,7 @@ def fetch_instagram(url: str) -> RawContent:
         opts = _create_ydl_options()
         opts["writethumbnail"] = True
 
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        info = _extract_metadata(url, opts)
 
         if not info:
             raise PrivateOrUnavailableError("Post privado ou nao disponivel")
@@ -185,7 +232,7 @@ def fetch_instagram(url: str) -> RawContent:
             transcript=None,
             subtitles=None,
             transcript_source=None,
-            audio_path=_try_download_audio(url),
+            audio_path=None,
             thumbnail_url=_extract_thumbnail(info),
             author=info.get("uploader") or info.get("channel") or "Desconhecido",
         )
@@ -262,10 +309,9 @@ def _vtt_to_plain_text(content: str) -> str:
 
 def _download_vtt_as_text(url: str, timeout: float = 15.0) -> str:
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return _vtt_to_plain_text(response.text)
+        response = get_http_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        return _vtt_to_plain_text(response.text)
     except httpx.TimeoutException as error:
         raise NetworkTimeoutError(url, timeout) from error
     except httpx.HTTPStatusError as error:
@@ -346,8 +392,7 @@ def download_audio(url: str) -> str | None:
     opts["outtmpl"] = str(audio_dir / "%(id)s.%(ext)s")
 
     try:
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            info_audio = ydl.extract_info(url, download=True)
+        info_audio = get_resources().youtube_dl(opts).extract_info(url, download=True)
     except yt_dlp.utils.DownloadError as error:
         raise AudioUnavailableError(f"Erro ao baixar audio: {error}") from error
     except (ConnectionError, TimeoutError) as error:
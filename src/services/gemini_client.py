@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
+from typing import AsyncIterator
 
 import google.generativeai as genai
 
 from src.services.errors import ServiceError
+from src.services.gemini_quota import PRIORITY_INGEST, estimate_tokens, get_quota_governor
 
 
 class GeminiConfigurationError(ServiceError):
@@ -16,24 +19,78 @@ class GeminiPromptError(ServiceError):
     pass
 
 
+_configured_api_key: str | None = None
+_configure_lock = threading.Lock()
+
+
+def configure_api_key(api_key: str) -> None:
+    """Chama `genai.configure` apenas quando a chave muda (a config do SDK é global)."""
+    global _configured_api_key
+    if not api_key:
+        raise GeminiConfigurationError("Missing Google API key.")
+    if _configured_api_key == api_key:
+        return
+    with _configure_lock:
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
+
+class SystemPromptCache:
+    """Mantém os prompts em memória e relê o arquivo só quando o mtime muda."""
+
+    def __init__(self) -> None:
+        self._entries: dict[Path, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, file_path: Path) -> str:
+        try:
+            mtime = file_path.stat().st_mtime
+        except FileNotFoundError as not_found_error:
+            raise GeminiPromptError(f"Prompt file not found: {file_path}") from not_found_error
+        except OSError as io_error:
+            raise GeminiPromptError(f"Unable to read prompt file: {io_error}") from io_error
+
+        cached = self._entries.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            text = file_path.read_text(encoding="utf-8")
+        except FileNotFoundError as not_found_error:
+            raise GeminiPromptError(f"Prompt file not found: {file_path}") from not_found_error
+        except (OSError, IOError) as io_error:
+            raise GeminiPromptError(f"Unable to read prompt file: {io_error}") from io_error
+
+        with self._lock:
+            self._entries[file_path] = (mtime, text)
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_prompt_cache = SystemPromptCache()
+
+
+def load_system_prompt(file_path: Path) -> str:
+    return _prompt_cache.load(file_path)
+
+
 class GeminiClient:
     def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash") -> None:
         self.api_key = api_key
         self.model_name = model_name
+        self._models: dict[Path, tuple[str, genai.GenerativeModel]] = {}
+        self._models_lock = threading.Lock()
         self._configure_api()
 
     def _configure_api(self) -> None:
-        if not self.api_key:
-            raise GeminiConfigurationError("Missing Google API key.")
-        genai.configure(api_key=self.api_key)
+        configure_api_key(self.api_key)
 
     def _load_system_prompt(self, file_path: Path) -> str:
-        try:
-            return file_path.read_text(encoding="utf-8")
-        except FileNotFoundError as not_found_error:
-            raise GeminiPromptError(f"Prompt file not found: {file_path}") from not_found_error
-        except (OSError, IOError) as io_error:
-            raise GeminiPromptError(f"Unable to read prompt file: {io_error}") from io_error
+        return _prompt_cache.load(file_path)
 
     def _serialize_prompt(self, user_prompt: str | dict[str, str | int | float | list | dict]) -> str:
         if isinstance(user_prompt, str):
@@ -43,17 +100,86 @@ class GeminiClient:
         except TypeError:
             return str(user_prompt)
 
+    def _build_model(self, system_prompt_path: Path) -> genai.GenerativeModel:
+        system_instruction = self._load_system_prompt(system_prompt_path)
+        cached = self._models.get(system_prompt_path)
+        if cached is not None and cached[0] == system_instruction:
+            return cached[1]
+        with self._models_lock:
+            cached = self._models.get(system_prompt_path)
+            if cached is None or cached[0] != system_instruction:
+                # Prompt novo ou editado em disco: recria o modelo com a nova instrução.
+                model = genai.GenerativeModel(
+                    model_name=self.model_name,
+                    system_instruction=system_instruction,
+                )
+                cached = (system_instruction, model)
+                self._models[system_prompt_path] = cached
+        return cached[1]
+
+    def _estimate_tokens(self, payload: str, system_prompt_path: Path) -> int:
+        return estimate_tokens(payload) + estimate_tokens(self._load_system_prompt(system_prompt_path))
+
     def generate_content(
         self,
         user_prompt: str | dict[str, str | int | float | list | dict],
         system_prompt_path: Path,
+        priority: int = PRIORITY_INGEST,
     ) -> str:
-        system_instruction = self._load_system_prompt(system_prompt_path)
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_instruction,
-        )
+        model = self._build_model(system_prompt_path)
+        payload = self._serialize_prompt(user_prompt)
+        tokens = self._estimate_tokens(payload, system_prompt_path)
+        with get_quota_governor().request(self.model_name, priority, tokens):
+            response = model.generate_content(payload)
+        return response.text
 
+    async def generate_content_async(
+        self,
+        user_prompt: str | dict[str, str | int | float | list | dict],
+        system_prompt_path: Path,
+        priority: int = PRIORITY_INGEST,
+    ) -> str:
+        model = self._build_model(system_prompt_path)
         payload = self._serialize_prompt(user_prompt)
-        response = model.generate_content(payload)
+        tokens = self._estimate_tokens(payload, system_prompt_path)
+        async with get_quota_governor().request_async(self.model_name, priority, tokens):
+            response = await model.generate_content_async(payload)
         return response.text
+
+    async def stream_content_async(
+        self,
+        user_prompt: str | dict[str, str | int | float | list | dict],
+        system_prompt_path: Path,
+        priority: int = PRIORITY_INGEST,
+    ) -> AsyncIterator[str]:
+        model = self._build_model(system_prompt_path)
+        payload = self._serialize_prompt(user_prompt)
+        tokens = self._estimate_tokens(payload, system_prompt_path)
+        async with get_quota_governor().request_async(self.model_name, priority, tokens):
+            response = await model.generate_content_async(payload, stream=True)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks sem partes de texto (ex.: apenas metadados de segurança).
+                    continue
+                if text:
+                    yield text
+
+
+_clients: dict[tuple[str, str], GeminiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: str, model_name: str = "gemini-2.5-flash") -> GeminiClient:
+    """Retorna o `GeminiClient` compartilhado do processo para (api_key, model_name)."""
+    key = (api_key, model_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GeminiClient(api_key=api_key, model_name=model_name)
+            _clients[key] = client
+    return client
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterator
+
+from src.services.errors import RateLimitedError
+from src.services.rate_limiter import AdaptiveTokenBucket
+
+logger = logging.getLogger(__name__)
+
+GEMINI_QUOTA_ENABLED = os.getenv("GEMINI_QUOTA_ENABLED", "true").lower() == "true"
+# "modelo=rpm:tpm,..." ; os limites valem por processo (divida entre replicas/workers).
+GEMINI_QUOTA_LIMITS = os.getenv("GEMINI_QUOTA_LIMITS", "")
+GEMINI_DEFAULT_RPM = float(os.getenv("GEMINI_DEFAULT_RPM", "1000"))
+GEMINI_DEFAULT_TPM = float(os.getenv("GEMINI_DEFAULT_TPM", "1000000"))
+CHARS_PER_TOKEN = 4
+
+RATE_LIMIT_MESSAGE = "Limite da API do Gemini atingido. Tente novamente em alguns instantes."
+
+# Classes de prioridade: chat interativo > ingestao > embeddings em background.
+PRIORITY_CHAT = 0
+PRIORITY_INGEST = 1
+PRIORITY_EMBEDDING = 2
+
+# Fracao do bucket que precisa sobrar para a classe consumir (folga das de cima).
+_PRIORITY_HEADROOM = {PRIORITY_CHAT: 0.0, PRIORITY_INGEST: 0.2, PRIORITY_EMBEDDING: 0.5}
+# Quanto cada classe aceita esperar antes de desistir com RateLimitedError.
+_PRIORITY_TIMEOUT_SECONDS = {PRIORITY_CHAT: 15.0, PRIORITY_INGEST: 60.0, PRIORITY_EMBEDDING: 120.0}
+
+
+def is_rate_limited_error(exc: BaseException) -> bool:
+    """429 de qualquer um dos SDKs do Gemini (google.generativeai / google.genai)."""
+    if isinstance(exc, RateLimitedError):
+        return True
+    for attribute in ("status_code", "code"):
+        if getattr(exc, attribute, None) == 429:
+            return True
+    return "RESOURCE_EXHAUSTED" in str(exc)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class QuotaLimits:
+    rpm: float
+    tpm: float
+
+
+def parse_quota_limits(raw: str) -> dict[str, QuotaLimits]:
+    limits: dict[str, QuotaLimits] = {}
+    for item in raw.split(","):
+        model, _, values = item.strip().partition("=")
+        if not model or not values:
+            continue
+        rpm, _, tpm = values.partition(":")
+        try:
+            limits[model.strip()] = QuotaLimits(
+                rpm=float(rpm),
+                tpm=float(tpm) if tpm else GEMINI_DEFAULT_TPM,
+            )
+        except ValueError:
+            logger.warning("Limite de quota invalido ignorado: %s", item)
+    return limits
+
+
+class ModelQuota:
+    """Buckets de requisicoes (RPM) e tokens (TPM) de um modelo, com AIMD nos 429."""
+
+    def __init__(
+        self,
+        limits: QuotaLimits,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limits = limits
+        # Rajada de ~5s de trafego; o resto e distribuido pela taxa.
+        self.requests = AdaptiveTokenBucket(
+            rate_per_second=limits.rpm / 60,
+            burst=max(1.0, limits.rpm / 12),
+            clock=clock,
+            sleep=sleep,
+        )
+        self.tokens = AdaptiveTokenBucket(
+            rate_per_second=limits.tpm / 60,
+            burst=max(1.0, limits.tpm / 12),
+            clock=clock,
+            sleep=sleep,
+        )
+
+    def delay(self, priority: int, requests: float, tokens: float) -> float:
+        headroom = _PRIORITY_HEADROOM.get(priority, 0.0)
+        wait = self.requests.reserve(requests, headroom * self.requests.capacity)
+        if wait > 0:
+            return wait
+        if tokens <= 0:
+            return 0.0
+        wait = self.tokens.reserve(tokens, headroom * self.tokens.capacity)
+        if wait > 0:
+            # Devolve a requisicao para nao gastar RPM enquanto espera TPM.
+            self.requests.release(requests)
+        return wait
+
+    def on_success(self) -> None:
+        self.requests.on_success()
+        self.tokens.on_success()
+
+    def on_rate_limited(self) -> None:
+        self.requests.on_rate_limited()
+        self.tokens.on_rate_limited()
+
+
+class GeminiQuotaGovernor:
+    """
+    Ponto unico de controle de quota do Gemini no processo: toda chamada
+    (chat, extracao de receitas, embeddings) pede permissao antes de sair,
+    assim o processo desacelera antes de levar 429 em vez de depois.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, QuotaLimits] | None = None,
+        default_limits: QuotaLimits | None = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or QuotaLimits(rpm=GEMINI_DEFAULT_RPM, tpm=GEMINI_DEFAULT_TPM)
+        self.enabled = enabled
+        self._clock = clock
+        self._sleep = sleep
+        self._quotas: dict[str, ModelQuota] = {}
+        self._lock = threading.Lock()
+
+    def quota(self, model: str) -> ModelQuota:
+        quota = self._quotas.get(model)
+        if quota is not None:
+            return quota
+        with self._lock:
+            quota = self._quotas.get(model)
+            if quota is None:
+                limits = self.limits.get(model, self.default_limits)
+                quota = ModelQuota(limits, clock=self._clock, sleep=self._sleep)
+                self._quotas[model] = quota
+        return quota
+
+    def acquire(self, model: str, priority: int, tokens: float = 0, requests: float = 1) -> None:
+        if not self.enabled:
+            return
+        quota = self.quota(model)
+        deadline = self._clock() + _PRIORITY_TIMEOUT_SECONDS.get(priority, 60.0)
+        while True:
+            wait = quota.delay(priority, requests, tokens)
+            if wait <= 0:
+                return
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise RateLimitedError(RATE_LIMIT_MESSAGE)
+            self._sleep(min(wait, remaining))
+
+    async def acquire_async(self, model: str, priority: int, tokens: float = 0, requests: float = 1) -> None:
+        if not self.enabled:
+            return
+        quota = self.quota(model)
+        deadline = self._clock() + _PRIORITY_TIMEOUT_SECONDS.get(priority, 60.0)
+        while True:
+            wait = quota.delay(priority, requests, tokens)
+            if wait <= 0:
+                return
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise RateLimitedError(RATE_LIMIT_MESSAGE)
+            await asyncio.sleep(min(wait, remaining))
+
+    def record_result(self, model: str, exc: BaseException | None) -> None:
+        if not self.enabled:
+            return
+        if exc is None:
+            self.quota(model).on_success()
+        elif is_rate_limited_error(exc):
+            logger.warning("gemini.rate_limited model=%s", model)
+            self.quota(model).on_rate_limited()
+
+    @contextmanager
+    def request(self, model: str, priority: int, tokens: float = 0, requests: float = 1) -> Iterator[None]:
+        """Reserva quota, executa a chamada e converte 429 em RateLimitedError."""
+        self.acquire(model, priority, tokens, requests)
+        try:
+            yield
+        except Exception as exc:
+            self.record_result(model, exc)
+            if is_rate_limited_error(exc) and not isinstance(exc, RateLimitedError):
+                raise RateLimitedError(RATE_LIMIT_MESSAGE) from exc
+            raise
+        else:
+            self.record_result(model, None)
+
+    @asynccontextmanager
+    async def request_async(
+        self,
+        model: str,
+        priority: int,
+        tokens: float = 0,
+        requests: float = 1,
+    ) -> AsyncIterator[None]:
+        await self.acquire_async(model, priority, tokens, requests)
+        try:
+            yield
+        except Exception as exc:
+            self.record_result(model, exc)
+            if is_rate_limited_error(exc) and not isinstance(exc, RateLimitedError):
+                raise RateLimitedError(RATE_LIMIT_MESSAGE) from exc
+            raise
+        else:
+            self.record_result(model, None)
+
+
+_governor: GeminiQuotaGovernor | None = None
+_governor_lock = threading.Lock()
+
+
+def get_quota_governor() -> GeminiQuotaGovernor:
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = GeminiQuotaGovernor(
+                    limits=parse_quota_limits(GEMINI_QUOTA_LIMITS),
+                    enabled=GEMINI_QUOTA_ENABLED,
+                )
+    return _governor
@@ -2,17 +2,30 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
 from src.services.types import RawContent
-from src.services.fetcher import fetch_instagram, fetch_youtube
+from src.services.fetcher import ensure_audio, fetch_instagram, fetch_youtube
 from src.services.transcribe import transcribe_audio
-from src.services.errors import FetchFailedError, UnsupportedPlatformError, RateLimitedError, TranscriptionServiceError
+from src.services.errors import FetchFailedError, InvalidURLError, UnsupportedPlatformError, RateLimitedError, TranscriptionServiceError
 from src.services.ids import detect_platform
-from src.services.Prompt import run_recipe_agent
+from src.services.ingest_cache import IngestCache
+from src.services.Prompt import recipe_prompt_hash, run_recipe_agent
 
 DEFAULT_TRANSCRIPT_MIN_CHARS = 32
 TRANSCRIPTS_DIR = Path("data/transcripts")
 
+STAGE_FETCHING = "FETCHING"
+STAGE_TRANSCRIBING = "TRANSCRIBING"
+STAGE_EXTRACTING = "EXTRACTING"
+
+# Recebe (stage, progresso entre 0 e 1); usado pelo worker de ingestao.
+ProgressFn = Callable[[str, float], None]
+
+
+def _noop_progress(stage: str, progress: float) -> None:
+    return None
+
 PLATFORM_FETCHERS = {
     "youtube": fetch_youtube,
     "instagram": fetch_instagram,
@@ -132,7 +145,10 @@ def should_transcribe_content(
 
 
 def _fetch_content(url: str) -> RawContent:
-    platform = detect_platform(url)
+    try:
+        platform = detect_platform(url)
+    except ValueError as error:
+        raise InvalidURLError(str(error)) from error
     fetcher = PLATFORM_FETCHERS.get(platform)
 
     if not fetcher:
@@ -198,34 +214,57 @@ def _run_ai_extraction(content: RawContent) -> dict:
 
 
 def _needs_transcription(content: RawContent, force: bool, min_chars: int) -> bool:
-    if not content.audio_path:
-        return False
-
     if force:
         return True
 
     return should_transcribe_content(content.transcript, content.subtitles, min_chars)
 
 
-def ingest(
+def _extract(
     url: str,
-    *,
-    force_transcription: bool = False,
-    transcript_min_chars: int = DEFAULT_TRANSCRIPT_MIN_CHARS,
-) -> dict[str, RawContent | dict]:
+    force_transcription: bool,
+    transcript_min_chars: int,
+    progress: ProgressFn = _noop_progress,
+) -> tuple[RawContent, dict]:
+    progress(STAGE_FETCHING, 0.05)
     content = _fetch_content(url)
 
+    # O audio so e baixado quando o texto coletado nao basta.
     if _needs_transcription(content, force_transcription, transcript_min_chars):
-        transcript_info = _try_audio_transcription(content)
-        if transcript_info:
-            _apply_transcription(content, transcript_info)
-        elif not (content.caption or content.transcript or content.subtitles):
-            raise FetchFailedError("Falha ao transcrever audio sem fallback disponivel")
+        progress(STAGE_TRANSCRIBING, 0.25)
+        if ensure_audio(content):
+            transcript_info = _try_audio_transcription(content)
+            if transcript_info:
+                _apply_transcription(content, transcript_info)
+            elif not (content.caption or content.transcript or content.subtitles):
+                raise FetchFailedError("Falha ao transcrever audio sem fallback disponivel")
 
     _fallback_to_subtitles(content)
     _validate_content_has_text(content)
 
-    structured_recipe = _run_ai_extraction(content)
+    progress(STAGE_EXTRACTING, 0.6)
+    return content, _run_ai_extraction(content)
+
+
+def ingest(
+    url: str,
+    *,
+    force_transcription: bool = False,
+    transcript_min_chars: int = DEFAULT_TRANSCRIPT_MIN_CHARS,
+    cache: IngestCache | None = None,
+    progress: ProgressFn | None = None,
+) -> dict[str, RawContent | dict]:
+    report = progress or _noop_progress
+    if cache is None or force_transcription:
+        content, structured_recipe = _extract(url, force_transcription, transcript_min_chars, report)
+    else:
+        entry = cache.get_or_extract(
+            url,
+            recipe_prompt_hash(),
+            lambda: _extract(url, force_transcription, transcript_min_chars, report),
+        )
+        content, structured_recipe = entry.raw_content, entry.ai_recipe
+
     metadata = _compose_metadata(content, structured_recipe)
 
     return {
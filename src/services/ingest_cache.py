@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Protocol
+
+from supabase import Client
+
+from src.services.ids import detect_platform_and_id
+from src.services.types import RawContent
+
+logger = logging.getLogger(__name__)
+
+INGEST_CACHE_ENABLED = os.getenv("INGEST_CACHE_ENABLED", "true").lower() == "true"
+INGEST_CACHE_TTL_SECONDS = int(os.getenv("INGEST_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+INGEST_CACHE_VERSION = os.getenv("INGEST_CACHE_VERSION", "1")
+INGEST_CACHE_TABLE = "ingest_cache"
+
+_RAW_CONTENT_FIELDS = {item.name for item in fields(RawContent)}
+
+ExtractFn = Callable[[], tuple[RawContent, dict[str, Any]]]
+
+
+def prompt_hash(system_prompt: str, model_name: str, version: str = INGEST_CACHE_VERSION) -> str:
+    """Hash do prompt + modelo: mudar qualquer um invalida as extrações antigas."""
+    digest = hashlib.sha256()
+    for part in (version, model_name, system_prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class IngestCacheKey:
+    platform: str
+    video_id: str
+    prompt_hash: str
+
+    @classmethod
+    def for_url(cls, url: str, prompt_hash: str) -> "IngestCacheKey":
+        platform, video_id = detect_platform_and_id(url)
+        return cls(platform=platform, video_id=video_id, prompt_hash=prompt_hash)
+
+
+@dataclass
+class IngestCacheEntry:
+    raw_content: RawContent
+    ai_recipe: dict[str, Any]
+
+
+def serialize_raw_content(content: RawContent) -> dict[str, Any]:
+    data = asdict(content)
+    # O arquivo de audio local nao existe em outra maquina/replica.
+    data["audio_path"] = None
+    return data
+
+
+def deserialize_raw_content(data: dict[str, Any]) -> RawContent:
+    values = {name: data.get(name) for name in _RAW_CONTENT_FIELDS}
+    return RawContent(**values)
+
+
+class IngestCacheStore(Protocol):
+    def get(self, key: IngestCacheKey) -> IngestCacheEntry | None: ...
+
+    def put(self, key: IngestCacheKey, entry: IngestCacheEntry) -> None: ...
+
+
+class SupabaseIngestCacheStore:
+    """Tabela `ingest_cache`, compartilhada entre replicas da API e workers."""
+
+    def __init__(self, client: Client, ttl_seconds: int = INGEST_CACHE_TTL_SECONDS) -> None:
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: IngestCacheKey) -> IngestCacheEntry | None:
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            response = (
+                self._client.table(INGEST_CACHE_TABLE)
+                .select("raw_content, ai_recipe")
+                .eq("platform", key.platform)
+                .eq("video_id", key.video_id)
+                .eq("prompt_hash", key.prompt_hash)
+                .gt("expires_at", now)
+                .limit(1)
+                .execute()
+            )
+        except Exception:
+            logger.exception("Erro ao consultar cache de ingestao")
+            return None
+
+        rows = response.data or []
+        if not rows:
+            return None
+        raw_content = rows[0].get("raw_content")
+        ai_recipe = rows[0].get("ai_recipe")
+        if not isinstance(raw_content, dict) or not isinstance(ai_recipe, dict):
+            return None
+        return IngestCacheEntry(raw_content=deserialize_raw_content(raw_content), ai_recipe=ai_recipe)
+
+    def put(self, key: IngestCacheKey, entry: IngestCacheEntry) -> None:
+        now = datetime.now(timezone.utc)
+        row = {
+            "platform": key.platform,
+            "video_id": key.video_id,
+            "prompt_hash": key.prompt_hash,
+            "raw_content": serialize_raw_content(entry.raw_content),
+            "ai_recipe": entry.ai_recipe,
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=self.ttl_seconds)).isoformat(),
+        }
+        try:
+            (
+                self._client.table(INGEST_CACHE_TABLE)
+                .upsert(row, on_conflict="platform,video_id,prompt_hash")
+                .execute()
+            )
+        except Exception:
+            logger.exception("Erro ao gravar cache de ingestao")
+
+
+class IngestCache:
+    """
+    Cache de extração por (plataforma, id do video, hash do prompt).
+    Importações simultâneas do mesmo video no processo esperam a primeira
+    terminar em vez de repetir download, Whisper e Gemini.
+    """
+
+    def __init__(self, store: IngestCacheStore) -> None:
+        self.store = store
+        self._locks: dict[IngestCacheKey, tuple[threading.Lock, int]] = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _acquire_ref(self, key: IngestCacheKey) -> threading.Lock:
+        with self._locks_guard:
+            lock, refs = self._locks.get(key, (threading.Lock(), 0))
+            self._locks[key] = (lock, refs + 1)
+            return lock
+
+    def _release_ref(self, key: IngestCacheKey) -> None:
+        with self._locks_guard:
+            lock, refs = self._locks[key]
+            if refs <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, refs - 1)
+
+    def get_or_extract(self, url: str, prompt_hash: str, extract_fn: ExtractFn) -> IngestCacheEntry:
+        try:
+            key = IngestCacheKey.for_url(url, prompt_hash)
+        except ValueError:
+            content, ai_recipe = extract_fn()
+            return IngestCacheEntry(raw_content=content, ai_recipe=ai_recipe)
+
+        lock = self._acquire_ref(key)
+        try:
+            with lock:
+                cached = self.store.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    cached.raw_content.url = url
+                    logger.info("ingest.cache_hit platform=%s video=%s", key.platform, key.video_id)
+                    return cached
+
+                self.misses += 1
+                content, ai_recipe = extract_fn()
+                entry = IngestCacheEntry(raw_content=content, ai_recipe=ai_recipe)
+                self.store.put(key, entry)
+                return entry
+        finally:
+            self._release_ref(key)
+
+
+_cache_instance: IngestCache | None = None
+_cache_instance_lock = threading.Lock()
+
+
+def get_ingest_cache(supa: Client | None) -> IngestCache | None:
+    global _cache_instance
+    if not INGEST_CACHE_ENABLED or supa is None:
+        return None
+    with _cache_instance_lock:
+        if _cache_instance is None or getattr(_cache_instance.store, "_client", None) is not supa:
+            _cache_instance = IngestCache(SupabaseIngestCacheStore(supa))
+    return _cache_instance
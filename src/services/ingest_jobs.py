@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+INGEST_JOBS_TABLE = "ingest_jobs"
+
+MODE_INLINE = "inline"
+MODE_POSTGRES = "postgres"
+INGEST_QUEUE_MODE_ENV = "INGEST_QUEUE_MODE"
+
+STATUS_QUEUED = "QUEUED"
+STATUS_RUNNING = "RUNNING"
+STATUS_DONE = "DONE"
+STATUS_FAILED = "FAILED"
+
+STAGE_QUEUED = "QUEUED"
+STAGE_SAVING = "SAVING"
+STAGE_DONE = "DONE"
+STAGE_FAILED = "FAILED"
+
+_JOB_COLUMNS = (
+    "id, user_id, url, status, stage, progress, recipe_id, attempt_count, max_attempts, "
+    "error_message, created_at, updated_at, started_at, finished_at"
+)
+
+
+def get_ingest_queue_mode() -> str:
+    return os.getenv(INGEST_QUEUE_MODE_ENV, MODE_INLINE).lower()
+
+
+def enqueue_ingest_job(
+    supa: Client,
+    user_id: str,
+    url: str,
+    max_attempts: int | None = None,
+) -> Dict[str, Any]:
+    attempts = max_attempts or int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+    job_data = {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "url": url,
+        "status": STATUS_QUEUED,
+        "stage": STAGE_QUEUED,
+        "progress": 0,
+        "attempt_count": 0,
+        "max_attempts": attempts,
+    }
+    response = supa.table(INGEST_JOBS_TABLE).insert(job_data).execute()
+    rows = response.data or []
+    return rows[0] if rows else job_data
+
+
+def get_ingest_job(supa: Client, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    response = (
+        supa.table(INGEST_JOBS_TABLE)
+        .select(_JOB_COLUMNS)
+        .eq("id", job_id)
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+    )
+    rows = response.data or []
+    return rows[0] if rows else None
+
+
+def update_ingest_job_progress(supa: Client, job_id: str, stage: str, progress: float) -> None:
+    """Atualiza stage/progresso e serve de heartbeat; falhas aqui nao derrubam o job."""
+    update_data = {
+        "stage": stage,
+        "progress": max(0.0, min(1.0, progress)),
+        "last_heartbeat_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        supa.table(INGEST_JOBS_TABLE).update(update_data).eq("id", job_id).execute()
+    except Exception:
+        logger.exception("Erro ao atualizar progresso do ingest job %s", job_id)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Sequence
 from uuid import uuid4
@@ -13,11 +14,37 @@ from src.services.ids import detect_platform_and_id
 from src.services.persist_models import ChunkRecord, RecipeRecord, RecipeSourceRecord
 from src.services.slugify import slugify, unique_slug
 from src.services.types import RawContent
-from src.services.embedding import embedding_document, stringify_payload
+from src.services.chunking import split_into_chunks
+from src.services.embedding import (
+    EMBEDDING_MODEL,
+    TASK_RETRIEVAL_DOCUMENT,
+    embedding_documents,
+    stringify_payload,
+)
+from src.services.embedding_cache import get_embedding_cache
+from src.services.rerank import rerank_chunks
+from src.services.vector_index import (
+    VECTOR_RETRIEVER,
+    ChunkRetriever,
+    claim_owner_backfill,
+    get_local_index_writer,
+    get_local_retriever,
+    mark_supabase_rpc_missing,
+)
 
 
 
 DEFAULT_CHAT_ID = "default"
+SIMILAR_CHUNKS_RPC = "match_owner_recipe_chunks"
+LOCAL_INDEX_BACKFILL_BATCH = 100
+# hnsw.ef_search do RPC: maior = mais recall, mais latencia.
+VECTOR_EF_SEARCH = int(os.getenv("VECTOR_EF_SEARCH", "40"))
+HYBRID_CHUNKS_RPC = "match_owner_recipe_chunks_hybrid"
+CHAT_HYBRID_RETRIEVAL = os.getenv("CHAT_HYBRID_RETRIEVAL", "true").lower() == "true"
+# Candidatos so vetoriais abaixo disso ficam fora da fusao (os lexicais sempre entram).
+HYBRID_MIN_SIMILARITY = float(os.getenv("CHAT_HYBRID_MIN_SIMILARITY", "0.5"))
+CHAT_RETRIEVAL_RERANK = os.getenv("CHAT_RETRIEVAL_RERANK", "true").lower() == "true"
+RERANK_CANDIDATE_FACTOR = 3
 logger = logging.getLogger(__name__)
 
 
@@ -38,58 +65,108 @@ def find_similar_chunks(
     query_embedding: list[float],
     match_threshold: float = 0.75,
     match_count: int = 3,
+    ef_search: int | None = None,
+    query_text: Optional[str] = None,
 ) -> list[dict]:
     """
-    Encontra chunks de receita similares usando busca por similaridade de vetores,
-    filtrando apenas os chunks que pertencem ao usuário especificado.
+    Encontra chunks de receita similares usando busca por similaridade de vetores.
+    O RPC filtra pelo dono antes do ranking (indice HNSW), entao o top-k ja vem
+    so com chunks do usuario. Com `query_text`, usa a busca hibrida (full-text +
+    vetor com RRF) e, se ela nao existir no banco, cai na busca so vetorial.
     """
     payload = {
         "owner_id_filter": user_id,
         "query_embedding": query_embedding,
         "match_threshold": match_threshold,
         "match_count": match_count,
+        "ef_search": ef_search or VECTOR_EF_SEARCH,
     }
 
+    local_retriever = get_local_retriever()
+    if local_retriever is not None and VECTOR_RETRIEVER == "local":
+        return local_retriever.search(user_id, query_embedding, match_count, match_threshold)
+
+    if query_text and CHAT_HYBRID_RETRIEVAL:
+        try:
+            return _find_hybrid_chunks(supa, user_id, query_embedding, query_text, match_count, ef_search)
+        except Exception as err:
+            if "PGRST202" not in str(err):
+                logger.exception("Erro na busca hibrida de chunks")
+                return []
+
     try:
-        result = supa.rpc("match_recipe_chunks", payload).execute()
-        data = result.data or []
-        if data:
-            return data
+        result = supa.rpc(SIMILAR_CHUNKS_RPC, payload).execute()
+        return result.data or []
     except Exception as err:
-        error_message = str(err)
-        if "PGRST202" not in error_message:
-            logger.exception("Erro ao buscar chunks similares")
-            return []
+        # PGRST202: o RPC nao existe neste banco (dev/modo in-memory).
+        if local_retriever is not None and "PGRST202" in str(err):
+            mark_supabase_rpc_missing()
+            if claim_owner_backfill(user_id):
+                _backfill_local_index(supa, local_retriever, user_id)
+            return local_retriever.search(user_id, query_embedding, match_count, match_threshold)
+        logger.exception("Erro ao buscar chunks similares")
+        return []
 
-    # Fallback para implementações antigas da função SQL que não aceitam owner_id_filter.
+
+def _backfill_local_index(supa: Client, retriever: ChunkRetriever, owner_id: str) -> None:
+    """Carrega no indice local os chunks ja salvos do dono (antes so entravam os saves novos)."""
     try:
-        legacy_payload = {
-            "query_embedding": query_embedding,
-            "match_threshold": match_threshold,
-            "match_count": match_count,
-        }
-        result = supa.rpc("match_recipe_chunks", legacy_payload).execute()
-        data = result.data or []
-        if not data:
-            return []
-
-        # Caso a função antiga retorne chunks de múltiplos usuários, filtramos manualmente.
-        filtered: list[dict] = []
-        for item in data:
-            owner_id = str(
-                item.get("owner_id")
-                or item.get("user_id")
-                or item.get("recipe_owner_id")
-                or item.get("owner")
-                or ""
+        recipe_rows = supa.table("recipes").select("recipe_id").eq("owner_id", owner_id).execute().data or []
+        recipe_ids = [str(row["recipe_id"]) for row in recipe_rows]
+        chunk_rows: List[Dict[str, Any]] = []
+        for start in range(0, len(recipe_ids), LOCAL_INDEX_BACKFILL_BATCH):
+            batch = recipe_ids[start:start + LOCAL_INDEX_BACKFILL_BATCH]
+            response = (
+                supa.table("recipe_chunks")
+                .select("recipe_id,chunk_index,chunk_text,embedding")
+                .in_("recipe_id", batch)
+                .execute()
             )
-            if owner_id and owner_id != user_id:
-                continue
-            filtered.append(item)
-        return filtered or data
-    except Exception as err:
-        logger.exception("Erro ao buscar chunks similares (fallback)")
-        return []
+            chunk_rows.extend(response.data or [])
+    except Exception:
+        logger.exception("Erro ao carregar chunks do dono %s para o indice local", owner_id)
+        return
+
+    chunks: List[Dict[str, Any]] = []
+    embeddings: List[List[float]] = []
+    for row in chunk_rows:
+        embedding = row.get("embedding")
+        # O PostgREST devolve vector como texto ("[0.1,0.2,...]").
+        if isinstance(embedding, str):
+            embedding = json.loads(embedding)
+        if not embedding:
+            continue
+        chunks.append(row)
+        embeddings.append(embedding)
+    try:
+        retriever.replace_owner(owner_id, chunks, embeddings)
+    except Exception:
+        logger.exception("Erro ao gravar o indice vetorial local do dono %s", owner_id)
+        return
+    logger.info("Indice vetorial local carregado: dono=%s, chunks=%d", owner_id, len(chunks))
+
+
+def _find_hybrid_chunks(
+    supa: Client,
+    user_id: str,
+    query_embedding: list[float],
+    query_text: str,
+    match_count: int,
+    ef_search: int | None,
+) -> list[dict]:
+    fetch_count = match_count * RERANK_CANDIDATE_FACTOR if CHAT_RETRIEVAL_RERANK else match_count
+    payload = {
+        "owner_id_filter": user_id,
+        "query_embedding": query_embedding,
+        "query_text": query_text,
+        "match_count": fetch_count,
+        "min_similarity": HYBRID_MIN_SIMILARITY,
+        "ef_search": ef_search or VECTOR_EF_SEARCH,
+    }
+    data = supa.rpc(HYBRID_CHUNKS_RPC, payload).execute().data or []
+    if CHAT_RETRIEVAL_RERANK:
+        return rerank_chunks(query_text, data, match_count)
+    return data
 
 
 def get_chat_history(
@@ -500,32 +577,103 @@ def upsert_recipe_minimal(
     return recipe_id
 
 
-def save_chunks(supa: Client, recipe_id: str, payload: Dict[str, Any] | str):
-
+def _payload_chunk_texts(payload: Dict[str, Any] | str) -> List[str]:
     if isinstance(payload, str):
-        chunk_text = payload
+        full_text = payload
     else:
-        chunk_text = stringify_payload(payload)
+        full_text = stringify_payload(payload)
+    return split_into_chunks(full_text) or [full_text]
+
+
+def _chunk_records(recipe_id: str, chunk_texts: List[str], embeddings: List[List[float]]) -> List[Dict[str, Any]]:
+    return [
+        ChunkRecord(
+            recipe_id=recipe_id,
+            chunk_index=index,
+            chunk_text=chunk_text,
+            embedding=embedding,
+        ).model_dump()
+        for index, (chunk_text, embedding) in enumerate(zip(chunk_texts, embeddings))
+    ]
 
+
+def save_chunks(
+    supa: Client,
+    recipe_id: str,
+    payload: Dict[str, Any] | str,
+    owner_id: Optional[str] = None,
+):
+    save_chunks_batch(supa, [(recipe_id, payload)], {recipe_id: owner_id} if owner_id else None)
+
+
+def save_chunks_batch(
+    supa: Client,
+    items: List[tuple[str, Dict[str, Any] | str]],
+    owner_ids: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Gera os chunks de varias receitas com uma chamada de embedding e um insert.
+    Com `owner_ids` (recipe_id -> dono), o indice vetorial local tambem e atualizado.
+    """
+    if not items:
+        return
+
+    texts_by_recipe = [(recipe_id, _payload_chunk_texts(payload)) for recipe_id, payload in items]
+    all_texts = [text for _, chunk_texts in texts_by_recipe for text in chunk_texts]
+    # Embeda todos os chunks antes de apagar os antigos,
+    # assim uma falha na API nao deixa a receita sem chunks.
+    embeddings = _embed_chunk_texts(supa, all_texts)
+
+    records: List[Dict[str, Any]] = []
+    offset = 0
+    for recipe_id, chunk_texts in texts_by_recipe:
+        records.extend(_chunk_records(recipe_id, chunk_texts, embeddings[offset:offset + len(chunk_texts)]))
+        offset += len(chunk_texts)
+
+    recipe_ids = [recipe_id for recipe_id, _ in texts_by_recipe]
     try:
-        supa.table("recipe_chunks").delete().eq("recipe_id", recipe_id).execute()
+        supa.table("recipe_chunks").delete().in_("recipe_id", recipe_ids).execute()
     except Exception as exc:
-        logger.exception("Erro ao limpar chunks anteriores da receita %s", recipe_id)
+        logger.exception("Erro ao limpar chunks anteriores das receitas %s", recipe_ids)
+
+    supa.table("recipe_chunks").insert(records).execute()
+
+    local_retriever = get_local_index_writer() if owner_ids else None
+    if local_retriever is not None:
+        offset = 0
+        for recipe_id, chunk_texts in texts_by_recipe:
+            recipe_embeddings = embeddings[offset:offset + len(chunk_texts)]
+            offset += len(chunk_texts)
+            owner_id = owner_ids.get(recipe_id)
+            if not owner_id:
+                continue
+            try:
+                local_retriever.upsert_recipe(owner_id, recipe_id, chunk_texts, recipe_embeddings)
+            except Exception:
+                logger.exception("Erro ao atualizar o indice vetorial local da receita %s", recipe_id)
 
-    chunk = ChunkRecord(
-        recipe_id=recipe_id,
-        chunk_index=0,
-        chunk_text=chunk_text,
-        embedding=embedding_document(chunk_text),
-    )
-    supa.table("recipe_chunks").insert(chunk.model_dump()).execute()
-    
-def delete_recipe_by_id(supa: Client, recipe_id: str):
+
+def _embed_chunk_texts(supa: Client, chunk_texts: List[str]) -> List[List[float]]:
+    cache = get_embedding_cache(supa)
+    if cache is None:
+        return embedding_documents(chunk_texts)
+    return cache.embed(chunk_texts, EMBEDDING_MODEL, TASK_RETRIEVAL_DOCUMENT, embedding_documents)
+
+
+def delete_recipe_by_id(supa: Client, recipe_id: str, owner_id: Optional[str] = None):
     """Exclui a receita e seus dados relacionados pelo recipe_id."""
+    local_retriever = get_local_index_writer()
+    if local_retriever is not None and owner_id is None:
+        owner_rows = (
+            supa.table("recipes").select("owner_id").eq("recipe_id", recipe_id).limit(1).execute().data or []
+        )
+        owner_id = str(owner_rows[0]["owner_id"]) if owner_rows else None
     supa.table("recipes").delete().eq("recipe_id", recipe_id).execute()
     supa.table("recipe_sources").delete().eq("recipe_id", recipe_id).execute()
     supa.table("recipe_chunks").delete().eq("recipe_id", recipe_id).execute()
-    
+    if local_retriever is not None and owner_id:
+        local_retriever.remove_recipe(owner_id, recipe_id)
+
 def get_recipe_by_id(recipe_id: str, supa):
     recipe = (
         supa.table("recipes")
@@ -565,6 +713,35 @@ def update_recipe_embedding_status(
         logger.exception("Erro ao atualizar embedding_status da receita %s", recipe_id)
 
 
+def update_recipes_embedding_status(
+    supa: Client,
+    recipes: List[tuple[str, str]],
+    status: str,
+    error: Optional[str],
+) -> None:
+    """Versao em lote de update_recipe_embedding_status: `recipes` sao pares (recipe_id, owner_id)."""
+    ids_by_owner: Dict[str, List[str]] = {}
+    for recipe_id, owner_id in recipes:
+        owner_recipes = ids_by_owner.setdefault(owner_id, [])
+        if recipe_id not in owner_recipes:
+            owner_recipes.append(recipe_id)
+    payload: Dict[str, Any] = {
+        "embedding_status": status,
+        "embedding_error": error[:500] if error is not None else None,
+    }
+    for owner_id, recipe_ids in ids_by_owner.items():
+        try:
+            (
+                supa.table("recipes")
+                .update(payload)
+                .in_("recipe_id", recipe_ids)
+                .eq("owner_id", owner_id)
+                .execute()
+            )
+        except Exception as exc:
+            logger.exception("Erro ao atualizar embedding_status das receitas %s", recipe_ids)
+
+
 def get_recipe_embedding_status(
     supa: Client,
     recipe_id: str,
@@ -661,6 +838,26 @@ def save_embedding_payload(
         logger.exception("Erro ao salvar payload de embedding no metadata da receita %s", recipe_id)
 
 
+def insert_embedding_job(
+    supa: Client,
+    recipe_id: str,
+    owner_id: str,
+    payload: str,
+    max_attempts: int = 5,
+) -> None:
+    """Enfileira um job na tabela embedding_jobs (consumida por workers.embedder)."""
+    job_data = {
+        "id": str(uuid4()),
+        "user_id": owner_id,
+        "recipe_id": recipe_id,
+        "status": "QUEUED",
+        "payload": payload,
+        "attempt_count": 0,
+        "max_attempts": max_attempts,
+    }
+    supa.table("embedding_jobs").insert(job_data).execute()
+
+
 def get_recipe_embedding_payload(
     supa: Client,
     recipe_id: str,
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveTokenBucket:
+    """Token bucket cuja taxa de reposicao se adapta aos limites da API (AIMD).
+
+    `acquire` bloqueia ate haver token. Cada `on_success` aumenta a taxa aos
+    poucos ate `max_rate`; cada `on_rate_limited` corta a taxa pela metade (ate
+    `min_rate`) e pausa todos os chamadores por `cooldown_seconds`, entao uma
+    rajada de 429 freia o processo inteiro em vez de cada chamador tentar de novo
+    por conta propria.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: float | None = None,
+        min_rate: float | None = None,
+        max_rate: float | None = None,
+        increase_step: float | None = None,
+        decrease_factor: float = 0.5,
+        cooldown_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.max_rate = max_rate or rate_per_second
+        self.min_rate = min_rate or max(self.max_rate / 20, 0.01)
+        self.rate = min(rate_per_second, self.max_rate)
+        self.capacity = burst or max(1.0, self.rate)
+        self.increase_step = increase_step or self.max_rate / 20
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def reserve(self, tokens: float = 1.0, headroom: float = 0.0) -> float:
+        """Tenta reservar `tokens`; devolve 0 se conseguiu ou quanto esperar.
+
+        `headroom` tokens precisam sobrar no bucket depois da reserva: chamadas
+        de menor prioridade usam isso para deixar folga para as interativas.
+        """
+        tokens = min(tokens, self.capacity)
+        needed = min(tokens + max(0.0, headroom), self.capacity)
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= needed:
+                self._tokens -= tokens
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        return self.reserve(tokens) == 0.0
+
+    def acquire(self, tokens: float = 1.0, timeout: float | None = None, headroom: float = 0.0) -> bool:
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.reserve(tokens, headroom)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+    def release(self, tokens: float = 1.0) -> None:
+        """Devolve tokens reservados que nao chegaram a ser usados."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + min(tokens, self.capacity))
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(self._clock())
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_rate_limited(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + self.cooldown_seconds)
+            rate = self.rate
+        logger.warning("Rate limited upstream; backing off to %.2f req/s", rate)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from typing import Any, Dict, List, Sequence
+
+# Peso da cobertura de termos da pergunta versus a ordem vinda do RPC.
+RERANK_LEXICAL_WEIGHT = float(os.getenv("CHAT_RERANK_LEXICAL_WEIGHT", "0.5"))
+_TOKEN_RE = re.compile(r"\w+")
+_MIN_TERM_LENGTH = 3
+_STOPWORDS = frozenset(
+    {
+        "como", "para", "com", "sem", "uma", "uns", "umas", "que", "qual", "quais",
+        "onde", "quando", "quanto", "quanta", "mais", "menos", "muito", "pode", "posso",
+        "fazer", "faco", "tem", "ter", "receita", "receitas", "minha", "minhas", "meu",
+        "meus", "das", "dos", "nas", "nos", "pela", "pelo", "por", "sobre", "isso", "esse",
+        "essa", "este", "esta", "usar", "uso", "preparar", "quero", "gostaria", "algum",
+        "alguma", "algo", "the", "and", "with",
+    }
+)
+
+
+def _terms(text: str) -> set[str]:
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return {
+        token
+        for token in _TOKEN_RE.findall(ascii_text)
+        if len(token) >= _MIN_TERM_LENGTH and token not in _STOPWORDS
+    }
+
+
+def rerank_chunks(
+    query: str,
+    chunks: Sequence[Dict[str, Any]],
+    top_n: int,
+    lexical_weight: float = RERANK_LEXICAL_WEIGHT,
+) -> List[Dict[str, Any]]:
+    """
+    Reranking leve, sem modelo: mistura a posicao original do candidato com
+    a fracao dos termos da pergunta que aparecem no chunk (sem acento).
+    """
+    terms = _terms(query)
+    if not terms or len(chunks) <= 1:
+        return list(chunks[:top_n])
+
+    total = len(chunks)
+
+    def score(item: tuple[int, Dict[str, Any]]) -> float:
+        position, chunk = item
+        order_score = 1.0 - position / total
+        coverage = len(terms & _terms(str(chunk.get("chunk_text") or ""))) / len(terms)
+        return (1.0 - lexical_weight) * order_score + lexical_weight * coverage
+
+    ranked = sorted(enumerate(chunks), key=score, reverse=True)
+    return [chunk for _, chunk in ranked[:top_n]]
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "auto": usa o RPC do Supabase e cai no indice local quando o RPC nao existe
+# (so entao o indice local passa a ser alimentado, e cada dono e carregado
+# de recipe_chunks na primeira busca); "local": so o indice local;
+# "supabase": sem indice local.
+VECTOR_RETRIEVER = os.getenv("VECTOR_RETRIEVER", "auto").lower()
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "data/vector_index"))
+
+
+class ChunkRetriever(ABC):
+    """Interface de busca top-k de chunks por dono, alimentada pelo save_chunks."""
+
+    @abstractmethod
+    def search(
+        self,
+        owner_id: str,
+        query_embedding: Sequence[float],
+        match_count: int = 3,
+        match_threshold: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def upsert_recipe(
+        self,
+        owner_id: str,
+        recipe_id: str,
+        chunk_texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def replace_owner(
+        self,
+        owner_id: str,
+        chunks: Sequence[Dict[str, Any]],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def remove_recipe(self, owner_id: str, recipe_id: str) -> None:
+        pass
+
+
+@dataclass
+class _OwnerIndex:
+    matrix: np.ndarray
+    chunks: List[Dict[str, Any]]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class NumpyChunkRetriever(ChunkRetriever):
+    """
+    Indice vetorial em processo: uma matriz float32 por dono, ja normalizada,
+    salva em .npy e aberta com memory-map; a busca e um produto escalar
+    vetorizado + argpartition. Serve para dev/testes/modo in-memory e como
+    baseline para comparar com o pgvector.
+    """
+
+    def __init__(self, directory: Path = VECTOR_INDEX_DIR) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self._owners: Dict[str, _OwnerIndex] = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, owner_id: str) -> tuple[Path, Path]:
+        name = hashlib.sha256(owner_id.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{name}.npy", self.directory / f"{name}.json"
+
+    def _load(self, owner_id: str) -> Optional[_OwnerIndex]:
+        index = self._owners.get(owner_id)
+        if index is not None:
+            return index
+        matrix_path, chunks_path = self._paths(owner_id)
+        if not matrix_path.exists() or not chunks_path.exists():
+            return None
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            chunks = json.loads(chunks_path.read_text(encoding="utf-8"))["chunks"]
+        except (OSError, ValueError, KeyError):
+            logger.exception("Indice vetorial local corrompido para o dono %s", owner_id)
+            return None
+        index = _OwnerIndex(matrix=matrix, chunks=chunks)
+        self._owners[owner_id] = index
+        return index
+
+    def _store(self, owner_id: str, matrix: np.ndarray, chunks: List[Dict[str, Any]]) -> None:
+        matrix_path, chunks_path = self._paths(owner_id)
+        # Solta o memory-map antigo antes de substituir o arquivo (Windows).
+        self._owners.pop(owner_id, None)
+        tmp_matrix = matrix_path.with_suffix(".tmp.npy")
+        tmp_chunks = chunks_path.with_suffix(".tmp.json")
+        np.save(tmp_matrix, matrix)
+        tmp_chunks.write_text(
+            json.dumps({"owner_id": owner_id, "chunks": chunks}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_chunks, chunks_path)
+
+    def search(
+        self,
+        owner_id: str,
+        query_embedding: Sequence[float],
+        match_count: int = 3,
+        match_threshold: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            index = self._load(owner_id)
+        if index is None or not index.chunks or match_count <= 0:
+            return []
+
+        query = _normalize_rows(np.asarray([query_embedding], dtype=np.float32))[0]
+        scores = index.matrix @ query
+        k = min(match_count, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results: List[Dict[str, Any]] = []
+        for position in top:
+            similarity = float(scores[position])
+            if similarity < match_threshold:
+                break
+            results.append({**index.chunks[position], "similarity": similarity})
+        return results
+
+    def upsert_recipe(
+        self,
+        owner_id: str,
+        recipe_id: str,
+        chunk_texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        new_rows = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_texts), -1))
+        new_chunks = [
+            {"recipe_id": recipe_id, "chunk_index": chunk_index, "chunk_text": chunk_text}
+            for chunk_index, chunk_text in enumerate(chunk_texts)
+        ]
+        with self._lock:
+            index = self._load(owner_id)
+            if index is None or not index.chunks:
+                matrix, chunks = new_rows, new_chunks
+            else:
+                keep = np.fromiter(
+                    (chunk["recipe_id"] != recipe_id for chunk in index.chunks),
+                    dtype=bool,
+                    count=len(index.chunks),
+                )
+                if new_rows.shape[1] != index.matrix.shape[1]:
+                    logger.warning("Dimensao do embedding mudou para o dono %s; recriando o indice", owner_id)
+                    matrix, chunks = new_rows, new_chunks
+                else:
+                    matrix = np.concatenate([np.asarray(index.matrix[keep]), new_rows])
+                    chunks = [chunk for chunk, kept in zip(index.chunks, keep) if kept] + new_chunks
+            self._store(owner_id, matrix, chunks)
+
+    def replace_owner(
+        self,
+        owner_id: str,
+        chunks: Sequence[Dict[str, Any]],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        """Reescreve o indice do dono inteiro (carga inicial a partir de recipe_chunks)."""
+        chunk_rows = [
+            {
+                "recipe_id": str(chunk["recipe_id"]),
+                "chunk_index": int(chunk["chunk_index"]),
+                "chunk_text": chunk["chunk_text"],
+            }
+            for chunk in chunks
+        ]
+        with self._lock:
+            if not chunk_rows:
+                self._owners.pop(owner_id, None)
+                for path in self._paths(owner_id):
+                    path.unlink(missing_ok=True)
+                return
+            matrix = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_rows), -1))
+            self._store(owner_id, matrix, chunk_rows)
+
+    def remove_recipe(self, owner_id: str, recipe_id: str) -> None:
+        with self._lock:
+            index = self._load(owner_id)
+            if index is None:
+                return
+            keep = [chunk["recipe_id"] != recipe_id for chunk in index.chunks]
+            if all(keep):
+                return
+            matrix = np.asarray(index.matrix[np.asarray(keep, dtype=bool)])
+            chunks = [chunk for chunk, kept in zip(index.chunks, keep) if kept]
+            self._store(owner_id, matrix, chunks)
+
+
+_local_retriever: Optional[ChunkRetriever] = None
+_local_retriever_lock = threading.Lock()
+_supabase_rpc_missing = False
+_backfilled_owners: Set[str] = set()
+_backfilled_owners_lock = threading.Lock()
+
+
+def get_local_retriever() -> Optional[ChunkRetriever]:
+    if VECTOR_RETRIEVER == "supabase":
+        return None
+    global _local_retriever
+    if _local_retriever is None:
+        with _local_retriever_lock:
+            if _local_retriever is None:
+                try:
+                    _local_retriever = NumpyChunkRetriever()
+                except OSError:
+                    logger.exception("Nao foi possivel abrir o indice vetorial local")
+                    return None
+    return _local_retriever
+
+
+def mark_supabase_rpc_missing() -> None:
+    """Chamado ao ver PGRST202: no modo auto o indice local passa a ser a fonte."""
+    global _supabase_rpc_missing
+    _supabase_rpc_missing = True
+
+
+def get_local_index_writer() -> Optional[ChunkRetriever]:
+    """
+    Retriever para save/delete: so quando o indice local e de fato lido. Em
+    producao (RPC presente) nenhum save reescreve o .npy/.json do dono.
+    """
+    if VECTOR_RETRIEVER == "local" or (VECTOR_RETRIEVER == "auto" and _supabase_rpc_missing):
+        return get_local_retriever()
+    return None
+
+
+def claim_owner_backfill(owner_id: str) -> bool:
+    """
+    True so na primeira vez por processo: quem recebe True carrega o dono de
+    recipe_chunks. Receitas salvas antes do primeiro PGRST202 (ou antes do
+    processo subir) nao passaram pelo indice local.
+    """
+    with _backfilled_owners_lock:
+        if owner_id in _backfilled_owners:
+            return False
+        _backfilled_owners.add(owner_id)
+        return True
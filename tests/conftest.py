@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import os
+
+# src.app.config instancia Settings() no import; routers e chat_store precisam
+# destas variaveis mesmo quando os testes substituem Supabase e Gemini.
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import stat
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.app.domain.errors import InvalidMediaError, StorageDownloadError
+from src.app.services.audio_stream import FfmpegPcmStream
+
+
+def fake_ffmpeg(tmp_path: Path, body: str) -> str:
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!/bin/sh\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def pcm_bytes(samples: list[int]) -> bytes:
+    return np.array(samples, dtype=np.int16).tobytes()
+
+
+def test_yields_float_blocks_as_bytes_arrive(tmp_path: Path) -> None:
+    source = [pcm_bytes([0, 16384]), pcm_bytes([-16384, 32767])]
+    stream = FfmpegPcmStream(source, read_seconds=0.0001, ffmpeg_binary=fake_ffmpeg(tmp_path, "exec cat"))
+
+    audio = np.concatenate(list(stream))
+
+    assert audio.dtype == np.float32
+    assert audio.tolist() == pytest.approx([0.0, 0.5, -0.5, 32767 / 32768])
+    assert stream.samples_decoded == 4
+
+
+def test_source_error_wins_over_partial_decode(tmp_path: Path) -> None:
+    def source():
+        yield pcm_bytes([1, 2, 3])
+        raise StorageDownloadError("media/a.mp3", "connection reset")
+
+    stream = FfmpegPcmStream(source(), ffmpeg_binary=fake_ffmpeg(tmp_path, "exec cat"))
+
+    with pytest.raises(StorageDownloadError):
+        list(stream)
+
+
+def test_undecodable_media_raises_invalid_media(tmp_path: Path) -> None:
+    binary = fake_ffmpeg(tmp_path, "cat > /dev/null; echo 'moov atom not found' >&2; exit 1")
+    stream = FfmpegPcmStream([b"not audio"], ffmpeg_binary=binary)
+
+    with pytest.raises(InvalidMediaError, match="moov atom not found"):
+        list(stream)
+
+
+def test_decoder_failure_after_partial_output_is_not_accepted(tmp_path: Path) -> None:
+    binary = fake_ffmpeg(tmp_path, "printf '\\000\\001'; cat > /dev/null; echo 'corrupt frame' >&2; exit 1")
+    stream = FfmpegPcmStream([b"half a video"], ffmpeg_binary=binary)
+
+    with pytest.raises(InvalidMediaError, match="corrupt frame"):
+        list(stream)
+
+
+def test_empty_stream_raises_invalid_media(tmp_path: Path) -> None:
+    stream = FfmpegPcmStream([], ffmpeg_binary=fake_ffmpeg(tmp_path, "exec cat"))
+
+    with pytest.raises(InvalidMediaError):
+        list(stream)
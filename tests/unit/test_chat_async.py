@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from src.app.deps import CurrentUser
+from src.services import chat_store, persist_supabase
+
+USER = CurrentUser(id="user-1")
+BARRIER_TIMEOUT_SECONDS = 2
+
+
+class FakeChatStore:
+    """Substitui as chamadas ao Supabase usadas por send_message_async."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch, parallel: int = 0) -> None:
+        # Cada chamada marcada espera as outras na barreira: se elas rodassem
+        # em sequencia, a barreira estouraria o timeout.
+        self.barrier = threading.Barrier(parallel) if parallel else None
+        self.saved: List[Dict[str, Any]] = []
+        self.agent_calls: List[tuple] = []
+        self.history = [
+            {"role": "user", "content": "oi"},
+            {"role": "assistant", "content": "Olá!"},
+        ]
+        monkeypatch.setattr(persist_supabase, "save_chat_message", self.save_chat_message)
+        monkeypatch.setattr(persist_supabase, "get_chat_history", self.get_chat_history)
+        monkeypatch.setattr(persist_supabase, "has_completed_embeddings", self.has_completed_embeddings)
+        monkeypatch.setattr(persist_supabase, "get_recipe_embedding_status", self.get_recipe_embedding_status)
+        monkeypatch.setattr(persist_supabase, "get_recipe_chunks", self.get_recipe_chunks)
+        monkeypatch.setattr(
+            persist_supabase,
+            "find_similar_chunks",
+            lambda supa, user_id, embedding, query_text=None: [
+                {"recipe_id": "r1", "chunk_text": "Homus: grão-de-bico e tahini."}
+            ],
+        )
+        monkeypatch.setattr(chat_store, "embed_query_cached", lambda message, embed_fn, model, supa: [0.1, 0.2])
+        monkeypatch.setattr(chat_store, "run_chat_agent_async", self.run_chat_agent_async)
+        self.embedding_status = "completed"
+
+    def _wait_for_peers(self) -> None:
+        if self.barrier is not None:
+            self.barrier.wait(timeout=BARRIER_TIMEOUT_SECONDS)
+
+    def save_chat_message(self, user_id, role, content, supa, **kwargs) -> Dict[str, Any]:
+        if role == "user":
+            self._wait_for_peers()
+        record = {"message_id": f"m-{len(self.saved) + 1}", "role": role, "content": content, **kwargs}
+        self.saved.append(record)
+        return record
+
+    def get_chat_history(self, user_id, supa, limit=50, chat_id=None) -> List[Dict[str, Any]]:
+        self._wait_for_peers()
+        return self.history + [{"role": "user", "content": "como faço homus?"}]
+
+    def has_completed_embeddings(self, supa, user_id) -> bool:
+        self._wait_for_peers()
+        return True
+
+    def get_recipe_embedding_status(self, supa, recipe_id, user_id) -> Dict[str, Any]:
+        self._wait_for_peers()
+        return {"status": self.embedding_status}
+
+    def get_recipe_chunks(self, supa, recipe_id) -> List[Dict[str, Any]]:
+        self._wait_for_peers()
+        return [{"chunk_text": "Bata o grão-de-bico com tahini."}]
+
+    async def run_chat_agent_async(self, history, message, context_text) -> str:
+        self.agent_calls.append((history, message, context_text))
+        return "Use tahini."
+
+
+def _send(**kwargs) -> Dict[str, Dict[str, Any]]:
+    return asyncio.run(chat_store.send_message_async(user=USER, supa=object(), message="como faço homus?", **kwargs))
+
+
+def test_save_history_and_context_run_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeChatStore(monkeypatch, parallel=3)
+
+    result = _send(chat_id="chat-1")
+
+    history, message, context_text = fake.agent_calls[0]
+    assert history == fake.history
+    assert message == "como faço homus?"
+    assert "tahini" in context_text
+    assert result["assistant"]["content"] == "Use tahini."
+    assert result["assistant"]["chatId"] == "chat-1"
+    assert fake.saved[-1]["related_recipe_ids"] == ["r1"]
+
+
+def test_recipe_status_and_chunks_are_read_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeChatStore(monkeypatch, parallel=2)
+
+    context_text, recipe_ids = asyncio.run(
+        chat_store.get_context_async("como faço homus?", "r9", USER, object())
+    )
+
+    assert "tahini" in context_text
+    assert recipe_ids == ["r9"]
+
+
+def test_recipe_without_completed_embeddings_has_no_context(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeChatStore(monkeypatch)
+    fake.embedding_status = "pending"
+
+    assert asyncio.run(chat_store.get_context_async("oi", "r9", USER, object())) == (None, ["r9"])
+
+
+def test_new_chat_skips_history_lookup(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeChatStore(monkeypatch)
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("conversa nova nao busca historico")
+
+    monkeypatch.setattr(persist_supabase, "get_chat_history", unexpected)
+
+    result = _send()
+
+    assert fake.agent_calls[0][0] == []
+    assert result["user"]["chatId"] == result["assistant"]["chatId"]
+
+
+def test_embedding_failure_answers_without_context(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeChatStore(monkeypatch)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("quota")
+
+    monkeypatch.setattr(chat_store, "embed_query_cached", fail)
+
+    result = _send(chat_id="chat-1")
+
+    assert fake.agent_calls[0][2] is None
+    assert result["assistant"]["content"] == "Use tahini."
+
+
+def test_agent_failure_saves_fallback_answer(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = FakeChatStore(monkeypatch)
+
+    async def fail(history, message, context_text) -> str:
+        raise RuntimeError("gemini fora do ar")
+
+    monkeypatch.setattr(chat_store, "run_chat_agent_async", fail)
+
+    result = _send(chat_id="chat-1")
+
+    assert result["assistant"]["content"] == chat_store.CHAT_ERROR_FALLBACK
+    assert fake.saved[-1]["role"] == "assistant"
+
+
+def test_persistence_error_propagates(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeChatStore(monkeypatch)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("supabase fora do ar")
+
+    monkeypatch.setattr(persist_supabase, "save_chat_message", fail)
+
+    with pytest.raises(RuntimeError, match="supabase fora do ar"):
+        _send(chat_id="chat-1")
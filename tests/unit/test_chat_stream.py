@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.deps import CurrentUser, get_current_user, get_supabase
+from src.app.routers import chat
+from src.services import chat_store
+
+
+def _message(role: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"{role}-1",
+        "role": role,
+        "content": content,
+        "createdAt": "2024-05-01T12:00:00+00:00",
+        "chatId": "chat-1",
+    }
+
+
+def _parse_sse(body: str) -> List[tuple[str, Dict[str, Any]]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id="user-1")
+    app.dependency_overrides[get_supabase] = lambda: object()
+    return TestClient(app)
+
+
+def _post_stream(client: TestClient, accept: str = "text/event-stream"):
+    return client.post("/chat/stream", json={"message": "como faço homus?"}, headers={"Accept": accept})
+
+
+def test_stream_emits_user_deltas_and_done(client, monkeypatch) -> None:
+    async def fake_stream(**kwargs):
+        yield "user", _message("user", "como faço homus?")
+        yield "delta", {"content": "Use "}
+        yield "delta", {"content": "tahini."}
+        yield "assistant", _message("assistant", "Use tahini.")
+
+    monkeypatch.setattr(chat_store, "stream_message", fake_stream)
+
+    response = _post_stream(client)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["user", "delta", "delta", "done"]
+    assert events[1][1] == {"content": "Use "}
+    assert events[-1][1]["message"]["content"] == "Use tahini."
+    assert events[-1][1]["userMessage"]["content"] == "como faço homus?"
+
+
+def test_stream_reports_error_event(client, monkeypatch) -> None:
+    async def failing_stream(**kwargs):
+        yield "user", _message("user", "como faço homus?")
+        yield "delta", {"content": "Use "}
+        raise RuntimeError("supabase fora do ar")
+
+    monkeypatch.setattr(chat_store, "stream_message", failing_stream)
+
+    events = _parse_sse(_post_stream(client).text)
+
+    assert [name for name, _ in events] == ["user", "delta", "error"]
+    assert "supabase fora do ar" in events[-1][1]["detail"]
+
+
+def test_stream_without_event_stream_accept_returns_chat_response(client, monkeypatch) -> None:
+    async def fake_send(**kwargs):
+        return {"user": _message("user", "oi"), "assistant": _message("assistant", "Olá!")}
+
+    monkeypatch.setattr(chat_store, "send_message_async", fake_send)
+
+    response = _post_stream(client, accept="application/json")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json()["message"]["content"] == "Olá!"
+
+
+@pytest.fixture
+def saved(monkeypatch) -> List[str]:
+    turn = chat_store._ChatTurn(
+        user_id="user-1",
+        chat_id="chat-1",
+        user_record={"message_id": "m-1", "role": "user", "content": "oi", "chat_id": "chat-1"},
+        history=[],
+        context_text=None,
+        context_recipe_ids=[],
+    )
+    texts: List[str] = []
+
+    async def fake_prepare(*args, **kwargs):
+        return turn
+
+    async def fake_save(turn, supa, assistant_text):
+        texts.append(assistant_text)
+        return {"message_id": "m-2", "role": "assistant", "content": assistant_text, "chat_id": "chat-1"}
+
+    monkeypatch.setattr(chat_store, "_prepare_turn", fake_prepare)
+    monkeypatch.setattr(chat_store, "_save_assistant_message", fake_save)
+    return texts
+
+
+def test_stream_message_marks_partial_answer_on_agent_error(saved, monkeypatch) -> None:
+    async def broken_agent(history, message, context_text):
+        yield "Use tahini"
+        raise RuntimeError("quota")
+
+    monkeypatch.setattr(chat_store, "stream_chat_agent", broken_agent)
+
+    async def run() -> List[tuple[str, Dict[str, Any]]]:
+        return [item async for item in chat_store.stream_message(CurrentUser(id="user-1"), object(), "oi")]
+
+    events = asyncio.run(run())
+
+    assert saved == ["Use tahini" + chat_store.CHAT_TRUNCATED_MARKER]
+    assert events[-1][0] == "assistant"
+
+
+def test_stream_message_saves_answer_when_client_disconnects(saved, monkeypatch) -> None:
+    async def slow_agent(history, message, context_text):
+        yield "Use tahini"
+        await asyncio.sleep(10)
+        yield " e limão."
+
+    monkeypatch.setattr(chat_store, "stream_chat_agent", slow_agent)
+
+    async def run() -> None:
+        stream = chat_store.stream_message(CurrentUser(id="user-1"), object(), "oi")
+        assert (await stream.__anext__())[0] == "user"
+        assert (await stream.__anext__())[0] == "delta"
+        await stream.aclose()
+        await asyncio.gather(*chat_store._background_saves)
+
+    asyncio.run(run())
+
+    assert saved == ["Use tahini" + chat_store.CHAT_TRUNCATED_MARKER]
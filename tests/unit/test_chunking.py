@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from src.services.chunking import estimate_tokens, split_into_chunks, split_sections
+
+
+class TestEstimateTokens:
+    def test_empty_text(self) -> None:
+        assert estimate_tokens("") == 0
+
+    def test_rounds_up(self) -> None:
+        assert estimate_tokens("abcde") == 2
+
+
+class TestSplitSections:
+    def test_splits_on_markdown_headers(self) -> None:
+        text = "intro\n## CAPTION\nlegenda\n## TRANSCRIPT\nfala"
+
+        sections = split_sections(text)
+
+        assert [section.header for section in sections] == [None, "## CAPTION", "## TRANSCRIPT"]
+        assert sections[1].lines == ["legenda"]
+
+    def test_ignores_empty_preamble(self) -> None:
+        sections = split_sections("## Metadata\ntitle: Bolo")
+
+        assert len(sections) == 1
+        assert sections[0].header == "## Metadata"
+
+
+class TestSplitIntoChunks:
+    def test_empty_text_returns_no_chunks(self) -> None:
+        assert split_into_chunks("   ") == []
+
+    def test_short_sections_are_packed_together(self) -> None:
+        text = "## CAPTION\nBolo de cenoura\n## TRANSCRIPT\nMisture tudo"
+
+        chunks = split_into_chunks(text, max_tokens=100, overlap_tokens=10)
+
+        assert chunks == [text]
+
+    def test_long_section_is_windowed_with_header(self) -> None:
+        transcript = " ".join(f"palavra{i}" for i in range(400))
+        text = f"## TRANSCRIPT\n{transcript}"
+
+        chunks = split_into_chunks(text, max_tokens=100, overlap_tokens=20)
+
+        assert len(chunks) > 1
+        assert all(chunk.startswith("## TRANSCRIPT\n") for chunk in chunks)
+        assert all(estimate_tokens(chunk) <= 110 for chunk in chunks)
+
+    def test_windows_overlap(self) -> None:
+        lines = "\n".join(f"linha numero {i:03d}" for i in range(60))
+        text = f"## Passos\n{lines}"
+
+        chunks = split_into_chunks(text, max_tokens=60, overlap_tokens=15)
+
+        first_lines = chunks[0].splitlines()
+        second_lines = chunks[1].splitlines()
+        assert first_lines[-1] in second_lines
+
+    def test_sections_larger_than_window_are_not_mixed(self) -> None:
+        caption = " ".join("a" * 10 for _ in range(60))
+        text = f"## CAPTION\n{caption}\n## TRANSCRIPT\nfim"
+
+        chunks = split_into_chunks(text, max_tokens=50, overlap_tokens=0)
+
+        assert all("## CAPTION" in chunk or "## TRANSCRIPT" in chunk for chunk in chunks)
+        assert chunks[-1].endswith("fim")
+
+    def test_respects_max_chunks(self) -> None:
+        text = "## TRANSCRIPT\n" + " ".join(f"palavra{i}" for i in range(2000))
+
+        chunks = split_into_chunks(text, max_tokens=50, overlap_tokens=0, max_chunks=3)
+
+        assert len(chunks) == 3
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.services.errors import RateLimitedError
+
+
+class EmbedFnSpy:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self.error: Exception | None = None
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+class TestEmbeddingBatcher:
+    def test_embed_many_sends_single_batch(self) -> None:
+        spy = EmbedFnSpy()
+        batcher = EmbeddingBatcher(spy, max_batch_size=10, max_wait_ms=20)
+
+        vectors = batcher.embed_many(["a", "bb", "ccc"])
+
+        assert vectors == [[1.0], [2.0], [3.0]]
+        assert spy.calls == [["a", "bb", "ccc"]]
+        batcher.close()
+
+    def test_respects_max_batch_size(self) -> None:
+        spy = EmbedFnSpy()
+        batcher = EmbeddingBatcher(spy, max_batch_size=2, max_wait_ms=20)
+
+        vectors = batcher.embed_many(["a", "b", "c"])
+
+        assert len(vectors) == 3
+        assert all(len(call) <= 2 for call in spy.calls)
+        batcher.close()
+
+    def test_deduplicates_identical_texts(self) -> None:
+        spy = EmbedFnSpy()
+        batcher = EmbeddingBatcher(spy, max_batch_size=10, max_wait_ms=20)
+
+        vectors = batcher.embed_many(["same", "same"])
+
+        assert vectors == [[4.0], [4.0]]
+        assert spy.calls == [["same"]]
+        batcher.close()
+
+    def test_coalesces_concurrent_callers(self) -> None:
+        spy = EmbedFnSpy()
+        batcher = EmbeddingBatcher(spy, max_batch_size=10, max_wait_ms=200)
+        results: dict[str, list[float]] = {}
+
+        def worker(text: str) -> None:
+            results[text] = batcher.embed(text)
+
+        threads = [threading.Thread(target=worker, args=(text,)) for text in ("x", "yy", "zzz")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {"x": [1.0], "yy": [2.0], "zzz": [3.0]}
+        assert len(spy.calls) == 1
+        batcher.close()
+
+    def test_propagates_errors_to_all_callers(self) -> None:
+        spy = EmbedFnSpy()
+        spy.error = RateLimitedError("quota")
+        batcher = EmbeddingBatcher(spy, max_batch_size=10, max_wait_ms=10)
+
+        with pytest.raises(RateLimitedError):
+            batcher.embed_many(["a", "b"])
+        batcher.close()
+
+    def test_empty_input_does_not_call_api(self) -> None:
+        spy = EmbedFnSpy()
+        batcher = EmbeddingBatcher(spy)
+
+        assert batcher.embed_many([]) == []
+        assert spy.calls == []
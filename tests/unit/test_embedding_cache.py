@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.services.embedding_cache import (
+    EmbeddingCache,
+    EmbeddingCacheKey,
+    LocalEmbeddingStore,
+    QueryEmbeddingCache,
+    content_hash,
+    normalize_query_text,
+)
+
+MODEL = "models/text-embedding-004"
+TASK = "RETRIEVAL_DOCUMENT"
+
+
+class SharedStoreStub:
+    def __init__(self) -> None:
+        self.items: dict[EmbeddingCacheKey, list[float]] = {}
+        self.lookups = 0
+
+    def get_many(self, keys: list[EmbeddingCacheKey]) -> dict[EmbeddingCacheKey, list[float]]:
+        self.lookups += 1
+        return {key: self.items[key] for key in keys if key in self.items}
+
+    def put_many(self, items: dict[EmbeddingCacheKey, list[float]]) -> None:
+        self.items.update(items)
+
+
+class EmbedFnSpy:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestContentHash:
+    def test_is_sha256_hex(self) -> None:
+        assert content_hash("abc") == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+
+
+class TestLocalEmbeddingStore:
+    def test_round_trip(self, tmp_path: Path) -> None:
+        store = LocalEmbeddingStore(tmp_path)
+        key = EmbeddingCacheKey.for_text(MODEL, TASK, "bolo")
+
+        store.put_many({key: [0.25, -1.5]})
+
+        assert store.get_many([key]) == {key: [0.25, -1.5]}
+
+    def test_keys_are_scoped_by_task_type(self, tmp_path: Path) -> None:
+        store = LocalEmbeddingStore(tmp_path)
+        document_key = EmbeddingCacheKey.for_text(MODEL, TASK, "bolo")
+        query_key = EmbeddingCacheKey.for_text(MODEL, "RETRIEVAL_QUERY", "bolo")
+
+        store.put_many({document_key: [1.0]})
+
+        assert store.get_many([query_key]) == {}
+
+
+class TestEmbeddingCache:
+    def test_only_misses_call_the_api(self, tmp_path: Path) -> None:
+        spy = EmbedFnSpy()
+        cache = EmbeddingCache(local=LocalEmbeddingStore(tmp_path))
+
+        first = cache.embed(["a", "bb"], MODEL, TASK, spy)
+        second = cache.embed(["bb", "ccc"], MODEL, TASK, spy)
+
+        assert first == [[1.0, 0.5], [2.0, 0.5]]
+        assert second == [[2.0, 0.5], [3.0, 0.5]]
+        assert spy.calls == [["a", "bb"], ["ccc"]]
+
+    def test_identical_payload_skips_api_entirely(self, tmp_path: Path) -> None:
+        spy = EmbedFnSpy()
+        cache = EmbeddingCache(local=LocalEmbeddingStore(tmp_path))
+
+        cache.embed(["receita"], MODEL, TASK, spy)
+        cache.embed(["receita"], MODEL, TASK, spy)
+
+        assert len(spy.calls) == 1
+
+    def test_shared_tier_hits_are_copied_to_local(self, tmp_path: Path) -> None:
+        spy = EmbedFnSpy()
+        shared = SharedStoreStub()
+        key = EmbeddingCacheKey.for_text(MODEL, TASK, "bolo")
+        shared.items[key] = [9.0]
+        local = LocalEmbeddingStore(tmp_path)
+        cache = EmbeddingCache(local=local, shared=shared)
+
+        vectors = cache.embed(["bolo"], MODEL, TASK, spy)
+
+        assert vectors == [[9.0]]
+        assert spy.calls == []
+        assert local.get_many([key]) == {key: [9.0]}
+
+    def test_new_vectors_are_written_to_both_tiers(self, tmp_path: Path) -> None:
+        spy = EmbedFnSpy()
+        shared = SharedStoreStub()
+        cache = EmbeddingCache(local=LocalEmbeddingStore(tmp_path), shared=shared)
+
+        cache.embed(["pao"], MODEL, TASK, spy)
+
+        assert EmbeddingCacheKey.for_text(MODEL, TASK, "pao") in shared.items
+
+    def test_duplicate_texts_are_embedded_once(self) -> None:
+        spy = EmbedFnSpy()
+        cache = EmbeddingCache()
+
+        vectors = cache.embed(["x", "x"], MODEL, TASK, spy)
+
+        assert vectors == [[1.0, 0.5], [1.0, 0.5]]
+        assert spy.calls == [["x"]]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNormalizeQueryText:
+    def test_collapses_case_whitespace_and_punctuation(self) -> None:
+        assert normalize_query_text("  O que  posso cozinhar com FRANGO? ") == "o que posso cozinhar com frango"
+
+
+class TestQueryEmbeddingCache:
+    def test_repeated_question_hits_cache(self) -> None:
+        cache = QueryEmbeddingCache()
+        calls: list[str] = []
+
+        def embed(text: str) -> list[float]:
+            calls.append(text)
+            return [1.0]
+
+        cache.get_or_embed("what can I cook with chicken?", embed)
+        cache.get_or_embed("What can I cook with chicken", embed)
+
+        assert calls == ["what can I cook with chicken?"]
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_entries_expire_after_ttl(self) -> None:
+        clock = FakeClock()
+        cache = QueryEmbeddingCache(ttl_seconds=10, clock=clock)
+        cache.put("bolo", [1.0])
+
+        clock.now = 11
+
+        assert cache.get("bolo") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+
+    def test_uses_shared_tier_before_api(self) -> None:
+        cache = QueryEmbeddingCache()
+        shared = SharedStoreStub()
+        shared.items[EmbeddingCacheKey.for_text(MODEL, "RETRIEVAL_QUERY", "bolo")] = [7.0]
+
+        vector = cache.get_or_embed("Bolo?", lambda text: [0.0], shared=shared, model=MODEL)
+
+        assert vector == [7.0]
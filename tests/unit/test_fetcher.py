@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.services import fetcher
+
+URL = "https://www.youtube.com/watch?v=abc123XYZ00"
+INFO = {"title": "Bolo", "description": "receita", "uploader": "chef"}
+
+
+@pytest.fixture
+def no_audio(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    downloads: list[str] = []
+    monkeypatch.setattr(fetcher, "download_audio", lambda url: downloads.append(url) or "/tmp/a.m4a")
+    return downloads
+
+
+class TestFetchYoutube:
+    def test_does_not_download_audio(self, monkeypatch: pytest.MonkeyPatch, no_audio: list[str]) -> None:
+        monkeypatch.setattr(fetcher, "_extract_metadata", lambda url, opts=None: INFO)
+        monkeypatch.setattr(fetcher, "_get_yt_transcript", lambda url: "fala do video")
+        monkeypatch.setattr(fetcher, "_extract_caption_text", lambda info: "legenda vtt")
+
+        content = fetcher.fetch_youtube(URL)
+
+        assert content.subtitles == "fala do video"
+        assert content.audio_path is None
+        assert no_audio == []
+
+    def test_transcript_runs_while_metadata_is_fetched(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        transcript_started = threading.Event()
+
+        def slow_metadata(url: str, opts: dict | None = None) -> dict:
+            assert transcript_started.wait(timeout=2)
+            return INFO
+
+        def transcript(url: str) -> str:
+            transcript_started.set()
+            return "fala"
+
+        monkeypatch.setattr(fetcher, "_extract_metadata", slow_metadata)
+        monkeypatch.setattr(fetcher, "_get_yt_transcript", transcript)
+
+        assert fetcher.fetch_youtube(URL).subtitles == "fala"
+
+    def test_falls_back_to_caption_vtt(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(fetcher, "_extract_metadata", lambda url, opts=None: INFO)
+        monkeypatch.setattr(fetcher, "_get_yt_transcript", lambda url: None)
+        monkeypatch.setattr(fetcher, "_extract_caption_text", lambda info: "legenda vtt")
+
+        assert fetcher.fetch_youtube(URL).subtitles == "legenda vtt"
+
+
+class TestEnsureAudio:
+    def test_downloads_once(self, monkeypatch: pytest.MonkeyPatch, no_audio: list[str]) -> None:
+        monkeypatch.setattr(fetcher, "_extract_metadata", lambda url, opts=None: INFO)
+        monkeypatch.setattr(fetcher, "_get_yt_transcript", lambda url: None)
+        monkeypatch.setattr(fetcher, "_extract_caption_text", lambda info: None)
+        content = fetcher.fetch_youtube(URL)
+
+        assert fetcher.ensure_audio(content) == "/tmp/a.m4a"
+        assert fetcher.ensure_audio(content) == "/tmp/a.m4a"
+        assert no_audio == [URL]
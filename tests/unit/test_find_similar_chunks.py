@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import persist_supabase, vector_index
+from src.services.vector_index import NumpyChunkRetriever
+
+
+class RpcClientStub:
+    def __init__(self, data=None, error: Exception | None = None, responses: dict | None = None) -> None:
+        self.data = data
+        self.error = error
+        self.responses = responses or {}
+        self.calls: list[tuple[str, dict]] = []
+
+    def rpc(self, name: str, payload: dict):
+        self.calls.append((name, payload))
+        return self
+
+    def table(self, name: str):
+        self.calls.append((name, {}))
+        return self
+
+    def select(self, columns: str):
+        return self
+
+    def eq(self, column: str, value):
+        return self
+
+    def in_(self, column: str, values: list):
+        self.calls[-1] = (self.calls[-1][0], {"in": values})
+        return self
+
+    def execute(self):
+        response = self.responses.get(self.calls[-1][0], self.error or self.data)
+        if isinstance(response, Exception):
+            raise response
+        return SimpleNamespace(data=response)
+
+
+@pytest.fixture(autouse=True)
+def no_local_retriever(monkeypatch):
+    monkeypatch.setattr(persist_supabase, "get_local_retriever", lambda: None)
+    monkeypatch.setattr(vector_index, "_supabase_rpc_missing", False)
+    monkeypatch.setattr(vector_index, "_backfilled_owners", set())
+
+
+def test_single_owner_filtered_rpc_call() -> None:
+    rows = [{"recipe_id": "r1", "chunk_index": 0, "chunk_text": "massa", "similarity": 0.9}]
+    supa = RpcClientStub(data=rows)
+
+    result = persist_supabase.find_similar_chunks(supa, "user-1", [0.1, 0.2], match_count=5, ef_search=80)
+
+    assert result == rows
+    assert supa.calls == [(
+        persist_supabase.SIMILAR_CHUNKS_RPC,
+        {
+            "owner_id_filter": "user-1",
+            "query_embedding": [0.1, 0.2],
+            "match_threshold": 0.75,
+            "match_count": 5,
+            "ef_search": 80,
+        },
+    )]
+
+
+def test_rpc_error_returns_empty_without_legacy_retry() -> None:
+    supa = RpcClientStub(error=RuntimeError("PGRST202"))
+
+    assert persist_supabase.find_similar_chunks(supa, "user-1", [0.1]) == []
+    assert len(supa.calls) == 1
+
+
+def test_missing_rpc_falls_back_to_local_retriever(monkeypatch, tmp_path) -> None:
+    retriever = NumpyChunkRetriever(tmp_path)
+    retriever.upsert_recipe("user-1", "r1", ["bolo de cenoura"], [[1.0, 0.0]])
+    monkeypatch.setattr(persist_supabase, "get_local_retriever", lambda: retriever)
+    supa = RpcClientStub(error=RuntimeError("PGRST202: function not found"))
+
+    result = persist_supabase.find_similar_chunks(supa, "user-1", [1.0, 0.0])
+
+    assert [row["chunk_text"] for row in result] == ["bolo de cenoura"]
+    assert vector_index._supabase_rpc_missing is True
+
+
+def test_first_fallback_backfills_owner_from_recipe_chunks(monkeypatch, tmp_path) -> None:
+    retriever = NumpyChunkRetriever(tmp_path)
+    monkeypatch.setattr(persist_supabase, "get_local_retriever", lambda: retriever)
+    supa = RpcClientStub(
+        responses={
+            persist_supabase.SIMILAR_CHUNKS_RPC: RuntimeError("PGRST202: function not found"),
+            "recipes": [{"recipe_id": "r1"}],
+            "recipe_chunks": [
+                {"recipe_id": "r1", "chunk_index": 0, "chunk_text": "homus com tahini", "embedding": "[1.0,0.0]"},
+            ],
+        }
+    )
+
+    first = persist_supabase.find_similar_chunks(supa, "user-1", [1.0, 0.0])
+    second = persist_supabase.find_similar_chunks(supa, "user-1", [1.0, 0.0])
+
+    assert [row["chunk_text"] for row in first] == ["homus com tahini"]
+    assert [row["chunk_text"] for row in second] == ["homus com tahini"]
+    assert [name for name, _ in supa.calls].count("recipe_chunks") == 1
+    assert ("recipe_chunks", {"in": ["r1"]}) in supa.calls
+
+
+def test_query_text_uses_hybrid_rpc_with_rerank_candidates() -> None:
+    rows = [
+        {"recipe_id": "r1", "chunk_index": 0, "chunk_text": "Molho de iogurte", "score": 0.03},
+        {"recipe_id": "r2", "chunk_index": 0, "chunk_text": "Homus com tahini e limao", "score": 0.02},
+    ]
+    supa = RpcClientStub(responses={persist_supabase.HYBRID_CHUNKS_RPC: rows})
+
+    result = persist_supabase.find_similar_chunks(supa, "user-1", [0.1], match_count=1, query_text="tahini")
+
+    name, payload = supa.calls[0]
+    assert name == persist_supabase.HYBRID_CHUNKS_RPC
+    assert payload["query_text"] == "tahini"
+    assert payload["match_count"] == persist_supabase.RERANK_CANDIDATE_FACTOR
+    assert [row["recipe_id"] for row in result] == ["r2"]
+
+
+def test_missing_hybrid_rpc_falls_back_to_vector_rpc() -> None:
+    rows = [{"recipe_id": "r1", "chunk_index": 0, "chunk_text": "massa", "similarity": 0.9}]
+    supa = RpcClientStub(responses={
+        persist_supabase.HYBRID_CHUNKS_RPC: RuntimeError("PGRST202"),
+        persist_supabase.SIMILAR_CHUNKS_RPC: rows,
+    })
+
+    result = persist_supabase.find_similar_chunks(supa, "user-1", [0.1], query_text="massa")
+
+    assert result == rows
+    assert [name for name, _ in supa.calls] == [
+        persist_supabase.HYBRID_CHUNKS_RPC,
+        persist_supabase.SIMILAR_CHUNKS_RPC,
+    ]
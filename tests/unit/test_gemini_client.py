@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.services import gemini_client
+from src.services.gemini_client import (
+    GeminiClient,
+    GeminiPromptError,
+    SystemPromptCache,
+    get_gemini_client,
+)
+
+
+class GenerativeModelSpy:
+    created: list[str] = []
+
+    def __init__(self, model_name: str, system_instruction: str) -> None:
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        GenerativeModelSpy.created.append(system_instruction)
+
+
+@pytest.fixture(autouse=True)
+def fake_genai(monkeypatch: pytest.MonkeyPatch) -> None:
+    GenerativeModelSpy.created = []
+    monkeypatch.setattr(gemini_client.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(gemini_client.genai, "GenerativeModel", GenerativeModelSpy)
+
+
+def _touch(path: Path, text: str, mtime: float) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+class TestSystemPromptCache:
+    def test_reloads_only_when_mtime_changes(self, tmp_path: Path) -> None:
+        prompt = tmp_path / "prompt.txt"
+        _touch(prompt, "v1", 1_000)
+        cache = SystemPromptCache()
+
+        assert cache.load(prompt) == "v1"
+        prompt.write_text("v2", encoding="utf-8")
+        os.utime(prompt, (1_000, 1_000))
+        assert cache.load(prompt) == "v1"
+
+        os.utime(prompt, (2_000, 2_000))
+        assert cache.load(prompt) == "v2"
+
+    def test_missing_file_raises_prompt_error(self, tmp_path: Path) -> None:
+        with pytest.raises(GeminiPromptError):
+            SystemPromptCache().load(tmp_path / "missing.txt")
+
+
+class TestGeminiClientRegistry:
+    def test_returns_same_client_per_key_and_model(self) -> None:
+        first = get_gemini_client("key-a", "model-x")
+
+        assert get_gemini_client("key-a", "model-x") is first
+        assert get_gemini_client("key-a", "model-y") is not first
+
+    def test_model_is_reused_until_prompt_changes(self, tmp_path: Path) -> None:
+        prompt = tmp_path / "system.txt"
+        _touch(prompt, "seja breve", 1_000)
+        client = GeminiClient(api_key="key", model_name="model-x")
+
+        first = client._build_model(prompt)
+        assert client._build_model(prompt) is first
+
+        _touch(prompt, "seja detalhado", 2_000)
+        reloaded = client._build_model(prompt)
+
+        assert reloaded is not first
+        assert GenerativeModelSpy.created == ["seja breve", "seja detalhado"]
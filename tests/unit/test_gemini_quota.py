@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.services.errors import RateLimitedError
+from src.services.gemini_quota import (
+    PRIORITY_CHAT,
+    PRIORITY_EMBEDDING,
+    GeminiQuotaGovernor,
+    QuotaLimits,
+    is_rate_limited_error,
+    parse_quota_limits,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+def _governor(clock: FakeClock, rpm: float = 120, tpm: float = 1_000_000) -> GeminiQuotaGovernor:
+    return GeminiQuotaGovernor(
+        default_limits=QuotaLimits(rpm=rpm, tpm=tpm),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+class TestGeminiQuotaGovernor:
+    def test_parse_quota_limits(self) -> None:
+        limits = parse_quota_limits("gemini-2.5-flash=1000:2000000, models/text-embedding-004=1500, broken")
+
+        assert limits["gemini-2.5-flash"] == QuotaLimits(rpm=1000, tpm=2000000)
+        assert limits["models/text-embedding-004"].rpm == 1500
+        assert "broken" not in limits
+
+    def test_background_priority_leaves_headroom_for_chat(self) -> None:
+        clock = FakeClock()
+        governor = _governor(clock)
+        quota = governor.quota("gemini")
+        capacity = quota.requests.capacity
+
+        while quota.delay(PRIORITY_EMBEDDING, 1, 0) == 0:
+            pass
+
+        assert quota.requests._tokens >= capacity * 0.5 - 1
+        assert quota.delay(PRIORITY_CHAT, 1, 0) == 0
+
+    def test_acquire_waits_for_refill(self) -> None:
+        clock = FakeClock()
+        governor = _governor(clock, rpm=12)
+
+        governor.acquire("gemini", PRIORITY_CHAT)
+        governor.acquire("gemini", PRIORITY_CHAT)
+
+        assert clock.now == pytest.approx(5.0)
+
+    def test_rate_limit_is_translated_and_slows_model(self) -> None:
+        clock = FakeClock()
+        governor = _governor(clock)
+        initial_rate = governor.quota("gemini").requests.rate
+
+        with pytest.raises(RateLimitedError):
+            with governor.request("gemini", PRIORITY_CHAT):
+                raise ResourceExhausted("429 RESOURCE_EXHAUSTED")
+
+        assert governor.quota("gemini").requests.rate < initial_rate
+
+    def test_gives_up_after_priority_timeout(self) -> None:
+        clock = FakeClock()
+        governor = _governor(clock, rpm=0.5)
+        governor.acquire("gemini", PRIORITY_CHAT)
+
+        with pytest.raises(RateLimitedError):
+            governor.acquire("gemini", PRIORITY_CHAT)
+
+    def test_async_request_records_success(self) -> None:
+        clock = FakeClock()
+        governor = _governor(clock)
+
+        async def call() -> str:
+            async with governor.request_async("gemini", PRIORITY_CHAT, tokens=10):
+                return "ok"
+
+        assert asyncio.run(call()) == "ok"
+
+    def test_disabled_governor_never_blocks(self) -> None:
+        governor = GeminiQuotaGovernor(default_limits=QuotaLimits(rpm=0.01, tpm=1), enabled=False)
+
+        for _ in range(5):
+            governor.acquire("gemini", PRIORITY_EMBEDDING, tokens=1000)
+
+
+def test_is_rate_limited_error() -> None:
+    assert is_rate_limited_error(ResourceExhausted())
+    assert is_rate_limited_error(RuntimeError("RESOURCE_EXHAUSTED: quota"))
+    assert not is_rate_limited_error(RuntimeError("boom"))
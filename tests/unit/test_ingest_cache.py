@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.services.ingest_cache import (
+    IngestCache,
+    IngestCacheEntry,
+    IngestCacheKey,
+    deserialize_raw_content,
+    prompt_hash,
+    serialize_raw_content,
+)
+from src.services.types import RawContent
+
+URL = "https://www.youtube.com/watch?v=abc123XYZ"
+
+
+class MemoryStore:
+    def __init__(self) -> None:
+        self.items: dict[IngestCacheKey, IngestCacheEntry] = {}
+
+    def get(self, key: IngestCacheKey) -> IngestCacheEntry | None:
+        entry = self.items.get(key)
+        if entry is None:
+            return None
+        return IngestCacheEntry(
+            raw_content=deserialize_raw_content(serialize_raw_content(entry.raw_content)),
+            ai_recipe=dict(entry.ai_recipe),
+        )
+
+    def put(self, key: IngestCacheKey, entry: IngestCacheEntry) -> None:
+        self.items[key] = entry
+
+
+def _content(url: str = URL) -> RawContent:
+    return RawContent(
+        platform="youtube",
+        url=url,
+        title="Bolo",
+        caption="bolo de cenoura",
+        transcript=None,
+        subtitles=None,
+        transcript_source=None,
+        audio_path="/tmp/audio.m4a",
+        thumbnail_url=None,
+        author="chef",
+    )
+
+
+class ExtractSpy:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self) -> tuple[RawContent, dict]:
+        self.calls += 1
+        time.sleep(self.delay)
+        return _content(), {"title": "Bolo de cenoura"}
+
+
+class TestPromptHash:
+    def test_changes_with_prompt_or_model(self) -> None:
+        base = prompt_hash("prompt", "model-a")
+
+        assert prompt_hash("prompt", "model-a") == base
+        assert prompt_hash("prompt v2", "model-a") != base
+        assert prompt_hash("prompt", "model-b") != base
+
+
+class TestIngestCache:
+    def test_second_import_of_same_video_skips_extraction(self) -> None:
+        cache = IngestCache(MemoryStore())
+        extract = ExtractSpy()
+
+        cache.get_or_extract(URL, "v1", extract)
+        entry = cache.get_or_extract("https://youtu.be/abc123XYZ", "v1", extract)
+
+        assert extract.calls == 1
+        assert entry.ai_recipe == {"title": "Bolo de cenoura"}
+        assert entry.raw_content.url == "https://youtu.be/abc123XYZ"
+        assert entry.raw_content.audio_path is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_prompt_hash_is_part_of_key(self) -> None:
+        cache = IngestCache(MemoryStore())
+        extract = ExtractSpy()
+
+        cache.get_or_extract(URL, "v1", extract)
+        cache.get_or_extract(URL, "v2", extract)
+
+        assert extract.calls == 2
+
+    def test_unknown_urls_bypass_cache(self) -> None:
+        store = MemoryStore()
+        cache = IngestCache(store)
+
+        cache.get_or_extract("https://example.com/video", "v1", ExtractSpy())
+
+        assert store.items == {}
+
+    def test_concurrent_imports_extract_once(self) -> None:
+        cache = IngestCache(MemoryStore())
+        extract = ExtractSpy(delay=0.05)
+        threads = [
+            threading.Thread(target=cache.get_or_extract, args=(URL, "v1", extract))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert extract.calls == 1
+        assert cache._locks == {}
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.deps import CurrentUser, get_current_user, get_supabase
+from src.app.domain.models import JobStatus, TranscriptionJob
+from src.app.infra.db.pagination import decode_cursor
+from src.app.routers import ingest
+from src.app.routers.v2 import transcriptions
+
+USER_ID = "6f1c2a4e-9b7d-4c1e-8a3f-2d5e6b7c8d90"
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class RecipeTableStub:
+    """Supabase fake para a listagem de receitas: aplica offset/keyset sobre `rows`."""
+
+    def __init__(self, rows: list[dict[str, Any]], count: int | None = None) -> None:
+        self.rows = rows
+        self.count = count
+        self.calls: list[tuple[str, tuple]] = []
+        self._start = 0
+        self._stop: int | None = None
+
+    def table(self, name: str) -> "RecipeTableStub":
+        self.calls = [("table", (name,))]
+        self._start, self._stop = 0, None
+        return self
+
+    def range(self, start: int, end: int) -> "RecipeTableStub":
+        self.calls.append(("range", (start, end)))
+        self._start, self._stop = start, end + 1
+        return self
+
+    def limit(self, size: int) -> "RecipeTableStub":
+        self.calls.append(("limit", (size,)))
+        self._stop = size
+        return self
+
+    def __getattr__(self, name: str):
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+
+        return record
+
+    def execute(self):
+        rows = self.rows
+        keyset = [args[0] for name, args in self.calls if name == "or_"]
+        if keyset:
+            # O ultimo recipe_id da pagina anterior vem no filtro do cursor.
+            last_key = keyset[0].rsplit("recipe_id.lt.", 1)[1].rstrip(")")
+            rows = rows[[row["recipe_id"] for row in rows].index(last_key) + 1:]
+        return SimpleNamespace(data=rows[self._start:self._stop], count=self.count)
+
+
+def _recipe_rows(total: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "recipe_id": str(UUID(int=total - index)),
+            "title": f"Receita {index}",
+            "created_at": (START - timedelta(minutes=index)).isoformat(),
+        }
+        for index in range(total)
+    ]
+
+
+def _recipes_client(supa: RecipeTableStub) -> TestClient:
+    app = FastAPI()
+    app.include_router(ingest.router)
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=USER_ID)
+    app.dependency_overrides[get_supabase] = lambda: supa
+    return TestClient(app)
+
+
+class JobRepoStub:
+    def __init__(self, jobs: list[TranscriptionJob], count: int | None = None) -> None:
+        self.jobs = jobs
+        self.count = count
+        self.count_calls = 0
+
+    def get_jobs_by_user(self, user_id: UUID, limit: int, offset: int, after=None) -> list[TranscriptionJob]:
+        jobs = self.jobs
+        if after is not None:
+            keys = [job.id for job in jobs]
+            jobs = jobs[keys.index(after[1]) + 1:]
+        else:
+            jobs = jobs[offset:]
+        return jobs[:limit]
+
+    def count_jobs_by_user(self, user_id: UUID, mode=None) -> int | None:
+        self.count_calls += 1
+        return self.count
+
+
+def _jobs(total: int) -> list[TranscriptionJob]:
+    return [
+        TranscriptionJob(
+            id=uuid4(),
+            user_id=UUID(USER_ID),
+            object_key=f"uploads/{index}.mp4",
+            status=JobStatus.DONE,
+            created_at=START - timedelta(minutes=index),
+        )
+        for index in range(total)
+    ]
+
+
+@pytest.fixture
+def job_repo(monkeypatch: pytest.MonkeyPatch):
+    def install(repo: JobRepoStub) -> TestClient:
+        monkeypatch.setattr(transcriptions, "_get_job_repo", lambda: repo)
+        app = FastAPI()
+        app.include_router(transcriptions.router)
+        app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=USER_ID)
+        return TestClient(app)
+
+    return install
+
+
+class TestRecipeListing:
+    def test_cursor_round_trip_walks_every_recipe_once(self) -> None:
+        rows = _recipe_rows(5)
+        client = _recipes_client(RecipeTableStub(rows, count=5))
+
+        first = client.get("/recipes/", params={"limit": 2}).json()
+        second = client.get("/recipes/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+        third = client.get("/recipes/", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+
+        seen = [item["id"] for page in (first, second, third) for item in page["items"]]
+        assert seen == [row["recipe_id"] for row in rows]
+        assert first["total"] == 5
+        assert decode_cursor(first["next_cursor"])[1] == UUID(rows[1]["recipe_id"])
+        assert third["next_cursor"] is None
+
+    def test_next_cursor_only_when_page_has_an_extra_row(self) -> None:
+        exact = _recipes_client(RecipeTableStub(_recipe_rows(2), count=2)).get("/recipes/", params={"limit": 2})
+        more = _recipes_client(RecipeTableStub(_recipe_rows(3), count=3)).get("/recipes/", params={"limit": 2})
+
+        assert exact.json()["next_cursor"] is None
+        assert len(more.json()["items"]) == 2
+        assert more.json()["next_cursor"] is not None
+
+    def test_bad_cursor_is_rejected(self) -> None:
+        response = _recipes_client(RecipeTableStub([])).get("/recipes/", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestTranscriptionJobListing:
+    def test_cursor_round_trip_walks_every_job_once(self, job_repo) -> None:
+        jobs = _jobs(5)
+        client = job_repo(JobRepoStub(jobs, count=5))
+
+        first = client.get("/v2/transcriptions/jobs", params={"limit": 2}).json()
+        second = client.get("/v2/transcriptions/jobs", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+        third = client.get("/v2/transcriptions/jobs", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+
+        seen = [job["id"] for page in (first, second, third) for job in page["jobs"]]
+        assert seen == [str(job.id) for job in jobs]
+        assert first["total"] == 5
+        assert second["total"] is None and second["offset"] == 0
+        assert third["next_cursor"] is None
+
+    def test_next_cursor_only_when_page_has_an_extra_row(self, job_repo) -> None:
+        exact = job_repo(JobRepoStub(_jobs(2))).get("/v2/transcriptions/jobs", params={"limit": 2}).json()
+        more = job_repo(JobRepoStub(_jobs(3), count=3)).get("/v2/transcriptions/jobs", params={"limit": 2}).json()
+
+        assert exact["next_cursor"] is None
+        assert exact["total"] == 2
+        assert decode_cursor(more["next_cursor"]) == (START - timedelta(minutes=1), UUID(more["jobs"][-1]["id"]))
+
+    def test_page_past_the_end_counts_instead_of_reporting_offset(self, job_repo) -> None:
+        repo = JobRepoStub(_jobs(3), count=3)
+
+        response = job_repo(repo).get("/v2/transcriptions/jobs", params={"offset": 40}).json()
+
+        assert response["jobs"] == []
+        assert response["total"] == 3
+        assert repo.count_calls == 1
+
+    def test_bad_cursor_is_rejected(self, job_repo) -> None:
+        response = job_repo(JobRepoStub([])).get("/v2/transcriptions/jobs", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
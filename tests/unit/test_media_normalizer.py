@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+from src.app.domain.errors import InvalidMediaError, StorageDownloadError, StorageError
+from src.app.services import media_normalizer
+from src.app.services.media_normalizer import MediaNormalizer, normalized_audio_key
+
+
+class FakeStorage:
+    def __init__(self, objects: dict[str, bytes] | None = None) -> None:
+        self.objects = dict(objects or {})
+        self.reads: list[str] = []
+        self.fail_upload = False
+
+    def object_exists(self, object_key: str) -> bool:
+        return object_key in self.objects
+
+    def iter_object_chunks(self, object_key: str):
+        self.reads.append(object_key)
+        if object_key not in self.objects:
+            raise StorageDownloadError(object_key, "Object not found")
+        return iter([self.objects[object_key]])
+
+    def upload_bytes(self, object_key: str, data: bytes, content_type: str) -> None:
+        if self.fail_upload:
+            raise StorageError("upload failed")
+        self.objects[object_key] = data
+
+    def delete_object(self, object_key: str) -> bool:
+        return self.objects.pop(object_key, None) is not None
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    def encode(source):
+        data = b"".join(source)
+        if data == b"broken":
+            raise InvalidMediaError("no audio stream")
+        return b"opus:" + data
+
+    monkeypatch.setattr(media_normalizer, "encode_speech_audio", encode)
+
+
+def test_normalized_key_sits_next_to_original() -> None:
+    key = "users/u1/media/2026/10/abc_video.mp4"
+
+    assert normalized_audio_key(key) == f"{key}.speech.ogg"
+    assert normalized_audio_key(normalized_audio_key(key)) == f"{key}.speech.ogg"
+
+
+def test_missing_audio_is_extracted_and_stored(fake_encoder) -> None:
+    storage = FakeStorage({"media/a.mp4": b"video"})
+
+    key = MediaNormalizer(storage).ensure_normalized("media/a.mp4")
+
+    assert key == "media/a.mp4.speech.ogg"
+    assert storage.objects[key] == b"opus:video"
+
+
+def test_retry_reuses_stored_audio_without_reading_original(fake_encoder) -> None:
+    storage = FakeStorage({"media/a.mp4": b"video", "media/a.mp4.speech.ogg": b"opus"})
+
+    key = MediaNormalizer(storage).ensure_normalized("media/a.mp4")
+
+    assert key == "media/a.mp4.speech.ogg"
+    assert storage.reads == []
+
+
+def test_undecodable_media_keeps_original_key(fake_encoder) -> None:
+    storage = FakeStorage({"media/a.mp4": b"broken"})
+
+    assert MediaNormalizer(storage).ensure_normalized("media/a.mp4") == "media/a.mp4"
+
+
+def test_upload_failure_keeps_original_key(fake_encoder) -> None:
+    storage = FakeStorage({"media/a.mp4": b"video"})
+    storage.fail_upload = True
+
+    assert MediaNormalizer(storage).ensure_normalized("media/a.mp4") == "media/a.mp4"
+
+
+def test_download_failure_propagates(fake_encoder) -> None:
+    with pytest.raises(StorageDownloadError):
+        MediaNormalizer(FakeStorage()).ensure_normalized("media/missing.mp4")
+
+
+def test_discard_removes_only_the_derived_audio() -> None:
+    storage = FakeStorage({"media/a.mp4": b"video", "media/a.mp4.speech.ogg": b"opus"})
+
+    MediaNormalizer(storage).discard("media/a.mp4")
+
+    assert storage.objects == {"media/a.mp4": b"video"}
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from src.app.infra.db import notifications
+from src.app.infra.db.notifications import JobNotificationListener, create_job_listener
+
+
+class FakeConnection:
+    def __init__(self, pending: int = 0) -> None:
+        self.pending = pending
+        self.executed: list[object] = []
+        self.closed = False
+        self.timeouts: list[float] = []
+
+    def execute(self, statement: object) -> None:
+        self.executed.append(statement)
+
+    def notifies(self, timeout: float, stop_after: int):
+        self.timeouts.append(timeout)
+        if self.pending:
+            self.pending -= 1
+            yield object()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestJobNotificationListener:
+    def test_wait_returns_true_on_notification(self) -> None:
+        conn = FakeConnection(pending=1)
+        listener = JobNotificationListener("postgres://db", ["embedding_jobs"], connect=lambda dsn: conn)
+
+        assert listener.wait(1.0) is True
+        assert len(conn.executed) == 1
+
+    def test_wait_times_out_without_notification(self) -> None:
+        conn = FakeConnection()
+        listener = JobNotificationListener("postgres://db", ["embedding_jobs"], connect=lambda dsn: conn)
+
+        assert listener.wait(0.05) is False
+        assert all(timeout <= notifications.WAIT_SLICE_SECONDS for timeout in conn.timeouts)
+
+    def test_wait_stops_when_worker_is_shutting_down(self) -> None:
+        conn = FakeConnection()
+        listener = JobNotificationListener("postgres://db", ["embedding_jobs"], connect=lambda dsn: conn)
+
+        assert listener.wait(60.0, should_continue=lambda: False) is False
+        assert conn.timeouts == []
+
+    def test_connection_error_falls_back_to_sleep_and_reconnects(self, monkeypatch) -> None:
+        sleeps: list[float] = []
+        monkeypatch.setattr(notifications.time, "sleep", sleeps.append)
+        attempts: list[FakeConnection] = []
+
+        def connect(dsn: str) -> FakeConnection:
+            if not attempts:
+                attempts.append(FakeConnection())
+                raise OSError("connection refused")
+            conn = FakeConnection(pending=1)
+            attempts.append(conn)
+            return conn
+
+        listener = JobNotificationListener("postgres://db", ["ingest_jobs"], connect=connect)
+
+        assert listener._wait_once(0.5) is False
+        assert sleeps == [0.5]
+        assert listener._wait_once(0.5) is True
+
+        listener.close()
+        assert attempts[-1].closed
+
+
+def test_create_job_listener_without_dsn_returns_none(monkeypatch) -> None:
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    assert create_job_listener(["transcription_jobs"]) is None
+    assert create_job_listener(["transcription_jobs"], dsn="") is None
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+from src.app.infra.db.pagination import (
+    InvalidCursorError,
+    count_method,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+RECIPE_ID = UUID("6f1c2a4e-9b7d-4c1e-8a3f-2d5e6b7c8d90")
+
+
+def test_cursor_round_trip_from_database_timestamp() -> None:
+    cursor = encode_cursor("2024-05-01T12:34:56.123456+00:00", str(RECIPE_ID))
+
+    created_at, key = decode_cursor(cursor)
+
+    assert created_at == datetime(2024, 5, 1, 12, 34, 56, 123456, tzinfo=timezone.utc)
+    assert key == RECIPE_ID
+
+
+def test_cursor_is_url_safe_without_padding() -> None:
+    cursor = encode_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), RECIPE_ID)
+
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        encode_cursor("yesterday", RECIPE_ID),
+        encode_cursor("2024-05-01T00:00:00+00:00", "1 or 1=1"),
+        "eyJ0IjoxfQ",  # {"t":1}
+    ],
+)
+def test_rejects_tampered_cursors(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_breaks_ties_by_key() -> None:
+    created_at = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+    assert keyset_filter(created_at, RECIPE_ID, "recipe_id") == (
+        'created_at.lt."2024-05-01T12:00:00+00:00",'
+        f'and(created_at.eq."2024-05-01T12:00:00+00:00",recipe_id.lt.{RECIPE_ID})'
+    )
+
+
+def test_count_method_none_disables_count() -> None:
+    assert count_method("none") is None
+    assert count_method("planned") == "planned"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from src.services.rate_limiter import AdaptiveTokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _bucket(clock: FakeClock, **kwargs) -> AdaptiveTokenBucket:
+    return AdaptiveTokenBucket(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestAdaptiveTokenBucket:
+    def test_burst_then_waits_for_refill(self) -> None:
+        clock = FakeClock()
+        bucket = _bucket(clock, rate_per_second=2.0, burst=2)
+
+        assert bucket.acquire()
+        assert bucket.acquire()
+        assert not bucket.try_acquire()
+
+        assert bucket.acquire()
+        assert clock.sleeps == [0.5]
+
+    def test_rate_limited_halves_rate_and_pauses(self) -> None:
+        clock = FakeClock()
+        bucket = _bucket(clock, rate_per_second=4.0, cooldown_seconds=3.0)
+
+        bucket.on_rate_limited()
+
+        assert bucket.rate == 2.0
+        assert not bucket.try_acquire()
+        assert bucket.acquire()
+        assert clock.now >= 3.0
+
+    def test_success_recovers_rate_up_to_max(self) -> None:
+        clock = FakeClock()
+        bucket = _bucket(clock, rate_per_second=4.0, increase_step=1.0)
+        bucket.on_rate_limited()
+        bucket.on_rate_limited()
+        assert bucket.rate == 1.0
+
+        for _ in range(10):
+            bucket.on_success()
+
+        assert bucket.rate == 4.0
+
+    def test_acquire_timeout(self) -> None:
+        clock = FakeClock()
+        bucket = _bucket(clock, rate_per_second=1.0, burst=1)
+        bucket.acquire()
+
+        assert bucket.acquire(timeout=0.25) is False
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.deps import CurrentUser, get_current_user, get_supabase
+from src.app.routers import ingest
+
+
+class SearchClientStub:
+    """Supabase fake: `rpc` responde ou falha; `table` registra a busca ILIKE."""
+
+    def __init__(self, rpc_data=None, rpc_error: Exception | None = None, table_data=None, count=None) -> None:
+        self.rpc_data = rpc_data
+        self.rpc_error = rpc_error
+        self.table_data = table_data or []
+        self.count = count
+        self.calls: list[tuple[str, tuple]] = []
+        self._mode = ""
+
+    def rpc(self, name: str, payload: dict):
+        self.calls.append(("rpc", (name, payload)))
+        self._mode = "rpc"
+        return self
+
+    def table(self, name: str):
+        self.calls.append(("table", (name,)))
+        self._mode = "table"
+        return self
+
+    def __getattr__(self, name: str):
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+
+        return record
+
+    def execute(self):
+        if self._mode == "rpc":
+            if self.rpc_error is not None:
+                raise self.rpc_error
+            return SimpleNamespace(data=self.rpc_data)
+        return SimpleNamespace(data=self.table_data, count=self.count)
+
+
+def _row(recipe_id: str, **extra) -> dict:
+    return {"recipe_id": recipe_id, "title": "Homus", "created_at": "2024-05-01T12:00:00+00:00", **extra}
+
+
+def test_search_uses_rpc_total_count() -> None:
+    supa = SearchClientStub(rpc_data=[_row("r1", total_count=7, rank=0.3)])
+
+    records, total = ingest._search_recipe_records(supa, "user-1", "homus", 20, 0)
+
+    assert [row["recipe_id"] for row in records] == ["r1"]
+    assert total == 7
+    assert [name for name, _ in supa.calls] == ["rpc"]
+
+
+def test_search_falls_back_to_ilike_when_rpc_missing() -> None:
+    supa = SearchClientStub(rpc_error=RuntimeError("PGRST202"), table_data=[_row("r2")], count=1)
+
+    records, total = ingest._search_recipe_records(supa, "user-1", "homus", 20, 0)
+
+    assert [row["recipe_id"] for row in records] == ["r2"]
+    assert total == 1
+    assert ("table", ("recipes",)) in supa.calls
+    assert ("eq", ("owner_id", "user-1")) in supa.calls
+
+
+def test_search_falls_back_to_ilike_on_any_rpc_error() -> None:
+    supa = SearchClientStub(rpc_error=RuntimeError("syntax error in tsquery"), table_data=[_row("r3")], count=1)
+
+    records, _ = ingest._search_recipe_records(supa, "user-1", "tahini\\", 20, 0)
+
+    assert [row["recipe_id"] for row in records] == ["r3"]
+
+
+def test_search_page_past_the_end_has_no_total() -> None:
+    supa = SearchClientStub(rpc_data=[])
+
+    assert ingest._search_recipe_records(supa, "user-1", "homus", 20, 40) == ([], None)
+
+
+def _client(supa: SearchClientStub) -> TestClient:
+    app = FastAPI()
+    app.include_router(ingest.router)
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id="user-1")
+    app.dependency_overrides[get_supabase] = lambda: supa
+    return TestClient(app)
+
+
+def test_list_recipes_past_the_end_does_not_report_offset_as_total() -> None:
+    response = _client(SearchClientStub(rpc_data=[])).get("/recipes/", params={"q": "homus", "offset": 40})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert response.json()["total"] is None
+
+
+def test_list_recipes_estimates_total_from_last_page_without_count() -> None:
+    supa = SearchClientStub(rpc_error=RuntimeError("PGRST202"), table_data=[_row("r1"), _row("r2")])
+
+    response = _client(supa).get("/recipes/", params={"q": "homus", "offset": 20})
+
+    assert response.json()["total"] == 22
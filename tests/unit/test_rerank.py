@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from src.services.rerank import rerank_chunks
+
+
+def chunk(text: str) -> dict:
+    return {"chunk_text": text}
+
+
+def test_promotes_chunks_covering_query_terms() -> None:
+    chunks = [chunk("Bolo de chocolate"), chunk("Pasta de gergelim (tahini) caseira")]
+
+    result = rerank_chunks("como usar tahini?", chunks, top_n=1)
+
+    assert result == [chunks[1]]
+
+
+def test_matching_ignores_accents_and_case() -> None:
+    chunks = [chunk("Arroz branco"), chunk("FEIJÃO tropeiro")]
+
+    assert rerank_chunks("receita de feijao", chunks, top_n=1) == [chunks[1]]
+
+
+def test_keeps_original_order_without_useful_terms() -> None:
+    chunks = [chunk("a"), chunk("b"), chunk("c")]
+
+    assert rerank_chunks("como fazer?", chunks, top_n=2) == chunks[:2]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from src.app.infra.resources import AppResources
+
+
+class TestAppResources:
+    def test_http_client_is_shared_until_closed(self) -> None:
+        resources = AppResources()
+        client = resources.http_client
+
+        assert resources.http_client is client
+
+        asyncio.run(resources.aclose())
+
+        assert client.is_closed
+        assert resources.http_client is not client
+        asyncio.run(resources.aclose())
+
+    def test_youtube_dl_is_reused_per_thread_and_options(self) -> None:
+        resources = AppResources()
+        opts = {"quiet": True, "skip_download": True}
+        first = resources.youtube_dl(opts)
+        other_thread: list[object] = []
+
+        worker = threading.Thread(target=lambda: other_thread.append(resources.youtube_dl(opts)))
+        worker.start()
+        worker.join()
+
+        assert resources.youtube_dl(dict(opts)) is first
+        assert resources.youtube_dl({"quiet": False}) is not first
+        assert other_thread[0] is not first
+        asyncio.run(resources.aclose())
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from src.app.services import transcription_pipeline
+from src.app.services.transcription_pipeline import TranscriptionPipeline, _ChunkProgress, plan_chunks
+
+SR = transcription_pipeline.SAMPLE_RATE
+
+
+class TestPlanChunks:
+    def test_short_audio_is_a_single_chunk(self) -> None:
+        assert plan_chunks([(0, 10 * SR)], 12 * SR, 300 * SR) == [(0, 12 * SR)]
+
+    def test_no_speech_is_a_single_chunk(self) -> None:
+        assert plan_chunks([], 1000, 100) == [(0, 1000)]
+
+    def test_cuts_in_the_middle_of_silences(self) -> None:
+        speech = [(0, 90), (110, 190), (210, 290), (310, 400)]
+
+        assert plan_chunks(speech, 400, 150) == [(0, 200), (200, 400)]
+
+    def test_chunks_cover_audio_without_gaps(self) -> None:
+        speech = [(start, start + 80) for start in range(0, 1000, 100)]
+
+        chunks = plan_chunks(speech, 1000, 250)
+
+        assert chunks[0][0] == 0
+        assert chunks[-1][1] == 1000
+        assert all(left[1] == right[0] for left, right in zip(chunks, chunks[1:]))
+
+    def test_without_silence_forces_cuts_past_the_limit(self) -> None:
+        assert plan_chunks([(0, 1000)], 1000, 300, max_samples=600) == [
+            (0, 300),
+            (300, 600),
+            (600, 1000),
+        ]
+
+    def test_forced_cuts_keep_later_silences(self) -> None:
+        speech = [(0, 780), (820, 1000)]
+
+        assert plan_chunks(speech, 1000, 300, max_samples=600) == [(0, 300), (300, 800), (800, 1000)]
+
+
+class TestChunkProgress:
+    def test_reports_sum_of_processed_audio(self) -> None:
+        reported: list[float] = []
+        progress = _ChunkProgress(reported.append)
+
+        progress.callback_for(0)(10.0)
+        progress.callback_for(1)(5.0)
+        progress.callback_for(0)(20.0)
+
+        assert reported == [10.0, 15.0, 25.0]
+
+    def test_without_callback_returns_none(self) -> None:
+        assert _ChunkProgress(None).callback_for(0) is None
+
+
+class FakeModel:
+    def transcribe(self, source, **kwargs):
+        duration = len(source) / SR
+        segments = [
+            SimpleNamespace(start=0.0, end=duration / 2, text=" primeira "),
+            SimpleNamespace(start=duration / 2, end=duration, text="  "),
+        ]
+        return iter(segments), SimpleNamespace(duration=duration, language="pt")
+
+
+def test_transcribe_source_offsets_segments() -> None:
+    pipeline = TranscriptionPipeline()
+    processed: list[float] = []
+
+    segments, language, duration = pipeline._transcribe_source(
+        FakeModel(), [0.0] * (4 * SR), processed.append, offset_sec=100.0
+    )
+
+    assert [(seg.start, seg.end, seg.text) for seg in segments] == [(100.0, 102.0, "primeira")]
+    assert processed == [2.0, 4.0]
+    assert language == "pt"
+    assert duration == 4.0
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.services import vector_index
+from src.services.vector_index import NumpyChunkRetriever
+
+
+@pytest.fixture
+def retriever(tmp_path) -> NumpyChunkRetriever:
+    return NumpyChunkRetriever(tmp_path)
+
+
+def test_search_ranks_by_cosine_similarity(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r1", ["massa", "molho"], [[1.0, 0.0], [0.0, 3.0]])
+    retriever.upsert_recipe("owner-a", "r2", ["sobremesa"], [[2.0, 2.0]])
+
+    results = retriever.search("owner-a", [0.0, 1.0], match_count=2)
+
+    assert [row["chunk_text"] for row in results] == ["molho", "sobremesa"]
+    assert results[0]["similarity"] == pytest.approx(1.0)
+    assert results[0]["recipe_id"] == "r1" and results[0]["chunk_index"] == 1
+
+
+def test_search_is_partitioned_by_owner(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r1", ["massa"], [[1.0, 0.0]])
+    retriever.upsert_recipe("owner-b", "r2", ["salada"], [[1.0, 0.0]])
+
+    assert [row["recipe_id"] for row in retriever.search("owner-b", [1.0, 0.0])] == ["r2"]
+    assert retriever.search("owner-c", [1.0, 0.0]) == []
+
+
+def test_threshold_filters_weak_matches(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r1", ["massa", "molho"], [[1.0, 0.0], [0.0, 1.0]])
+
+    results = retriever.search("owner-a", [1.0, 0.1], match_count=5, match_threshold=0.75)
+
+    assert [row["chunk_text"] for row in results] == ["massa"]
+
+
+def test_upsert_replaces_recipe_chunks(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r1", ["versao antiga"], [[1.0, 0.0]])
+    retriever.upsert_recipe("owner-a", "r1", ["versao nova"], [[1.0, 0.0]])
+
+    assert [row["chunk_text"] for row in retriever.search("owner-a", [1.0, 0.0], match_count=5)] == ["versao nova"]
+
+
+def test_index_is_memory_mapped_and_survives_restart(tmp_path) -> None:
+    NumpyChunkRetriever(tmp_path).upsert_recipe("owner-a", "r1", ["massa"], [[3.0, 4.0]])
+
+    reopened = NumpyChunkRetriever(tmp_path)
+    results = reopened.search("owner-a", [3.0, 4.0])
+
+    assert results[0]["chunk_text"] == "massa"
+    matrix = reopened._owners["owner-a"].matrix
+    assert isinstance(matrix, np.memmap)
+    assert np.linalg.norm(matrix[0]) == pytest.approx(1.0)
+
+
+def test_remove_recipe(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r1", ["massa"], [[1.0, 0.0]])
+    retriever.upsert_recipe("owner-a", "r2", ["molho"], [[1.0, 0.0]])
+
+    retriever.upsert_recipe("owner-b", "r1", ["massa"], [[1.0, 0.0]])
+
+    retriever.remove_recipe("owner-a", "r1")
+
+    assert [row["recipe_id"] for row in retriever.search("owner-a", [1.0, 0.0], match_count=5)] == ["r2"]
+    assert [row["recipe_id"] for row in retriever.search("owner-b", [1.0, 0.0], match_count=5)] == ["r1"]
+
+
+def test_replace_owner_rewrites_only_that_owner(retriever: NumpyChunkRetriever) -> None:
+    retriever.upsert_recipe("owner-a", "r-old", ["antiga"], [[1.0, 0.0]])
+    retriever.upsert_recipe("owner-b", "r2", ["salada"], [[1.0, 0.0]])
+
+    retriever.replace_owner(
+        "owner-a",
+        [{"recipe_id": "r1", "chunk_index": 0, "chunk_text": "homus"}],
+        [[0.0, 2.0]],
+    )
+
+    results = retriever.search("owner-a", [0.0, 1.0], match_count=5)
+    assert [row["recipe_id"] for row in results] == ["r1"]
+    assert results[0]["similarity"] == pytest.approx(1.0)
+    assert [row["recipe_id"] for row in retriever.search("owner-b", [1.0, 0.0])] == ["r2"]
+
+
+def test_owner_backfill_is_claimed_once(monkeypatch) -> None:
+    monkeypatch.setattr(vector_index, "_backfilled_owners", set())
+
+    assert vector_index.claim_owner_backfill("owner-a") is True
+    assert vector_index.claim_owner_backfill("owner-a") is False
+
+
+def test_chunk_retriever_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        vector_index.ChunkRetriever()
+
+
+def test_auto_mode_feeds_local_index_only_after_missing_rpc(monkeypatch, retriever: NumpyChunkRetriever) -> None:
+    monkeypatch.setattr(vector_index, "VECTOR_RETRIEVER", "auto")
+    monkeypatch.setattr(vector_index, "_supabase_rpc_missing", False)
+    monkeypatch.setattr(vector_index, "get_local_retriever", lambda: retriever)
+
+    assert vector_index.get_local_index_writer() is None
+
+    vector_index.mark_supabase_rpc_missing()
+
+    assert vector_index.get_local_index_writer() is retriever
+
+
+def test_local_mode_always_feeds_local_index(monkeypatch, retriever: NumpyChunkRetriever) -> None:
+    monkeypatch.setattr(vector_index, "VECTOR_RETRIEVER", "local")
+    monkeypatch.setattr(vector_index, "_supabase_rpc_missing", False)
+    monkeypatch.setattr(vector_index, "get_local_retriever", lambda: retriever)
+
+    assert vector_index.get_local_index_writer() is retriever
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.app.domain.errors import InvalidMediaError, TranscriptionProcessingError
+from src.app.domain.models import TranscriptionResult, TranscriptionSegment
+from src.app.services.whisper_pool import (
+    PooledTranscriptionPipeline,
+    ReplicaSettings,
+    WhisperReplicaPool,
+    resolve_replica_count,
+)
+
+
+class FakePipeline:
+    def __init__(self, language: str) -> None:
+        self.language = language
+
+    def transcribe(self, media_path: Path, progress_callback=None) -> TranscriptionResult:
+        if media_path.name == "crash.wav":
+            os._exit(1)
+        if media_path.name == "bad.wav":
+            raise InvalidMediaError("corrupted")
+        for end in (1.0, 2.0):
+            if progress_callback:
+                progress_callback(end)
+        return TranscriptionResult(
+            text=f"{media_path.name}:{os.getpid()}",
+            segments=[TranscriptionSegment(start=0.0, end=2.0, text="ola")],
+            language=self.language,
+            duration_sec=2.0,
+            model_version="fake",
+        )
+
+
+def fake_factory(language: str) -> FakePipeline:
+    return FakePipeline(language)
+
+
+def fake_preload(cpu_threads: int) -> bool:
+    return True
+
+
+@pytest.fixture
+def pool():
+    settings = ReplicaSettings(cpu_threads=1, max_rss_mb=0, pipeline_factory=fake_factory, preload=fake_preload)
+    pool = WhisperReplicaPool(2, settings=settings, start_method="fork", startup_timeout_seconds=10)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def media(tmp_path: Path):
+    def make(name: str) -> Path:
+        path = tmp_path / name
+        path.write_bytes(b"fake")
+        return path
+
+    return make
+
+
+class TestWhisperReplicaPool:
+    def test_transcribes_in_child_process_with_progress(self, pool: WhisperReplicaPool, media) -> None:
+        pipeline = PooledTranscriptionPipeline(pool, language="pt")
+        progress: list[float] = []
+
+        result = pipeline.transcribe(media("a.wav"), progress_callback=progress.append)
+
+        assert result.text.startswith("a.wav:")
+        assert int(result.text.split(":")[1]) != os.getpid()
+        assert result.segments[0].text == "ola"
+        assert progress == [1.0, 2.0]
+        assert pipeline.concurrency == 2
+
+    def test_invalid_media_is_propagated(self, pool: WhisperReplicaPool, media) -> None:
+        with pytest.raises(InvalidMediaError):
+            pool.transcribe(media("bad.wav"), "pt")
+
+    def test_crashed_replica_is_restarted(self, pool: WhisperReplicaPool, media) -> None:
+        with pytest.raises(TranscriptionProcessingError) as error:
+            pool.transcribe(media("crash.wav"), "pt")
+
+        assert error.value.retryable
+        assert all(replica.healthy for replica in pool.replicas)
+        assert pool.transcribe(media("b.wav"), "pt").text.startswith("b.wav:")
+
+    def test_health_check_restarts_dead_replica(self, pool: WhisperReplicaPool) -> None:
+        victim = pool.replicas[0]
+        old_pid = victim.pid
+        victim.process.kill()
+        victim.process.join(5)
+
+        assert pool.health_check() == 1
+        assert victim.healthy
+        assert victim.pid != old_pid
+
+
+def test_resolve_replica_count() -> None:
+    assert resolve_replica_count("3") == 3
+    assert resolve_replica_count("0") == 1
+    assert resolve_replica_count("auto", device="cuda") == 1
+    assert resolve_replica_count("auto", model_name="tiny", device="cpu") >= 1
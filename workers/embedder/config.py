@@ -16,6 +16,10 @@ class WorkerConfig:
     stale_lock_check_interval_minutes: int = int(os.getenv("WORKER_STALE_CHECK_MINUTES", "5"))
     graceful_shutdown_timeout_seconds: int = int(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "300"))
     max_attempts: int = int(os.getenv("EMBEDDING_MAX_ATTEMPTS", "5"))
+    claim_batch_size: int = int(os.getenv("EMBEDDING_CLAIM_BATCH_SIZE", "10"))
+    concurrency: int = int(os.getenv("EMBEDDING_WORKER_CONCURRENCY", "1"))
+    notify_fallback_poll_seconds: int = int(os.getenv("WORKER_NOTIFY_FALLBACK_POLL", "60"))
+    database_url: str = os.getenv("DATABASE_URL", "")
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
@@ -3,7 +3,9 @@ from __future__ import annotations
 import logging
 import signal
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -13,8 +15,14 @@ from supabase import Client, create_client
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from src.app.infra.db.notifications import (
+    EMBEDDING_JOBS_CHANNEL,
+    JobNotificationListener,
+    create_job_listener,
+)
+from src.services.embedding import shutdown_batchers
 from src.services.errors import RateLimitedError
-from src.services.persist_supabase import save_chunks, update_recipe_embedding_status
+from src.services.persist_supabase import save_chunks_batch, update_recipes_embedding_status
 from workers.embedder.config import WorkerConfig, get_config
 
 logging.basicConfig(
@@ -28,6 +36,8 @@ STATUS_PENDING = "pending"
 STATUS_PROCESSING = "processing"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
+# Job cuja receita ja esta num lote em voo volta para a fila por este tempo.
+RECIPE_IN_FLIGHT_DEFER_SECONDS = 15
 
 
 def _now_utc() -> datetime:
@@ -103,6 +113,14 @@ def _row_to_job(row: dict[str, object]) -> EmbeddingJob:
     )
 
 
+def _created_at_key(job: EmbeddingJob) -> datetime:
+    return job.created_at or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _recipe_owners(jobs: list[EmbeddingJob]) -> list[tuple[str, str]]:
+    return [(str(job.recipe_id), str(job.user_id)) for job in jobs]
+
+
 @dataclass
 class StaleJobInfo:
     job_id: str
@@ -115,14 +133,22 @@ class StaleJobInfo:
 
 
 class EmbeddingWorker:
-    def __init__(self, config: WorkerConfig, client: Client):
+    def __init__(
+        self,
+        config: WorkerConfig,
+        client: Client,
+        notification_listener: JobNotificationListener | None = None,
+    ):
         self.config = config
         self.client = client
+        self.listener = notification_listener
         self.running = False
-        self.current_job_id: UUID | None = None
         self.jobs_processed = 0
         self.last_job_time: datetime | None = None
         self.last_stale_check: datetime | None = None
+        self._stats_lock = threading.Lock()
+        self._in_flight_recipes: set[str] = set()
+        self._in_flight_lock = threading.Lock()
 
     def start(self) -> None:
         self._validate_configuration()
@@ -143,23 +169,28 @@ class EmbeddingWorker:
 
     def _log_startup_info(self) -> None:
         logger.info(
-            "Starting embedding worker: id=%s, poll_interval=%ds",
+            "Starting embedding worker: id=%s, poll_interval=%ds, concurrency=%d",
             self.config.worker_id,
             self.config.poll_interval_seconds,
+            self.config.concurrency,
         )
 
     def _run_main_loop(self) -> None:
+        if self.config.concurrency > 1:
+            self._run_concurrent_loop()
+            return
+
         empty_polls = 0
         poll_interval = float(self.config.poll_interval_seconds)
 
         while self.running:
             self._maybe_release_stale_locks()
 
-            job = self._try_fetch_next_job()
-            if job:
+            jobs = self._try_fetch_next_jobs()
+            if jobs:
                 empty_polls = 0
                 poll_interval = float(self.config.poll_interval_seconds)
-                self._process_job(job)
+                self._process_batch(jobs)
                 if self._reached_max_jobs():
                     break
             else:
@@ -172,24 +203,115 @@ class EmbeddingWorker:
                     poll_interval,
                     empty_polls,
                 )
-            time.sleep(poll_interval)
+                self._wait_for_jobs(poll_interval)
+
+    def _run_concurrent_loop(self) -> None:
+        """Mantem ate `concurrency` lotes em voo; o ritmo na API fica com o GeminiQuotaGovernor."""
+        empty_polls = 0
+        poll_interval = float(self.config.poll_interval_seconds)
+        in_flight: set[Future] = set()
+
+        with ThreadPoolExecutor(
+            max_workers=self.config.concurrency,
+            thread_name_prefix="embedder",
+        ) as executor:
+            while self.running and not self._reached_max_jobs():
+                self._maybe_release_stale_locks()
+
+                jobs = self._try_fetch_next_jobs() if len(in_flight) < self.config.concurrency else []
+                if jobs:
+                    empty_polls = 0
+                    poll_interval = float(self.config.poll_interval_seconds)
+                    jobs = self._reserve_recipes(jobs)
+                    if jobs:
+                        in_flight.add(executor.submit(self._process_reserved_batch, jobs))
+                    continue
+
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    self._collect_results(done)
+                    continue
 
-    def _try_fetch_next_job(self) -> EmbeddingJob | None:
+                empty_polls += 1
+                poll_interval = self._calculate_backoff_interval(poll_interval)
+                if self._should_shutdown_on_empty_queue():
+                    break
+                logger.debug(
+                    "No jobs available, sleeping %.1fs (empty_polls=%d)",
+                    poll_interval,
+                    empty_polls,
+                )
+                self._wait_for_jobs(poll_interval)
+
+            if in_flight:
+                logger.info("Waiting for %d in-flight embedding batches", len(in_flight))
+                done, _ = wait(in_flight)
+                self._collect_results(done)
+
+    def _reserve_recipes(self, jobs: list[EmbeddingJob]) -> list[EmbeddingJob]:
+        """
+        Dois lotes em paralelo com a mesma receita disputariam o delete+insert
+        de recipe_chunks; jobs de receitas ja em voo voltam para a fila.
+        """
+        with self._in_flight_lock:
+            busy = set(self._in_flight_recipes)
+            runnable = [job for job in jobs if str(job.recipe_id) not in busy]
+            self._in_flight_recipes.update(str(job.recipe_id) for job in runnable)
+        deferred = [job for job in jobs if str(job.recipe_id) in busy]
+        if deferred:
+            self._defer_jobs(deferred)
+        return runnable
+
+    def _process_reserved_batch(self, jobs: list[EmbeddingJob]) -> None:
+        try:
+            self._process_batch(jobs)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight_recipes.difference_update(str(job.recipe_id) for job in jobs)
+
+    def _defer_jobs(self, jobs: list[EmbeddingJob]) -> None:
+        retry_at = _now_utc() + timedelta(seconds=RECIPE_IN_FLIGHT_DEFER_SECONDS)
+        for job in jobs:
+            # Devolve a tentativa contada no claim: o job nem chegou a rodar.
+            self.client.table("embedding_jobs").update({
+                "status": "QUEUED",
+                "next_attempt_at": retry_at.isoformat(),
+                "attempt_count": max(job.attempt_count - 1, 0),
+                "locked_at": None,
+                "locked_by": None,
+            }).eq("id", str(job.id)).execute()
+        logger.info(
+            "Deferred embedding jobs whose recipe is already in flight: ids=%s",
+            ",".join(str(job.id) for job in jobs),
+        )
+
+    @staticmethod
+    def _collect_results(done: set[Future]) -> None:
+        for future in done:
+            try:
+                future.result()
+            except Exception:
+                logger.exception("Embedding batch crashed")
+
+    def _try_fetch_next_jobs(self) -> list[EmbeddingJob]:
         now = _now_utc()
         try:
             result = self.client.rpc(
-                "fetch_and_lock_embedding_job",
-                {"p_worker_id": self.config.worker_id, "p_now": now.isoformat()},
+                "fetch_and_lock_embedding_jobs",
+                {
+                    "p_worker_id": self.config.worker_id,
+                    "p_limit": max(1, self.config.claim_batch_size),
+                    "p_now": now.isoformat(),
+                },
             ).execute()
         except Exception as exc:
-            logger.error("Error fetching embedding job: %s", exc)
-            return None
+            logger.error("Error fetching embedding jobs: %s", exc)
+            return []
 
-        if not result.data:
-            return None
-        job = _row_to_job(result.data[0])
-        logger.info("Locked embedding job: id=%s, attempt=%d", job.id, job.attempt_count)
-        return job
+        jobs = [_row_to_job(row) for row in result.data or []]
+        if jobs:
+            logger.info("Locked %d embedding jobs: ids=%s", len(jobs), ",".join(str(job.id) for job in jobs))
+        return jobs
 
     def _reached_max_jobs(self) -> bool:
         if self.config.max_jobs_per_run <= 0:
@@ -202,6 +324,14 @@ class EmbeddingWorker:
     def _calculate_backoff_interval(self, current_interval: float) -> float:
         return min(current_interval * 1.5, float(self.config.max_poll_interval_seconds))
 
+    def _wait_for_jobs(self, poll_interval: float) -> None:
+        if self.listener is None:
+            time.sleep(poll_interval)
+            return
+        # Com LISTEN ativo o polling vira so um fallback lento.
+        if self.listener.wait(self.config.notify_fallback_poll_seconds, lambda: self.running):
+            logger.debug("Woken up by job notification")
+
     def _should_shutdown_on_empty_queue(self) -> bool:
         if not self.config.shutdown_on_empty:
             return False
@@ -217,43 +347,53 @@ class EmbeddingWorker:
             return True
         return False
 
-    def _process_job(self, job: EmbeddingJob) -> None:
-        self._mark_job_started(job)
+    def _process_batch(self, jobs: list[EmbeddingJob]) -> None:
+        self._mark_jobs_started(jobs)
+        # Varios jobs da mesma receita: so o payload mais recente vira chunks.
+        # O RETURNING do RPC nao garante ordem, entao ordena por created_at.
+        latest_by_recipe = {str(job.recipe_id): job for job in sorted(jobs, key=_created_at_key)}
         try:
-            update_recipe_embedding_status(
-                self.client,
-                str(job.recipe_id),
-                str(job.user_id),
-                STATUS_PROCESSING,
-                None,
-            )
-            save_chunks(self.client, str(job.recipe_id), job.payload)
+            update_recipes_embedding_status(self.client, _recipe_owners(jobs), STATUS_PROCESSING, None)
+            save_chunks_batch(self.client, [(recipe_id, job.payload) for recipe_id, job in latest_by_recipe.items()])
         except RateLimitedError as exc:
-            self._handle_retryable_failure(job, str(exc), "Aguardando nova tentativa após limite da API")
+            self._handle_retryable_failures(jobs, str(exc), "Aguardando nova tentativa após limite da API")
         except Exception as exc:
-            self._handle_retryable_failure(job, str(exc), None)
+            if len(latest_by_recipe) > 1:
+                # Um payload ruim nao deve derrubar o lote inteiro: reprocessa
+                # receita a receita. Cada grupo salva so o payload mais recente
+                # e os jobs antigos da mesma receita terminam junto com ele.
+                logger.warning("Embedding batch failed, retrying recipes individually: %s", exc)
+                jobs_by_recipe: dict[str, list[EmbeddingJob]] = {}
+                for job in jobs:
+                    jobs_by_recipe.setdefault(str(job.recipe_id), []).append(job)
+                for recipe_jobs in jobs_by_recipe.values():
+                    self._process_batch(recipe_jobs)
+                return
+            self._handle_retryable_failures(jobs, str(exc), None)
         else:
-            self._mark_job_done(job)
-        finally:
-            self.current_job_id = None
+            self._mark_jobs_done(jobs)
 
-    def _mark_job_started(self, job: EmbeddingJob) -> None:
-        self.current_job_id = job.id
+    def _mark_jobs_started(self, jobs: list[EmbeddingJob]) -> None:
         self.last_job_time = _now_utc()
-        logger.info(
-            "Processing embedding job: id=%s, user=%s, recipe=%s, attempt=%d/%d",
-            job.id,
-            job.user_id,
-            job.recipe_id,
-            job.attempt_count,
-            job.max_attempts,
-        )
+        for job in jobs:
+            logger.info(
+                "Processing embedding job: id=%s, user=%s, recipe=%s, attempt=%d/%d",
+                job.id,
+                job.user_id,
+                job.recipe_id,
+                job.attempt_count,
+                job.max_attempts,
+            )
+
+    def _update_jobs(self, jobs: list[EmbeddingJob], update_data: dict[str, object]) -> list[dict]:
+        job_ids = [str(job.id) for job in jobs]
+        result = self.client.table("embedding_jobs").update(update_data).in_("id", job_ids).execute()
+        return result.data or []
 
-    def _mark_job_done(self, job: EmbeddingJob) -> None:
-        update_recipe_embedding_status(
+    def _mark_jobs_done(self, jobs: list[EmbeddingJob]) -> None:
+        update_recipes_embedding_status(
             self.client,
-            str(job.recipe_id),
-            str(job.user_id),
+            _recipe_owners(jobs),
             STATUS_COMPLETED,
             None,
         )
@@ -264,47 +404,57 @@ class EmbeddingWorker:
             "locked_by": None,
             "error_message": None,
         }
-        result = self.client.table("embedding_jobs").update(update_data).eq("id", str(job.id)).execute()
-        if result.data:
-            self.jobs_processed += 1
-            logger.info("Embedding job completed: id=%s", job.id)
+        updated = self._update_jobs(jobs, update_data)
+        if updated:
+            with self._stats_lock:
+                self.jobs_processed += len(updated)
+            logger.info("Embedding jobs completed: count=%d", len(updated))
         else:
-            logger.error("Failed to mark embedding job done: id=%s", job.id)
-
-    def _handle_retryable_failure(self, job: EmbeddingJob, error_message: str, status_message: str | None) -> None:
-        if job.attempt_count >= job.max_attempts:
-            self._handle_permanent_failure(job, error_message)
-            return
-
-        retry_at = _now_utc() + timedelta(minutes=_calculate_backoff_minutes(job.attempt_count))
-        update_data = {
-            "status": "QUEUED",
-            "next_attempt_at": retry_at.isoformat(),
-            "error_message": error_message[:500],
-            "locked_at": None,
-            "locked_by": None,
-        }
-        self.client.table("embedding_jobs").update(update_data).eq("id", str(job.id)).execute()
-        update_recipe_embedding_status(
-            self.client,
-            str(job.recipe_id),
-            str(job.user_id),
-            STATUS_PENDING,
-            status_message or "Aguardando nova tentativa",
-        )
-        logger.warning(
-            "Embedding job failed, will retry: id=%s, attempt=%d/%d, next_retry=%s",
-            job.id,
-            job.attempt_count,
-            job.max_attempts,
-            retry_at.isoformat(),
-        )
+            logger.error("Failed to mark embedding jobs done: ids=%s", ",".join(str(job.id) for job in jobs))
+
+    def _handle_retryable_failures(
+        self,
+        jobs: list[EmbeddingJob],
+        error_message: str,
+        status_message: str | None,
+    ) -> None:
+        exhausted = [job for job in jobs if job.attempt_count >= job.max_attempts]
+        if exhausted:
+            self._handle_permanent_failures(exhausted, error_message)
+
+        # O backoff depende da tentativa: um update por grupo de attempt_count.
+        retry_groups: dict[int, list[EmbeddingJob]] = {}
+        for job in jobs:
+            if job.attempt_count < job.max_attempts:
+                retry_groups.setdefault(job.attempt_count, []).append(job)
+
+        for attempt_count, group in retry_groups.items():
+            retry_at = _now_utc() + timedelta(minutes=_calculate_backoff_minutes(attempt_count))
+            update_data = {
+                "status": "QUEUED",
+                "next_attempt_at": retry_at.isoformat(),
+                "error_message": error_message[:500],
+                "locked_at": None,
+                "locked_by": None,
+            }
+            self._update_jobs(group, update_data)
+            update_recipes_embedding_status(
+                self.client,
+                _recipe_owners(group),
+                STATUS_PENDING,
+                status_message or "Aguardando nova tentativa",
+            )
+            logger.warning(
+                "Embedding jobs failed, will retry: ids=%s, attempt=%d, next_retry=%s",
+                ",".join(str(job.id) for job in group),
+                attempt_count,
+                retry_at.isoformat(),
+            )
 
-    def _handle_permanent_failure(self, job: EmbeddingJob, error_message: str) -> None:
-        update_recipe_embedding_status(
+    def _handle_permanent_failures(self, jobs: list[EmbeddingJob], error_message: str) -> None:
+        update_recipes_embedding_status(
             self.client,
-            str(job.recipe_id),
-            str(job.user_id),
+            _recipe_owners(jobs),
             STATUS_FAILED,
             error_message,
         )
@@ -315,8 +465,12 @@ class EmbeddingWorker:
             "locked_at": None,
             "locked_by": None,
         }
-        self.client.table("embedding_jobs").update(update_data).eq("id", str(job.id)).execute()
-        logger.error("Embedding job permanently failed: id=%s, error=%s", job.id, error_message)
+        self._update_jobs(jobs, update_data)
+        logger.error(
+            "Embedding jobs permanently failed: ids=%s, error=%s",
+            ",".join(str(job.id) for job in jobs),
+            error_message,
+        )
 
     def _maybe_release_stale_locks(self) -> None:
         now = _now_utc()
@@ -379,15 +533,17 @@ class EmbeddingWorker:
 
     def _shutdown(self) -> None:
         logger.info("Worker shutting down: jobs_processed=%d", self.jobs_processed)
-        if self.current_job_id:
-            logger.info("Waiting for current job to complete: %s", self.current_job_id)
+        shutdown_batchers()
+        if self.listener is not None:
+            self.listener.close()
         logger.info("Worker shutdown complete")
 
 
 def main() -> None:
     config = get_config()
     client = _create_supabase_client(config)
-    worker = EmbeddingWorker(config=config, client=client)
+    listener = create_job_listener([EMBEDDING_JOBS_CHANNEL], config.database_url)
+    worker = EmbeddingWorker(config=config, client=client, notification_listener=listener)
     worker.start()
 
 
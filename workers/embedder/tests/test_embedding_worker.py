@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.services.errors import RateLimitedError
+from workers.embedder import main as embedder
+from workers.embedder.config import WorkerConfig
+from workers.embedder.main import EmbeddingJob, EmbeddingWorker
+
+
+class QueryStub:
+    def __init__(self, client: "SupabaseClientStub", table: str) -> None:
+        self.client = client
+        self.table = table
+        self.payload: dict[str, Any] | None = None
+        self.ids: list[str] = []
+
+    def update(self, payload: dict[str, Any]) -> "QueryStub":
+        self.payload = payload
+        return self
+
+    def in_(self, column: str, values: list[str]) -> "QueryStub":
+        self.ids = list(values)
+        return self
+
+    def eq(self, column: str, value: str) -> "QueryStub":
+        if column == "id":
+            self.ids = [value]
+        else:
+            self.client.filters.append((self.table, column, value))
+        return self
+
+    def execute(self) -> Any:
+        self.client.updates.append((self.table, self.ids, self.payload or {}))
+        return type("Result", (), {"data": [self.payload for _ in self.ids]})()
+
+
+class RpcStub:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+
+    def execute(self) -> Any:
+        return type("Result", (), {"data": self.rows})()
+
+
+class SupabaseClientStub:
+    def __init__(self, rows: list[dict[str, Any]] | None = None) -> None:
+        self.updates: list[tuple[str, list[str], dict[str, Any]]] = []
+        self.rows = rows or []
+        self.rpc_calls: list[tuple[str, dict[str, Any]]] = []
+        self.filters: list[tuple[str, str, str]] = []
+
+    def table(self, name: str) -> QueryStub:
+        return QueryStub(self, name)
+
+    def rpc(self, name: str, params: dict[str, Any]) -> RpcStub:
+        self.rpc_calls.append((name, params))
+        return RpcStub(self.rows)
+
+
+def _job(
+    attempt_count: int = 1,
+    max_attempts: int = 5,
+    recipe_id: Any = None,
+    payload: str = "## Receita\nBolo",
+    created_at: datetime | None = None,
+) -> EmbeddingJob:
+    return EmbeddingJob(
+        id=uuid4(),
+        user_id=uuid4(),
+        recipe_id=recipe_id or uuid4(),
+        payload=payload,
+        status="RUNNING",
+        attempt_count=attempt_count,
+        max_attempts=max_attempts,
+        next_attempt_at=None,
+        locked_at=None,
+        locked_by=None,
+        error_message=None,
+        created_at=created_at,
+        started_at=None,
+        finished_at=None,
+    )
+
+
+@pytest.fixture
+def worker() -> EmbeddingWorker:
+    config = WorkerConfig(supabase_url="http://localhost", supabase_key="key", claim_batch_size=3)
+    return EmbeddingWorker(config=config, client=SupabaseClientStub())
+
+
+def _job_updates(worker: EmbeddingWorker) -> list[tuple[list[str], dict[str, Any]]]:
+    return [(ids, payload) for table, ids, payload in worker.client.updates if table == "embedding_jobs"]
+
+
+class TestEmbeddingWorkerBatch:
+    def test_fetch_claims_batch_in_one_rpc(self, worker: EmbeddingWorker) -> None:
+        job = _job()
+        worker.client.rows = [
+            {"id": str(job.id), "user_id": str(job.user_id), "recipe_id": str(job.recipe_id), "payload": "x"}
+        ]
+
+        jobs = worker._try_fetch_next_jobs()
+
+        assert [item.id for item in jobs] == [job.id]
+        name, params = worker.client.rpc_calls[0]
+        assert name == "fetch_and_lock_embedding_jobs"
+        assert params["p_limit"] == 3
+
+    def test_batch_is_embedded_once_and_marked_done_in_bulk(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        saved: list[list[tuple[str, str]]] = []
+        monkeypatch.setattr(embedder, "save_chunks_batch", lambda client, items: saved.append(items))
+        shared_recipe = uuid4()
+        jobs = [_job(), _job(recipe_id=shared_recipe), _job(recipe_id=shared_recipe)]
+
+        worker._process_batch(jobs)
+
+        assert len(saved) == 1
+        assert len(saved[0]) == 2
+        updates = _job_updates(worker)
+        assert len(updates) == 1
+        ids, payload = updates[0]
+        assert payload["status"] == "DONE"
+        assert ids == [str(job.id) for job in jobs]
+        assert worker.jobs_processed == 3
+
+    def test_newest_payload_wins_regardless_of_claim_order(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        saved: list[list[tuple[str, str]]] = []
+        monkeypatch.setattr(embedder, "save_chunks_batch", lambda client, items: saved.append(items))
+        recipe_id = uuid4()
+        created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        newer = _job(recipe_id=recipe_id, payload="nova", created_at=created + timedelta(minutes=1))
+        older = _job(recipe_id=recipe_id, payload="antiga", created_at=created)
+
+        worker._process_batch([newer, older])
+
+        assert saved == [[(str(recipe_id), "nova")]]
+
+    def test_recipe_status_updates_are_scoped_to_the_owner(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(embedder, "save_chunks_batch", lambda client, items: None)
+        job = _job()
+
+        worker._process_batch([job])
+
+        assert ("recipes", "owner_id", str(job.user_id)) in worker.client.filters
+
+    def test_rate_limit_requeues_whole_batch(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def fail(client: Any, items: Any) -> None:
+            raise RateLimitedError("quota")
+
+        monkeypatch.setattr(embedder, "save_chunks_batch", fail)
+        jobs = [_job(attempt_count=1), _job(attempt_count=1), _job(attempt_count=5)]
+
+        worker._process_batch(jobs)
+
+        statuses = {payload["status"]: ids for ids, payload in _job_updates(worker)}
+        assert statuses["FAILED"] == [str(jobs[2].id)]
+        assert statuses["QUEUED"] == [str(jobs[0].id), str(jobs[1].id)]
+
+    def test_generic_failure_isolates_bad_job(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        bad = _job()
+
+        def save(client: Any, items: list[tuple[str, str]]) -> None:
+            if any(recipe_id == str(bad.recipe_id) for recipe_id, _ in items):
+                raise ValueError("payload invalido")
+
+        monkeypatch.setattr(embedder, "save_chunks_batch", save)
+        good = _job()
+
+        worker._process_batch([good, bad])
+
+        updates = _job_updates(worker)
+        assert ([str(good.id)], "DONE") in [(ids, payload["status"]) for ids, payload in updates]
+        assert ([str(bad.id)], "QUEUED") in [(ids, payload["status"]) for ids, payload in updates]
+
+    def test_individual_retry_keeps_newest_payload_per_recipe(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        bad = _job()
+        saved: list[list[tuple[str, str]]] = []
+
+        def save(client: Any, items: list[tuple[str, str]]) -> None:
+            if any(recipe_id == str(bad.recipe_id) for recipe_id, _ in items):
+                raise ValueError("payload invalido")
+            saved.append(items)
+
+        monkeypatch.setattr(embedder, "save_chunks_batch", save)
+        recipe_id = uuid4()
+        created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        newer = _job(recipe_id=recipe_id, payload="nova", created_at=created + timedelta(minutes=1))
+        older = _job(recipe_id=recipe_id, payload="antiga", created_at=created)
+
+        worker._process_batch([newer, bad, older])
+
+        assert saved == [[(str(recipe_id), "nova")]]
+        updates = [(sorted(ids), payload["status"]) for ids, payload in _job_updates(worker)]
+        assert (sorted([str(newer.id), str(older.id)]), "DONE") in updates
+        assert ([str(bad.id)], "QUEUED") in updates
+
+
+class TestEmbeddingWorkerConcurrency:
+    def test_concurrent_loop_drains_queue_with_bounded_window(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        config = WorkerConfig(
+            supabase_url="http://localhost",
+            supabase_key="key",
+            concurrency=3,
+            max_jobs_per_run=6,
+        )
+        worker = EmbeddingWorker(config=config, client=SupabaseClientStub())
+        batches = [[_job()] for _ in range(6)]
+        monkeypatch.setattr(worker, "_try_fetch_next_jobs", lambda: batches.pop() if batches else [])
+        monkeypatch.setattr(embedder, "save_chunks_batch", lambda client, items: None)
+        worker.running = True
+
+        worker._run_main_loop()
+
+        assert worker.jobs_processed == 6
+        assert not batches
+
+    def test_recipe_already_in_flight_is_deferred(self, worker: EmbeddingWorker) -> None:
+        shared_recipe = uuid4()
+        first = _job(recipe_id=shared_recipe)
+        duplicate = _job(attempt_count=2, recipe_id=shared_recipe)
+        other = _job()
+
+        assert worker._reserve_recipes([first]) == [first]
+        assert worker._reserve_recipes([duplicate, other]) == [other]
+
+        ids, payload = _job_updates(worker)[0]
+        assert ids == [str(duplicate.id)]
+        assert payload["status"] == "QUEUED"
+        assert payload["attempt_count"] == 1
+
+    def test_finished_batch_releases_its_recipes(
+        self, worker: EmbeddingWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(embedder, "save_chunks_batch", lambda client, items: None)
+        shared_recipe = uuid4()
+        first = _job(recipe_id=shared_recipe)
+
+        worker._process_reserved_batch(worker._reserve_recipes([first]))
+
+        second = _job(recipe_id=shared_recipe)
+        assert worker._reserve_recipes([second]) == [second]
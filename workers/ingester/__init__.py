@@ -0,0 +1 @@
+"""Ingest worker package."""
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import logging
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+from uuid import UUID
+
+from supabase import Client, create_client
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.app.infra.db.notifications import (
+    INGEST_JOBS_CHANNEL,
+    JobNotificationListener,
+    create_job_listener,
+)
+from src.services.embedding import stringify_payload
+from src.services.errors import (
+    InvalidURLError,
+    PrivateOrUnavailableError,
+    RateLimitedError,
+    UnsupportedPlatformError,
+)
+from src.services.ingest import ingest
+from src.services.ingest_cache import get_ingest_cache
+from src.services.ingest_jobs import (
+    INGEST_JOBS_TABLE,
+    STAGE_DONE,
+    STAGE_FAILED,
+    STAGE_QUEUED,
+    STAGE_SAVING,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    update_ingest_job_progress,
+)
+from src.services.persist_supabase import (
+    insert_embedding_job,
+    save_embedding_payload,
+    update_recipe_embedding_status,
+    upsert_recipe_minimal,
+)
+from workers.ingester.config import WorkerConfig, get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger("ingest-worker")
+
+EMBEDDING_STATUS_PENDING = "pending"
+
+# Erros que uma nova tentativa nao resolve.
+PERMANENT_ERRORS = (
+    InvalidURLError,
+    UnsupportedPlatformError,
+    PrivateOrUnavailableError,
+)
+
+
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_datetime(value: str | datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        normalized = value.replace("Z", "+00:00") if value.endswith("Z") else value
+        return datetime.fromisoformat(normalized)
+    except ValueError:
+        return None
+
+
+def _safe_int(value: object, default: int = 0) -> int:
+    return int(value) if value else default
+
+
+def _calculate_backoff_minutes(attempt_count: int) -> int:
+    return 2 ** attempt_count
+
+
+def _create_supabase_client(config: WorkerConfig) -> Client:
+    if not config.supabase_url or not config.supabase_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY required")
+    return create_client(config.supabase_url, config.supabase_key)
+
+
+@dataclass
+class IngestJob:
+    id: UUID
+    user_id: UUID
+    url: str
+    attempt_count: int
+    max_attempts: int
+    created_at: datetime | None
+
+
+def _row_to_job(row: dict[str, object]) -> IngestJob:
+    return IngestJob(
+        id=UUID(str(row["id"])),
+        user_id=UUID(str(row["user_id"])),
+        url=str(row.get("url") or ""),
+        attempt_count=_safe_int(row.get("attempt_count")),
+        max_attempts=_safe_int(row.get("max_attempts"), 3),
+        created_at=_parse_datetime(row.get("created_at")),
+    )
+
+
+class IngestWorker:
+    def __init__(
+        self,
+        config: WorkerConfig,
+        client: Client,
+        notification_listener: JobNotificationListener | None = None,
+    ):
+        self.config = config
+        self.client = client
+        self.listener = notification_listener
+        self.running = False
+        self.current_job_id: UUID | None = None
+        self.jobs_processed = 0
+        self.last_job_time: datetime | None = None
+        self.last_stale_check: datetime | None = None
+
+    def start(self) -> None:
+        self._validate_configuration()
+        self._setup_signal_handlers()
+        logger.info(
+            "Starting ingest worker: id=%s, poll_interval=%ds",
+            self.config.worker_id,
+            self.config.poll_interval_seconds,
+        )
+        self.running = True
+        self._run_main_loop()
+        self._shutdown()
+
+    def _validate_configuration(self) -> None:
+        errors = self.config.validate()
+        if errors:
+            raise ValueError(", ".join(errors))
+
+    def _setup_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_shutdown_signal)
+        signal.signal(signal.SIGINT, self._handle_shutdown_signal)
+
+    def _run_main_loop(self) -> None:
+        poll_interval = float(self.config.poll_interval_seconds)
+
+        while self.running:
+            self._maybe_release_stale_locks()
+
+            job = self._try_fetch_next_job()
+            if job:
+                poll_interval = float(self.config.poll_interval_seconds)
+                self._process_job(job)
+                if self._reached_max_jobs():
+                    break
+                continue
+
+            poll_interval = min(poll_interval * 1.5, float(self.config.max_poll_interval_seconds))
+            if self._should_shutdown_on_empty_queue():
+                break
+            self._wait_for_jobs(poll_interval)
+
+    def _try_fetch_next_job(self) -> IngestJob | None:
+        try:
+            result = self.client.rpc(
+                "fetch_and_lock_ingest_job",
+                {"p_worker_id": self.config.worker_id, "p_now": _now_utc().isoformat()},
+            ).execute()
+        except Exception as exc:
+            logger.error("Error fetching ingest job: %s", exc)
+            return None
+
+        if not result.data:
+            return None
+        job = _row_to_job(result.data[0])
+        logger.info("Locked ingest job: id=%s, attempt=%d", job.id, job.attempt_count)
+        return job
+
+    def _reached_max_jobs(self) -> bool:
+        if self.config.max_jobs_per_run <= 0:
+            return False
+        if self.jobs_processed >= self.config.max_jobs_per_run:
+            logger.info("Reached max jobs per run (%d), shutting down", self.config.max_jobs_per_run)
+            return True
+        return False
+
+    def _wait_for_jobs(self, poll_interval: float) -> None:
+        if self.listener is None:
+            time.sleep(poll_interval)
+            return
+        # Com LISTEN ativo o polling vira so um fallback lento.
+        if self.listener.wait(self.config.notify_fallback_poll_seconds, lambda: self.running):
+            logger.debug("Woken up by job notification")
+
+    def _should_shutdown_on_empty_queue(self) -> bool:
+        if not self.config.shutdown_on_empty or self.last_job_time is None:
+            return False
+        idle_time = _now_utc() - self.last_job_time
+        if idle_time > timedelta(minutes=self.config.empty_queue_shutdown_minutes):
+            logger.info(
+                "Queue empty for %d minutes, shutting down",
+                self.config.empty_queue_shutdown_minutes,
+            )
+            return True
+        return False
+
+    def _process_job(self, job: IngestJob) -> None:
+        self.current_job_id = job.id
+        self.last_job_time = _now_utc()
+        started = time.time()
+        logger.info(
+            "Processing ingest job: id=%s, user=%s, url=%s, attempt=%d/%d",
+            job.id,
+            job.user_id,
+            job.url,
+            job.attempt_count,
+            job.max_attempts,
+        )
+        try:
+            recipe_id = self._run_with_heartbeat(job, lambda: self._run_pipeline(job))
+        except PERMANENT_ERRORS as exc:
+            self._handle_permanent_failure(job, str(exc))
+        except RateLimitedError as exc:
+            self._handle_retryable_failure(job, str(exc))
+        except Exception as exc:
+            logger.exception("Ingest job failed: id=%s", job.id)
+            self._handle_retryable_failure(job, str(exc))
+        else:
+            self._mark_job_done(job, recipe_id)
+            logger.info("Ingest job completed: id=%s, recipe=%s, dt=%.2fs", job.id, recipe_id, time.time() - started)
+        finally:
+            self.current_job_id = None
+
+    def _run_pipeline(self, job: IngestJob) -> str:
+        job_id = str(job.id)
+        owner_id = str(job.user_id)
+
+        def report(stage: str, progress: float) -> None:
+            update_ingest_job_progress(self.client, job_id, stage, progress)
+
+        ingest_result = ingest(job.url, cache=get_ingest_cache(self.client), progress=report)
+
+        report(STAGE_SAVING, 0.9)
+        recipe_id = str(upsert_recipe_minimal(self.client, owner_id, ingest_result))
+
+        # Embeddings seguem pela fila embedding_jobs (workers.embedder).
+        payload = stringify_payload(ingest_result)
+        save_embedding_payload(self.client, recipe_id, owner_id, payload)
+        update_recipe_embedding_status(self.client, recipe_id, owner_id, EMBEDDING_STATUS_PENDING, None)
+        insert_embedding_job(self.client, recipe_id, owner_id, payload, self.config.embedding_max_attempts)
+        return recipe_id
+
+    def _run_with_heartbeat(self, job: IngestJob, run: Callable[[], str]) -> str:
+        # Transcricao local ou extracao lenta podem passar do lock_ttl sem
+        # mudar de stage; sem heartbeat outro worker pegaria o job de novo.
+        stop_event = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            args=(job, stop_event),
+            daemon=True,
+        )
+        heartbeat_thread.start()
+        try:
+            return run()
+        finally:
+            stop_event.set()
+            heartbeat_thread.join(timeout=self.config.heartbeat_interval_seconds)
+
+    def _heartbeat_loop(self, job: IngestJob, stop_event: threading.Event) -> None:
+        while not stop_event.wait(self.config.heartbeat_interval_seconds):
+            try:
+                (
+                    self.client.table(INGEST_JOBS_TABLE)
+                    .update({"last_heartbeat_at": _now_utc().isoformat()})
+                    .eq("id", str(job.id))
+                    .eq("locked_by", self.config.worker_id)
+                    .execute()
+                )
+            except Exception as exc:
+                logger.warning("Failed to send ingest heartbeat: id=%s, error=%s", job.id, exc)
+
+    def _update_locked_job(self, job: IngestJob, update_data: dict[str, object]) -> bool:
+        """Atualiza o job so se este worker ainda tem o lock."""
+        result = (
+            self.client.table(INGEST_JOBS_TABLE)
+            .update(update_data)
+            .eq("id", str(job.id))
+            .eq("locked_by", self.config.worker_id)
+            .execute()
+        )
+        if result.data:
+            return True
+        logger.warning("Ingest job lock lost, skipping update: id=%s, worker=%s", job.id, self.config.worker_id)
+        return False
+
+    def _mark_job_done(self, job: IngestJob, recipe_id: str) -> None:
+        update_data = {
+            "status": STATUS_DONE,
+            "stage": STAGE_DONE,
+            "progress": 1,
+            "recipe_id": recipe_id,
+            "finished_at": _now_utc().isoformat(),
+            "locked_at": None,
+            "locked_by": None,
+            "error_message": None,
+        }
+        if self._update_locked_job(job, update_data):
+            self.jobs_processed += 1
+
+    def _handle_retryable_failure(self, job: IngestJob, error_message: str) -> None:
+        if job.attempt_count >= job.max_attempts:
+            self._handle_permanent_failure(job, error_message)
+            return
+
+        retry_at = _now_utc() + timedelta(minutes=_calculate_backoff_minutes(job.attempt_count))
+        update_data = {
+            "status": STATUS_QUEUED,
+            "stage": STAGE_QUEUED,
+            "next_attempt_at": retry_at.isoformat(),
+            "error_message": error_message[:500],
+            "locked_at": None,
+            "locked_by": None,
+        }
+        if not self._update_locked_job(job, update_data):
+            return
+        logger.warning(
+            "Ingest job failed, will retry: id=%s, attempt=%d/%d, next_retry=%s",
+            job.id,
+            job.attempt_count,
+            job.max_attempts,
+            retry_at.isoformat(),
+        )
+
+    def _handle_permanent_failure(self, job: IngestJob, error_message: str) -> None:
+        update_data = {
+            "status": STATUS_FAILED,
+            "stage": STAGE_FAILED,
+            "finished_at": _now_utc().isoformat(),
+            "error_message": error_message[:500],
+            "locked_at": None,
+            "locked_by": None,
+        }
+        if not self._update_locked_job(job, update_data):
+            return
+        logger.error("Ingest job permanently failed: id=%s, error=%s", job.id, error_message)
+
+    def _maybe_release_stale_locks(self) -> None:
+        now = _now_utc()
+        if self.last_stale_check is None:
+            self.last_stale_check = now
+            return
+        if now - self.last_stale_check < timedelta(minutes=self.config.stale_lock_check_interval_minutes):
+            return
+        self.last_stale_check = now
+        released_count = self._release_stale_locks(self.config.lock_ttl_minutes)
+        if released_count > 0:
+            logger.info("Released %d stale ingest locks", released_count)
+
+    def _release_stale_locks(self, lock_ttl_minutes: int) -> int:
+        cutoff = _now_utc() - timedelta(minutes=lock_ttl_minutes)
+        result = (
+            self.client.table(INGEST_JOBS_TABLE)
+            .select("id, attempt_count, max_attempts")
+            .eq("status", "RUNNING")
+            .lt("last_heartbeat_at", cutoff.isoformat())
+            .execute()
+        )
+        released_count = 0
+        for row in result.data or []:
+            attempt_count = _safe_int(row.get("attempt_count"))
+            max_attempts = _safe_int(row.get("max_attempts"), self.config.max_attempts)
+            update_data: dict[str, object] = {"locked_at": None, "locked_by": None}
+            if attempt_count >= max_attempts:
+                update_data.update(
+                    status=STATUS_FAILED,
+                    stage=STAGE_FAILED,
+                    error_message="Job timed out after max attempts",
+                    finished_at=_now_utc().isoformat(),
+                )
+            else:
+                retry_at = _now_utc() + timedelta(minutes=_calculate_backoff_minutes(attempt_count))
+                update_data.update(
+                    status=STATUS_QUEUED,
+                    stage=STAGE_QUEUED,
+                    next_attempt_at=retry_at.isoformat(),
+                    error_message="Lock timed out, requeued for retry",
+                )
+            self.client.table(INGEST_JOBS_TABLE).update(update_data).eq("id", row["id"]).execute()
+            released_count += 1
+        return released_count
+
+    def _handle_shutdown_signal(self, signum: int, frame: object) -> None:
+        logger.info("Received shutdown signal %d", signum)
+        self.running = False
+
+    def _shutdown(self) -> None:
+        logger.info("Worker shutting down: jobs_processed=%d", self.jobs_processed)
+        if self.current_job_id:
+            logger.info("Waiting for current job to complete: %s", self.current_job_id)
+        if self.listener is not None:
+            self.listener.close()
+        logger.info("Worker shutdown complete")
+
+
+def main() -> None:
+    config = get_config()
+    client = _create_supabase_client(config)
+    listener = create_job_listener([INGEST_JOBS_CHANNEL], config.database_url)
+    worker = IngestWorker(config=config, client=client, notification_listener=listener)
+    worker.start()
+
+
+if __name__ == "__main__":
+    main()
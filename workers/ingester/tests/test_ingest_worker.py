@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.services.errors import PrivateOrUnavailableError, RateLimitedError
+from workers.ingester import main as ingester
+from workers.ingester.config import WorkerConfig
+from workers.ingester.main import IngestJob, IngestWorker
+
+
+class QueryStub:
+    def __init__(self, client: "SupabaseClientStub", table: str) -> None:
+        self.client = client
+        self.table = table
+        self.payload: dict[str, Any] | None = None
+        self.filters: dict[str, Any] = {}
+
+    def update(self, payload: dict[str, Any]) -> "QueryStub":
+        self.payload = payload
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryStub":
+        self.filters[column] = value
+        return self
+
+    def execute(self) -> Any:
+        owner = self.filters.get("locked_by", self.client.lock_owner)
+        if owner != self.client.lock_owner:
+            return type("Result", (), {"data": []})()
+        self.client.updates.append((self.table, self.filters.get("id"), self.payload or {}))
+        return type("Result", (), {"data": [self.payload]})()
+
+
+class SupabaseClientStub:
+    def __init__(self, lock_owner: str = "ingester-test") -> None:
+        self.updates: list[tuple[str, Any, dict[str, Any]]] = []
+        self.lock_owner = lock_owner
+
+    def table(self, name: str) -> QueryStub:
+        return QueryStub(self, name)
+
+
+def _job(attempt_count: int = 1, max_attempts: int = 3) -> IngestJob:
+    return IngestJob(
+        id=uuid4(),
+        user_id=uuid4(),
+        url="https://youtu.be/abc123XYZ",
+        attempt_count=attempt_count,
+        max_attempts=max_attempts,
+        created_at=None,
+    )
+
+
+@pytest.fixture
+def worker() -> IngestWorker:
+    config = WorkerConfig(worker_id="ingester-test", supabase_url="http://localhost", supabase_key="key")
+    return IngestWorker(config=config, client=SupabaseClientStub())
+
+
+def _job_updates(worker: IngestWorker) -> list[dict[str, Any]]:
+    return [payload for table, _, payload in worker.client.updates if table == "ingest_jobs"]
+
+
+class TestIngestWorker:
+    def test_successful_job_is_marked_done_with_recipe(
+        self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", lambda self, job: "recipe-1")
+
+        worker._process_job(_job())
+
+        final = _job_updates(worker)[-1]
+        assert final["status"] == "DONE"
+        assert final["recipe_id"] == "recipe-1"
+        assert worker.jobs_processed == 1
+
+    def test_rate_limit_requeues_job(self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail(self: IngestWorker, job: IngestJob) -> str:
+            raise RateLimitedError("quota")
+
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", fail)
+
+        worker._process_job(_job(attempt_count=1))
+
+        final = _job_updates(worker)[-1]
+        assert final["status"] == "QUEUED"
+        assert final["next_attempt_at"]
+
+    def test_private_video_fails_without_retry(self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail(self: IngestWorker, job: IngestJob) -> str:
+            raise PrivateOrUnavailableError("privado")
+
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", fail)
+
+        worker._process_job(_job(attempt_count=1))
+
+        assert _job_updates(worker)[-1]["status"] == "FAILED"
+
+    def test_invalid_gemini_json_is_retried(self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail(self: IngestWorker, job: IngestJob) -> str:
+            raise ValueError("Gemini response is not valid JSON")
+
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", fail)
+
+        worker._process_job(_job(attempt_count=1))
+
+        assert _job_updates(worker)[-1]["status"] == "QUEUED"
+
+    def test_worker_that_lost_the_lock_does_not_overwrite_job(
+        self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", lambda self, job: "recipe-1")
+        worker.client.lock_owner = "ingester-other"
+
+        worker._process_job(_job())
+
+        assert _job_updates(worker) == []
+        assert worker.jobs_processed == 0
+
+    def test_long_pipeline_sends_heartbeats(self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch) -> None:
+        worker.config.heartbeat_interval_seconds = 0.01
+
+        def slow_pipeline(self: IngestWorker, job: IngestJob) -> str:
+            time.sleep(0.1)
+            return "recipe-1"
+
+        monkeypatch.setattr(IngestWorker, "_run_pipeline", slow_pipeline)
+
+        worker._process_job(_job())
+
+        updates = _job_updates(worker)
+        assert any(set(payload) == {"last_heartbeat_at"} for payload in updates[:-1])
+        assert updates[-1]["status"] == "DONE"
+
+    def test_pipeline_reports_stages_and_schedules_embedding(
+        self, worker: IngestWorker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        stages: list[str] = []
+        embedding_jobs: list[str] = []
+
+        def fake_ingest(url: str, *, cache: Any, progress: Any) -> dict[str, Any]:
+            progress("FETCHING", 0.05)
+            return {"raw_content": None, "metadata": {}}
+
+        monkeypatch.setattr(ingester, "ingest", fake_ingest)
+        monkeypatch.setattr(ingester, "get_ingest_cache", lambda client: None)
+        monkeypatch.setattr(
+            ingester, "update_ingest_job_progress", lambda client, job_id, stage, progress: stages.append(stage)
+        )
+        monkeypatch.setattr(ingester, "upsert_recipe_minimal", lambda client, owner, result: "recipe-9")
+        monkeypatch.setattr(ingester, "save_embedding_payload", lambda *args: None)
+        monkeypatch.setattr(ingester, "update_recipe_embedding_status", lambda *args: None)
+        monkeypatch.setattr(
+            ingester, "insert_embedding_job", lambda client, recipe_id, *args: embedding_jobs.append(recipe_id)
+        )
+
+        assert worker._run_pipeline(_job()) == "recipe-9"
+        assert stages == ["FETCHING", "SAVING"]
+        assert embedding_jobs == ["recipe-9"]
@@ -15,10 +15,22 @@ class WorkerConfig:
     lock_ttl_minutes: int = int(os.getenv("WORKER_LOCK_TTL_MINUTES", "30"))
     stale_lock_check_interval_minutes: int = int(os.getenv("WORKER_STALE_CHECK_MINUTES", "5"))
     temp_dir: str = os.getenv("WORKER_TEMP_DIR", "/tmp/transcription-worker")
+    # Baixa do R2 direto para o ffmpeg/Whisper, sem arquivo temporario (fallback: download completo).
+    streaming_download: bool = os.getenv("WORKER_STREAMING_DOWNLOAD", "true").lower() == "true"
+    # Nos retries, extrai o audio (Opus mono 16 kHz) para uma chave derivada no R2, apagada ao fim do job.
+    normalize_audio: bool = os.getenv("WORKER_NORMALIZE_AUDIO", "true").lower() == "true"
+    # Reaproveita a transcricao de um job DONE com o mesmo conteudo (hash), modelo e idioma.
+    transcript_dedup: bool = os.getenv("WORKER_TRANSCRIPT_DEDUP", "true").lower() == "true"
+    # Fracao dos minutos cobrada da quota num reaproveitamento (0 = gratis).
+    dedup_quota_ratio: float = float(os.getenv("WORKER_DEDUP_QUOTA_RATIO", "0"))
     default_language: str = os.getenv("TRANSCRIPTION_LANGUAGE", "pt")
     graceful_shutdown_timeout_seconds: int = int(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "300"))
     progress_update_interval_seconds: int = int(os.getenv("WORKER_PROGRESS_UPDATE_INTERVAL_SECONDS", "5"))
     heartbeat_interval_seconds: int = int(os.getenv("WORKER_HEARTBEAT_INTERVAL_SECONDS", "20"))
+    whisper_replicas: str = os.getenv("WHISPER_REPLICAS", "1")
+    health_check_interval_seconds: int = int(os.getenv("WORKER_HEALTH_CHECK_INTERVAL_SECONDS", "60"))
+    notify_fallback_poll_seconds: int = int(os.getenv("WORKER_NOTIFY_FALLBACK_POLL", "60"))
+    database_url: str = os.getenv("DATABASE_URL", "")
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     r2_account_id: str = os.getenv("R2_ACCOUNT_ID", "")
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
+import math
 import signal
 import subprocess
 import sys
 import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone, timedelta
 from pathlib import Path, PurePosixPath
 from uuid import UUID
@@ -22,10 +25,22 @@ from src.app.domain.errors import (
     TranscriptionTimeoutError,
     WorkerConfigurationError,
 )
-from src.app.domain.models import TranscriptionJob, TranscriptionResult
+from src.app.domain.models import TranscriptionJob, TranscriptionResult, TranscriptionSegment
 from src.app.infra.db.base import JobQueueRepository, QuotaRepository
+from src.app.infra.db.notifications import (
+    TRANSCRIPTION_JOBS_CHANNEL,
+    JobNotificationListener,
+    create_job_listener,
+)
 from src.app.infra.storage.base import StorageProvider
-from src.app.services.transcription_pipeline import TranscriptionPipeline
+from src.app.services.audio_stream import FfmpegPcmStream, ffmpeg_available
+from src.app.services.media_normalizer import MediaNormalizer
+from src.app.services.transcription_pipeline import TranscriptionPipeline, preload_model
+from src.app.services.whisper_pool import (
+    PooledTranscriptionPipeline,
+    WhisperReplicaPool,
+    resolve_replica_count,
+)
 from workers.transcriber.config import WorkerConfig, get_config
 
 logging.basicConfig(
@@ -112,17 +127,25 @@ class TranscriberWorker:
         quota_repository: QuotaRepository,
         storage_provider: StorageProvider,
         transcription_pipeline: TranscriptionPipeline,
+        notification_listener: JobNotificationListener | None = None,
+        max_concurrent_jobs: int = 1,
+        media_normalizer: MediaNormalizer | None = None,
     ):
         self.config = config
         self.job_repo = job_repository
         self.quota_repo = quota_repository
         self.storage = storage_provider
         self.pipeline = transcription_pipeline
+        self.listener = notification_listener
+        self.normalizer = media_normalizer
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
         self.running = False
         self.current_job_id: UUID | None = None
         self.jobs_processed = 0
         self.last_job_time: datetime | None = None
         self.last_stale_check: datetime | None = None
+        self.last_health_check: datetime | None = None
+        self._stats_lock = threading.Lock()
 
     def start(self) -> None:
         self._validate_configuration()
@@ -143,12 +166,17 @@ class TranscriberWorker:
 
     def _log_startup_info(self) -> None:
         logger.info(
-            "Starting transcription worker: id=%s, poll_interval=%ds",
+            "Starting transcription worker: id=%s, poll_interval=%ds, concurrency=%d",
             self.config.worker_id,
             self.config.poll_interval_seconds,
+            self.max_concurrent_jobs,
         )
 
     def _run_main_loop(self) -> None:
+        if self.max_concurrent_jobs > 1:
+            self._run_concurrent_loop()
+            return
+
         empty_polls = 0
         poll_interval = float(self.config.poll_interval_seconds)
 
@@ -179,13 +207,76 @@ class TranscriberWorker:
                     poll_interval,
                     empty_polls,
                 )
+                self._wait_for_jobs(poll_interval)
 
-            time.sleep(poll_interval)
+    def _run_concurrent_loop(self) -> None:
+        """Um job por replica do pool de Whisper, todos em paralelo."""
+        empty_polls = 0
+        poll_interval = float(self.config.poll_interval_seconds)
+        in_flight: set[Future] = set()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent_jobs,
+            thread_name_prefix="transcriber",
+        ) as executor:
+            while self.running and not self._reached_max_jobs():
+                if not self._process_main_loop_iteration(empty_polls, poll_interval):
+                    break
+
+                job = self._try_fetch_next_job() if len(in_flight) < self.max_concurrent_jobs else None
+                if job:
+                    empty_polls = 0
+                    poll_interval = float(self.config.poll_interval_seconds)
+                    in_flight.add(executor.submit(self._process_job, job))
+                    continue
+
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    self._collect_results(done)
+                    continue
+
+                empty_polls += 1
+                poll_interval = self._calculate_backoff_interval(poll_interval)
+                if self._should_shutdown_on_empty_queue():
+                    break
+                self._wait_for_jobs(poll_interval)
+
+            if in_flight:
+                logger.info("Waiting for %d in-flight transcription jobs", len(in_flight))
+                done, _ = wait(in_flight)
+                self._collect_results(done)
+
+    @staticmethod
+    def _collect_results(done: set[Future]) -> None:
+        for future in done:
+            try:
+                future.result()
+            except Exception:
+                logger.exception("Transcription job crashed")
 
     def _process_main_loop_iteration(self, empty_polls: int, poll_interval: float) -> bool:
         self._maybe_release_stale_locks()
+        self._maybe_check_pipeline_health()
         return True
 
+    def _maybe_check_pipeline_health(self) -> None:
+        health_check = getattr(self.pipeline, "health_check", None)
+        if health_check is None:
+            return
+
+        now = datetime.now(timezone.utc)
+        if self.last_health_check is None:
+            self.last_health_check = now
+            return
+
+        if (now - self.last_health_check).total_seconds() < self.config.health_check_interval_seconds:
+            return
+
+        self.last_health_check = now
+        restarted = health_check()
+        if restarted:
+            logger.warning("Restarted %d unhealthy whisper replicas", restarted)
+
     def _try_fetch_next_job(self) -> TranscriptionJob | None:
         return self.job_repo.fetch_and_lock_next_job(worker_id=self.config.worker_id)
 
@@ -207,6 +298,14 @@ class TranscriberWorker:
             float(self.config.max_poll_interval_seconds),
         )
 
+    def _wait_for_jobs(self, poll_interval: float) -> None:
+        if self.listener is None:
+            time.sleep(poll_interval)
+            return
+        # Com LISTEN ativo o polling vira so um fallback lento.
+        if self.listener.wait(self.config.notify_fallback_poll_seconds, lambda: self.running):
+            logger.debug("Woken up by job notification")
+
     def _should_shutdown_on_empty_queue(self) -> bool:
         if not self.config.shutdown_on_empty:
             return False
@@ -229,43 +328,62 @@ class TranscriberWorker:
         self._mark_job_started(job)
         temp_file_path: Path | None = None
         estimated_minutes = DEFAULT_ESTIMATED_MINUTES
+        normalized_source: str | None = None
+        finished = False
 
         try:
             validated_object_key = self._validate_object_key(job.object_key)
-            temp_file_path = self._download_media_file(job.id, validated_object_key)
-            estimated_minutes = self._estimate_duration_minutes(validated_object_key)
-            self._update_job_stage(job.id, "TRANSCRIBING")
-            total_duration_sec = self._determine_total_duration_seconds(
-                job,
-                temp_file_path,
-                estimated_minutes,
-            )
-            progress_reporter = ProgressReporter(
-                job_id=job.id,
-                job_repo=self.job_repo,
-                total_duration_sec=total_duration_sec,
-                progress_interval_seconds=self.config.progress_update_interval_seconds,
-                heartbeat_interval_seconds=self.config.heartbeat_interval_seconds,
-            )
-            transcription_result = self._execute_transcription(temp_file_path, progress_reporter)
+            metadata = self._fetch_media_metadata(validated_object_key)
+            estimated_minutes = self._estimate_duration_minutes(validated_object_key, metadata)
+            content_hash = media_content_hash(metadata)
+
+            if self._reuse_cached_transcript(job, content_hash, estimated_minutes):
+                return
+
+            media_key = self._resolve_media_key(job, validated_object_key)
+            if media_key != validated_object_key:
+                normalized_source = validated_object_key
+            transcription_result: TranscriptionResult | None = None
+
+            if self._can_stream_media():
+                transcription_result = self._transcribe_streaming(job, media_key, estimated_minutes)
+
+            if transcription_result is None:
+                temp_file_path = self._download_media_file(job.id, media_key)
+                self._update_job_stage(job.id, "TRANSCRIBING")
+                total_duration_sec = self._determine_total_duration_seconds(
+                    job,
+                    temp_file_path,
+                    estimated_minutes,
+                )
+                progress_reporter = self._create_progress_reporter(job, total_duration_sec)
+                transcription_result = self._execute_transcription(temp_file_path, progress_reporter)
+
             self._update_job_stage(job.id, "FINALIZING")
-            self._save_transcription_results(job, transcription_result)
+            self._save_transcription_results(job, transcription_result, content_hash)
             self._reconcile_quota(job.user_id, estimated_minutes, transcription_result.duration_sec)
+            finished = True
 
         except InvalidMediaError as error:
             self._handle_permanent_failure(job.id, str(error))
+            finished = True
 
         except TranscriptionProcessingError as error:
             self._handle_processing_error(job.id, error)
+            finished = not error.retryable or job.attempt_count >= job.max_attempts
 
         except (StorageDownloadError, StorageTimeoutError) as error:
             self._handle_retryable_failure(job.id, str(error))
+            finished = job.attempt_count >= job.max_attempts
 
         except InvalidObjectKeyError as error:
             self._handle_permanent_failure(job.id, str(error))
+            finished = True
 
         finally:
             self._cleanup_temp_file(temp_file_path)
+            if normalized_source and finished:
+                self.normalizer.discard(normalized_source)
             self.current_job_id = None
 
     def _mark_job_started(self, job: TranscriptionJob) -> None:
@@ -319,9 +437,81 @@ class TranscriberWorker:
 
         return temp_file_path
 
-    def _estimate_duration_minutes(self, object_key: str) -> int:
+    def _resolve_media_key(self, job: TranscriptionJob, object_key: str) -> str:
+        """
+        A primeira tentativa transcreve o original em streaming; so as
+        retentativas (o claim ja conta a atual em attempt_count) pagam a
+        normalizacao, que dai em diante baixa so o audio de fala.
+        """
+        if self.normalizer is None or job.attempt_count <= 1:
+            return object_key
+        return self.normalizer.ensure_normalized(object_key)
+
+    def _can_stream_media(self) -> bool:
+        return (
+            self.config.streaming_download
+            and hasattr(self.pipeline, "transcribe_stream")
+            and ffmpeg_available()
+        )
+
+    def _transcribe_streaming(
+        self,
+        job: TranscriptionJob,
+        object_key: str,
+        estimated_minutes: int,
+    ) -> TranscriptionResult | None:
+        """
+        Download, decodificacao e transcricao sobrepostos: o R2 alimenta o
+        ffmpeg, que entrega PCM ao Whisper sem passar pelo disco. Devolve None
+        quando o formato nao decodifica via pipe (ex.: MP4 com moov no fim),
+        para o job seguir pelo download completo.
+        """
         try:
-            metadata = self.storage.get_object_metadata(object_key)
+            source = self.storage.iter_object_chunks(object_key)
+        except NotImplementedError:
+            return None
+
+        logger.info("Streaming from R2 into transcription: %s", object_key)
+        self._update_job_stage(job.id, "TRANSCRIBING")
+        total_duration_sec = self._determine_total_duration_seconds(job, None, estimated_minutes)
+        progress_reporter = self._create_progress_reporter(job, total_duration_sec)
+        pcm_stream = FfmpegPcmStream(source)
+
+        try:
+            return self._run_with_heartbeat(
+                progress_reporter,
+                lambda: self.pipeline.transcribe_stream(
+                    pcm_stream,
+                    progress_callback=progress_reporter.on_segment_processed,
+                ),
+            )
+        except InvalidMediaError as error:
+            logger.warning(
+                "Streaming decode failed, falling back to full download: id=%s, error=%s",
+                job.id,
+                error,
+            )
+            return None
+
+    def _create_progress_reporter(self, job: TranscriptionJob, total_duration_sec: float) -> ProgressReporter:
+        return ProgressReporter(
+            job_id=job.id,
+            job_repo=self.job_repo,
+            total_duration_sec=total_duration_sec,
+            progress_interval_seconds=self.config.progress_update_interval_seconds,
+            heartbeat_interval_seconds=self.config.heartbeat_interval_seconds,
+        )
+
+    def _fetch_media_metadata(self, object_key: str) -> dict[str, object] | None:
+        try:
+            return self.storage.get_object_metadata(object_key)
+        except (StorageDownloadError, StorageTimeoutError):
+            return None
+
+    def _estimate_duration_minutes(self, object_key: str, metadata: dict[str, object] | None = None) -> int:
+        try:
+            if metadata is None:
+                metadata = self.storage.get_object_metadata(object_key)
             content_length = metadata.get("content_length", 0) or 0
             size_mb = content_length / BYTES_PER_MB
             return max(1, int(size_mb))
@@ -334,6 +524,16 @@ class TranscriberWorker:
         progress_reporter: ProgressReporter,
     ) -> TranscriptionResult:
         logger.info("Starting transcription...")
+        return self._run_with_heartbeat(
+            progress_reporter,
+            lambda: self.pipeline.transcribe(media_path, progress_callback=progress_reporter.on_segment_processed),
+        )
+
+    def _run_with_heartbeat(
+        self,
+        progress_reporter: ProgressReporter,
+        transcribe: Callable[[], TranscriptionResult],
+    ) -> TranscriptionResult:
         stop_event = threading.Event()
         heartbeat_thread = threading.Thread(
             target=self._heartbeat_loop,
@@ -342,15 +542,64 @@ class TranscriberWorker:
         )
         heartbeat_thread.start()
         try:
-            return self.pipeline.transcribe(media_path, progress_callback=progress_reporter.on_segment_processed)
+            return transcribe()
         finally:
             stop_event.set()
             heartbeat_thread.join(timeout=self.config.heartbeat_interval_seconds)
 
+    def _reuse_cached_transcript(
+        self,
+        job: TranscriptionJob,
+        content_hash: str | None,
+        estimated_minutes: int,
+    ) -> bool:
+        """Mesmo arquivo ja transcrito (mesmo modelo e idioma): copia o resultado."""
+        if not self.config.transcript_dedup or not content_hash:
+            return False
+
+        model_version = getattr(self.pipeline, "model_version", None)
+        language = getattr(self.pipeline, "language", self.config.default_language)
+        if not model_version:
+            return False
+
+        cached = self.job_repo.find_completed_by_content_hash(content_hash, model_version, language)
+        if cached is None or cached.id == job.id or cached.transcript_text is None:
+            return False
+
+        logger.info(
+            "Transcript cache hit: id=%s, source_job=%s, content_hash=%s",
+            job.id,
+            cached.id,
+            content_hash,
+        )
+        result = TranscriptionResult(
+            text=cached.transcript_text,
+            segments=[
+                TranscriptionSegment(
+                    start=float(segment["start"]),
+                    end=float(segment["end"]),
+                    text=str(segment["text"]),
+                )
+                for segment in cached.segments_json or []
+            ],
+            language=cached.language or language,
+            duration_sec=float(cached.duration_sec or 0),
+            model_version=model_version,
+        )
+        self._save_transcription_results(job, result, content_hash)
+        self._reconcile_quota(
+            job.user_id,
+            estimated_minutes,
+            result.duration_sec,
+            charge_ratio=self.config.dedup_quota_ratio,
+        )
+        return True
+
     def _save_transcription_results(
         self,
         job: TranscriptionJob,
         result: TranscriptionResult,
+        content_hash: str | None = None,
     ) -> None:
         segments_json = [
             {
@@ -368,10 +617,12 @@ class TranscriberWorker:
             language=result.language,
             duration_sec=int(result.duration_sec),
             model_version=result.model_version,
+            content_hash=content_hash,
         )
 
         if success:
-            self.jobs_processed += 1
+            with self._stats_lock:
+                self.jobs_processed += 1
             logger.info(
                 "Job completed successfully: id=%s, duration=%ds, segments=%d",
                 job.id,
@@ -386,8 +637,11 @@ class TranscriberWorker:
         user_id: UUID,
         estimated_minutes: int,
         actual_duration_sec: float,
+        charge_ratio: float = 1.0,
     ) -> None:
         actual_minutes = int(actual_duration_sec / 60) + 1
+        if charge_ratio < 1.0:
+            actual_minutes = math.ceil(actual_minutes * max(0.0, charge_ratio))
         self.quota_repo.confirm_actual_minutes(
             user_id=user_id,
             estimated_minutes=estimated_minutes,
@@ -468,6 +722,9 @@ class TranscriberWorker:
         if self.current_job_id:
             logger.info("Waiting for current job to complete: %s", self.current_job_id)
 
+        if self.listener is not None:
+            self.listener.close()
+
         logger.info("Worker shutdown complete")
 
     def _update_job_stage(self, job_id: UUID, stage: str) -> None:
@@ -489,15 +746,16 @@ class TranscriberWorker:
     def _determine_total_duration_seconds(
         self,
         job: TranscriptionJob,
-        media_path: Path,
+        media_path: Path | None,
         estimated_minutes: int,
     ) -> float:
         if job.estimated_duration_sec and job.estimated_duration_sec > 0:
             return float(job.estimated_duration_sec)
 
-        duration = self._probe_audio_duration(media_path)
-        if duration:
-            return duration
+        if media_path is not None:
+            duration = self._probe_audio_duration(media_path)
+            if duration:
+                return duration
 
         return float(max(estimated_minutes, 1) * 60)
 
@@ -529,11 +787,32 @@ class TranscriberWorker:
             return None
 
 
+def media_content_hash(metadata: dict[str, object] | None) -> str | None:
+    """O ETag de um upload em uma parte e o MD5 do conteudo; multipart ("...-N") nao serve."""
+    etag = str((metadata or {}).get("etag") or "").strip('"')
+    if not etag or "-" in etag:
+        return None
+    return f"md5:{etag}"
+
+
+def create_transcription_pipeline(config: WorkerConfig) -> TranscriptionPipeline | PooledTranscriptionPipeline:
+    replicas = resolve_replica_count(config.whisper_replicas)
+    if replicas <= 1:
+        # Modelo carregado no startup, nao no primeiro job.
+        if not preload_model():
+            logger.error("Whisper model could not be preloaded")
+        return TranscriptionPipeline(language=config.default_language)
+
+    pool = WhisperReplicaPool(replicas)
+    pool.start()
+    return PooledTranscriptionPipeline(pool, language=config.default_language)
+
+
 def create_default_dependencies(config: WorkerConfig) -> tuple[
     JobQueueRepository,
     QuotaRepository,
     StorageProvider,
-    TranscriptionPipeline,
+    TranscriptionPipeline | PooledTranscriptionPipeline,
 ]:
     from src.app.infra.db.supabase_jobs_repo import (
         SupabaseJobQueueRepository,
@@ -544,7 +823,7 @@ def create_default_dependencies(config: WorkerConfig) -> tuple[
     job_repository = SupabaseJobQueueRepository()
     quota_repository = SupabaseQuotaRepository()
     storage_provider = R2StorageProvider()
-    transcription_pipeline = TranscriptionPipeline(language=config.default_language)
+    transcription_pipeline = create_transcription_pipeline(config)
 
     return job_repository, quota_repository, storage_provider, transcription_pipeline
 
@@ -559,9 +838,17 @@ def main() -> None:
         quota_repository=quota_repo,
         storage_provider=storage,
         transcription_pipeline=pipeline,
+        notification_listener=create_job_listener([TRANSCRIPTION_JOBS_CHANNEL], config.database_url),
+        max_concurrent_jobs=getattr(pipeline, "concurrency", 1),
+        media_normalizer=MediaNormalizer(storage) if config.normalize_audio and ffmpeg_available() else None,
     )
 
-    worker.start()
+    try:
+        worker.start()
+    finally:
+        close = getattr(pipeline, "close", None)
+        if close is not None:
+            close()
 
 
 if __name__ == "__main__":
@@ -20,7 +20,7 @@ from src.app.domain.models import (
     TranscriptionSegment,
 )
 from workers.transcriber.config import WorkerConfig
-from workers.transcriber.main import TranscriberWorker
+from workers.transcriber.main import TranscriberWorker, media_content_hash
 
 
 class JobQueueRepositoryStub:
@@ -29,6 +29,8 @@ class JobQueueRepositoryStub:
         self.marked_done_jobs: list[UUID] = []
         self.marked_failed_jobs: list[tuple[UUID, str, bool]] = []
         self.released_locks_count = 0
+        self.completed_by_hash: dict[tuple[str, str, str], TranscriptionJob] = {}
+        self.saved_content_hashes: list[str | None] = []
 
     def fetch_and_lock_next_job(self, worker_id: str) -> TranscriptionJob | None:
         if self.jobs_to_return:
@@ -43,10 +45,20 @@ class JobQueueRepositoryStub:
         language: str,
         duration_sec: int,
         model_version: str,
+        content_hash: str | None = None,
     ) -> bool:
         self.marked_done_jobs.append(job_id)
+        self.saved_content_hashes.append(content_hash)
         return True
 
+    def find_completed_by_content_hash(
+        self,
+        content_hash: str,
+        model_version: str,
+        language: str,
+    ) -> TranscriptionJob | None:
+        return self.completed_by_hash.get((content_hash, model_version, language))
+
     def mark_failed(
         self,
         job_id: UUID,
@@ -466,3 +478,100 @@ class TestTranscriberWorkerEstimateDuration:
 
         result = worker._estimate_duration_minutes("test.mp3")
         assert result == 5
+
+
+class TestTranscriberWorkerTranscriptDedup:
+    def _create_worker(self, job_repo: JobQueueRepositoryStub, quota_repo: QuotaRepositoryStub) -> TranscriberWorker:
+        pipeline = TranscriptionPipelineStub()
+        pipeline.model_version = "medium"
+        pipeline.language = "pt"
+        return TranscriberWorker(
+            config=create_test_config(),
+            job_repository=job_repo,
+            quota_repository=quota_repo,
+            storage_provider=StorageProviderStub(),
+            transcription_pipeline=pipeline,
+        )
+
+    def test_media_content_hash_from_single_part_etag(self) -> None:
+        assert media_content_hash({"etag": '"abc123"'}) == "md5:abc123"
+        assert media_content_hash({"etag": '"abc123-4"'}) is None
+        assert media_content_hash(None) is None
+
+    def test_cache_hit_copies_transcript_without_charging_quota(self) -> None:
+        job_repo = JobQueueRepositoryStub()
+        quota_repo = QuotaRepositoryStub()
+        cached = create_test_job()
+        cached.status = JobStatus.DONE
+        cached.transcript_text = "Texto ja transcrito"
+        cached.segments_json = [{"start": 0.0, "end": 4.0, "text": "Texto ja transcrito"}]
+        cached.language = "pt"
+        cached.duration_sec = 240
+        job_repo.completed_by_hash[("md5:abc", "medium", "pt")] = cached
+        worker = self._create_worker(job_repo, quota_repo)
+        job = create_test_job()
+
+        assert worker._reuse_cached_transcript(job, "md5:abc", estimated_minutes=5) is True
+
+        assert job_repo.marked_done_jobs == [job.id]
+        assert job_repo.saved_content_hashes == ["md5:abc"]
+        assert quota_repo.confirmed_minutes == [(job.user_id, 5, 0)]
+
+    def test_cache_miss_falls_through_to_transcription(self) -> None:
+        job_repo = JobQueueRepositoryStub()
+        worker = self._create_worker(job_repo, QuotaRepositoryStub())
+
+        assert worker._reuse_cached_transcript(create_test_job(), "md5:other", estimated_minutes=5) is False
+        assert worker._reuse_cached_transcript(create_test_job(), None, estimated_minutes=5) is False
+        assert job_repo.marked_done_jobs == []
+
+    def test_reduced_charge_ratio(self) -> None:
+        quota_repo = QuotaRepositoryStub()
+        worker = self._create_worker(JobQueueRepositoryStub(), quota_repo)
+        job = create_test_job()
+
+        worker._reconcile_quota(job.user_id, 5, 599.0, charge_ratio=0.25)
+
+        assert quota_repo.confirmed_minutes == [(job.user_id, 5, 3)]
+
+
+class MediaNormalizerStub:
+    def __init__(self) -> None:
+        self.normalized: list[str] = []
+        self.discarded: list[str] = []
+
+    def ensure_normalized(self, object_key: str) -> str:
+        self.normalized.append(object_key)
+        return f"{object_key}.speech.ogg"
+
+    def discard(self, object_key: str) -> None:
+        self.discarded.append(object_key)
+
+
+class TestTranscriberWorkerNormalization:
+    def _create_worker(self, normalizer: MediaNormalizerStub) -> TranscriberWorker:
+        return TranscriberWorker(
+            config=create_test_config(),
+            job_repository=JobQueueRepositoryStub(),
+            quota_repository=QuotaRepositoryStub(),
+            storage_provider=StorageProviderStub(),
+            transcription_pipeline=TranscriptionPipelineStub(),
+            media_normalizer=normalizer,
+        )
+
+    def test_first_attempt_uses_original_media(self) -> None:
+        normalizer = MediaNormalizerStub()
+        worker = self._create_worker(normalizer)
+        job = create_test_job()
+        job.attempt_count = 1
+
+        assert worker._resolve_media_key(job, job.object_key) == job.object_key
+        assert normalizer.normalized == []
+
+    def test_retry_uses_normalized_audio(self) -> None:
+        normalizer = MediaNormalizerStub()
+        worker = self._create_worker(normalizer)
+        job = create_test_job()
+        job.attempt_count = 2
+
+        assert worker._resolve_media_key(job, job.object_key) == f"{job.object_key}.speech.ogg"